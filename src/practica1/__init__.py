@@ -1,16 +1,110 @@
+import argparse
 import collections.abc
+import json
 
 # Parche por fallos en importación de experta
 if not hasattr(collections, "Mapping"):
     setattr(collections, "Mapping", collections.abc.Mapping)
 
-from practica1.ontologia import g
-from practica1.sistema_experto import Motor, Objetivo
-from practica1.traductor_ontologia import traducir
 
+def main(argv=None) -> None:
+    """
+    Punto de entrada de `practica1`. Sin argumentos muestra las rutas recomendadas para el objetivo
+    de ejemplo; `practica1 bench` mide cada etapa del flujo (ver `benchmark.medir_etapas`)
+    """
+    parser = argparse.ArgumentParser(prog="practica1")
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="reutilizar la ontología razonada guardada en disco (ver ConfigOntologia.usar_cache)",
+    )
+    subparsers = parser.add_subparsers(dest="comando")
+    bench = subparsers.add_parser("bench", help="mide el tiempo y la memoria de cada etapa del flujo")
+    bench.add_argument(
+        "--lado",
+        type=int,
+        action="append",
+        default=[],
+        help="lado de una red sintética en cuadrícula a medir (se puede repetir)",
+    )
+    bench.add_argument("--sin-medellin", action="store_true", help="no medir el mapa de Medellín")
+    bench.add_argument("--semilla", type=int, default=21, help="semilla de las redes y las congestiones")
+    bench.add_argument(
+        "--razonador",
+        choices=("owlrl", "dirigido"),
+        default="owlrl",
+        help="razonador de la etapa de razonamiento (los dos se comparan siempre aparte)",
+    )
+    bench.add_argument(
+        "--sin-memoria",
+        action="store_true",
+        help="no medir la memoria (tracemalloc hace más lentas todas las etapas)",
+    )
+    bench.add_argument("--salida", help="archivo JSON en el que se guardan las mediciones")
+    args = parser.parse_args(argv)
 
-def main() -> None:
-    motor = Motor()
+    if args.comando == "bench":
+        ejecutar_benchmark(args)
+    else:
+        mostrar_recomendaciones(usar_cache=args.cache)
+
+
+def ejecutar_benchmark(args) -> None:
+    """
+    Mide las etapas del flujo sobre el mapa de Medellín y las redes sintéticas pedidas en `args` y
+    compara los razonadores en cada red, imprime una tabla por red y, si se pidió, guarda las
+    mediciones en un archivo JSON
+    """
+    from practica1.benchmark import comparar_razonadores, medir_etapas
+
+    lados = ([] if args.sin_medellin else [None]) + args.lado
+    mediciones = []
+    for lado in lados:
+        medicion = medir_etapas(lado, semilla=args.semilla, memoria=not args.sin_memoria, razonador=args.razonador)
+        medicion["razonadores"] = comparar_razonadores(lado, semilla=args.semilla)
+        mediciones.append(medicion)
+
+        print(f"\n{medicion['red']}: {sum(medicion['hechos'].values())} hechos, "
+              f"{medicion['activaciones']['activaciones_creadas']} activaciones creadas y "
+              f"{medicion['activaciones']['activaciones_disparadas']} disparadas entre declarar y ejecutar")
+        for etapa in medicion["etapas"]:
+            conteos = ", ".join(
+                f"{llave}={valor}"
+                for llave, valor in etapa.items()
+                if llave not in ("etapa", "segundos", "memoria_pico_bytes")
+            )
+            memoria = f"{etapa['memoria_pico_bytes'] / 2**20:9.2f} MB" if "memoria_pico_bytes" in etapa else ""
+            print(f"\t{etapa['etapa']:<13}{etapa['segundos']:9.3f} s{memoria}  {conteos}")
+
+        print("\trazonador     tripletas   inferidas   segundos   hechos")
+        for razonamiento in medicion["razonadores"]:
+            print(
+                f"\t{razonamiento['razonador']:<13}{razonamiento['tripletas']:>9}"
+                f"{razonamiento['tripletas'] - razonamiento['tripletas_base']:>12}"
+                f"{razonamiento['segundos']:>11.3f}{razonamiento['hechos']:>9}"
+            )
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(mediciones, archivo, ensure_ascii=False, indent=2)
+        print(f"\nMediciones guardadas en {args.salida}")
+
+
+def mostrar_recomendaciones(usar_cache=False) -> None:
+    # Las importaciones se hacen aquí para que `import practica1` no cargue rdflib, experta ni
+    # skfuzzy hasta que realmente se necesiten
+    from practica1.ontologia import ConfigOntologia, GeneradorRutas, construir_ontologia
+    from practica1.sistema_experto import Motor, Nodo, Objetivo
+    from practica1.traductor_ontologia import filtrar_por_objetivo, traducir
+
+    objetivo = Objetivo(desde="Universidad Nacional de Colombia", hasta="Estadio de Fútbol Atanasio Girardot") # FIXME: quitar esto (es temporal)
+
+    # las rutas se generan solo para el objetivo consultado
+    config = ConfigOntologia(verbosidad=1, usar_cache=usar_cache, generar_rutas=False)
+    g = construir_ontologia(config)
+    GeneradorRutas(g, config).rutas(objetivo["desde"], objetivo["hasta"])
+
+    motor = Motor(k=3)
     motor.reset()
 
     # traducción del grafo de ontologias a hechos del sistema experto
@@ -18,14 +112,65 @@ def main() -> None:
 
     print("Traducción completada")
 
+    # las rutas que no sirven para el objetivo se descartan antes de declararlas en el motor
+    hechos, resumen = filtrar_por_objetivo(hechos, objetivo)
+    print(
+        f"Filtro por objetivo: {resumen.hechos_evitados} hechos y "
+        f"~{resumen.activaciones_estimadas} activaciones evitadas (estimadas)"
+    )
+
     print("\nHechos traducidos:", *map(repr, hechos), sep="\n\t")
 
     # declaramos los hechos en el motor
     motor.declare(*hechos)
 
-    motor.declare(Objetivo(desde="Universidad Nacional de Colombia", hasta="Estadio de Fútbol Atanasio Girardot")) # FIXME: quitar esto (es temporal)
+    motor.declare(objetivo)
+
+    recomendaciones = motor.run()
+    if not recomendaciones:
+        print("No fue posible encontrar la mejor ruta")
+        return
+
+    intersecciones = {h["numero"]: h for h in hechos if isinstance(h, Nodo) and "numero" in h}
+    for i, recomendacion in enumerate(recomendaciones):
+        if i == 0:
+            print("\nLa mejor ruta es: ", end="")
+        else:
+            print(f"\nAlternativa {i}: ", end="")
+        imprimir_recomendacion(recomendacion, intersecciones)
+
+
+def imprimir_recomendacion(recomendacion, intersecciones) -> None:
+    """
+    Muestra una ruta recomendada con sus vías y las intersecciones por donde pasa
+
+    Parámetros:
+        - recomendacion: la `Recomendacion` a mostrar
+        - intersecciones: diccionario {numero: hecho Nodo} de las intersecciones
+    """
+    tiempo_minutos = round(recomendacion.tiempo_estimado * 60, 2)
+    distancia = round(recomendacion.distancia, 2)
+    print(f"{recomendacion.ruta} con un tiempo estimado de {tiempo_minutos} minutos y una distancia de {distancia} km")
+    for via in recomendacion.vias:
+        print(f"\t{via}")
+
+    print("Pasando por las intersecciones:")
+    # se lleva registro de la ultima via en las intersecciones para mostrar el orden correcto
+    ultima_via = None
+    for interseccion_numero in recomendacion.intersecciones:
+        interseccion = intersecciones[interseccion_numero]
+
+        vias = []
+        if ultima_via is not None:
+            vias.append(ultima_via)
+            for via in interseccion["conecta_con"]:
+                if via != ultima_via:
+                    vias.append(via)
+        else:
+            vias = list(interseccion["conecta_con"])
 
-    motor.run()
+        print(f"\t{interseccion_numero} ({vias})")
+        ultima_via = vias[-1]
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,599 @@
+"""
+Mediciones de rendimiento sobre ontologías sintéticas de distintos tamaños
+
+Las ontologías sintéticas son una cuadrícula de intersecciones unidas por calles (filas) y carreras
+(columnas), con tantas rutas aleatorias como se necesiten para llegar al número de tripletas pedido.
+Como razonar sobre grafos de cientos de miles de tripletas con owlrl toma demasiado tiempo, el
+ruido que agrega la clausura RDFS (tipos rdfs:Resource y tipos de las superclases) se agrega
+directamente.
+
+`medir_etapas` mide cada etapa del flujo completo (construcción de la ontología, razonamiento,
+generación de rutas, traducción, filtro por objetivo, declaración y ejecución del motor y cálculo de
+la fluidez difusa) sobre el mapa de Medellín o sobre una red sintética (`red_sintetica`); es lo que
+ejecuta `practica1 bench`.
+"""
+
+import platform
+import random
+import time
+import tracemalloc
+
+from rdflib import DC, RDF, RDFS, BNode, Graph, Literal, URIRef
+
+from practica1.ontologia import (
+    GEO,
+    RUTA,
+    agregar_esquema,
+    agregar_eventos,
+    agregar_intersecciones,
+    agregar_ruta_al_grafo,
+    agregar_semaforo,
+    agregar_via,
+    construir_grafo_vial,
+    intersecta,
+)
+
+
+# superclases de cada clase, agregadas como tipos al simular la clausura RDFS
+_SUPERCLASES = {
+    RUTA.Calle: (RUTA.Via, GEO.SpatialThing),
+    RUTA.Carrera: (RUTA.Via, GEO.SpatialThing),
+    RUTA.Interseccion: (RUTA.Nodo, GEO.SpatialThing),
+}
+
+
+def grafo_sintetico(tripletas: int, lado=30, semilla=0, ruido_rdfs=True, codificacion_rutas="coleccion") -> Graph:
+    """
+    Retorna una ontología sintética con al menos `tripletas` tripletas
+
+    Parámetros:
+        - tripletas: cantidad mínima de tripletas del grafo
+        - lado: la cuadrícula tiene lado x lado intersecciones
+        - semilla: semilla de las rutas aleatorias
+        - ruido_rdfs: si es True se agregan las tripletas que agregaría la clausura RDFS
+        - codificacion_rutas: codificación de las rutas (ver ConfigOntologia.codificacion_rutas)
+    """
+    rng = random.Random(semilla)
+    g = Graph()
+    g.bind("ruta", RUTA)
+    g.bind("geo", GEO)
+    agregar_esquema(g)
+
+    # intersecciones
+    nodos = {}
+    for i in range(lado):
+        for j in range(lado):
+            nodo = BNode()
+            nodos[i, j] = nodo
+            g.add((nodo, RDF.type, RUTA.Interseccion))
+            g.add((nodo, RUTA.numero, Literal(str(i * lado + j + 1))))
+
+    # una calle por fila y una carrera por columna, todas bidireccionales
+    calles = [_via_sintetica(g, rng, RUTA.Calle, f"Calle {i}") for i in range(lado)]
+    carreras = [_via_sintetica(g, rng, RUTA.Carrera, f"Carrera {j}") for j in range(lado)]
+    for i in range(lado):
+        for j in range(lado):
+            if j + 1 < lado:
+                _conectar(g, nodos[i, j], nodos[i, j + 1], calles[i])
+            if i + 1 < lado:
+                _conectar(g, nodos[i, j], nodos[i + 1, j], carreras[j])
+
+    # rutas aleatorias que avanzan hacia abajo o hacia la derecha
+    G = construir_grafo_vial(g)
+    numero_ruta = 0
+    while len(g) < (tripletas if not ruido_rdfs else tripletas // 2):
+        i, j = rng.randrange(lado - 1), rng.randrange(lado - 1)
+        ruta = [(nodos[i, j], None)]
+        for _ in range(rng.randint(2, 10)):
+            if i + 1 < lado and (j + 1 == lado or rng.random() < 0.5):
+                i += 1
+                ruta.append((nodos[i, j], carreras[j]))
+            elif j + 1 < lado:
+                j += 1
+                ruta.append((nodos[i, j], calles[i]))
+        numero_ruta += 1
+        agregar_ruta_al_grafo(g, ruta, numero_ruta, ruta[0][0], ruta[-1][0], codificacion_rutas, G)
+
+    if ruido_rdfs:
+        _agregar_ruido_rdfs(g, tripletas)
+
+    return g
+
+
+def _via_sintetica(g: Graph, rng: random.Random, clase: URIRef, nombre: str) -> URIRef:
+    via = RUTA[nombre.replace(" ", "")]
+    g.add((via, RDF.type, clase))
+    g.add((via, RUTA.nombre, Literal(nombre)))
+    g.add((via, RUTA.velocidadPromedio, Literal(float(rng.randint(20, 60)))))
+    g.add((via, RUTA.esBidireccional, Literal(True)))
+    g.add((via, RUTA.longitud, Literal(round(rng.uniform(0.2, 1.5), 2))))
+    return via
+
+
+def _conectar(g: Graph, nodo1: BNode, nodo2: BNode, via: URIRef):
+    for a, b in ((nodo1, nodo2), (nodo2, nodo1)):
+        g.add((a, RUTA.intersectaCon, b))
+        g.add((a, RUTA.conectaCon, via))
+        g.add((via, RUTA.esConectada, b))
+
+
+def _agregar_ruido_rdfs(g: Graph, tripletas: int):
+    """
+    Agrega los tipos que agregaría la clausura RDFS: rdfs:Resource para todos los recursos, las
+    superclases de cada instancia y rdf:List para los nodos de las colecciones
+    """
+    recursos = set()
+    for subj, pred, obj in g:
+        recursos.add(subj)
+        if not isinstance(obj, Literal):
+            recursos.add(obj)
+
+    ruido = []
+    for recurso in recursos:
+        ruido.append((recurso, RDF.type, RDFS.Resource))
+        for clase in g.objects(recurso, RDF.type):
+            for superclase in _SUPERCLASES.get(clase, ()):
+                ruido.append((recurso, RDF.type, superclase))
+    for lista in g.subjects(RDF.first, None):
+        ruido.append((lista, RDF.type, RDF.List))
+
+    for tripleta in ruido:
+        g.add(tripleta)
+
+    # si aún faltan tripletas se completan con tripletas que no son de instancias
+    while len(g) < tripletas:
+        g.add((BNode(), RDF.type, RDF.Property))
+
+
+# predicados en el orden en que los comparaba el `match` que había en `_traducir_campo` antes de la
+# tabla `_CAMPOS` (ver `traducir_referencia`)
+_ORDEN_MATCH = [
+    (RUTA, "nombre"), (RUTA, "tipo"), (RUTA, "via"), (RUTA, "afectaVia"), (RUTA, "seRelacionaCon"),
+    (RUTA, "conectaCon"), (RUTA, "esConectada"), (RUTA, "tiempoEspera"), (RUTA, "intersectaCon"),
+    (RUTA, "fluidez"), (RUTA, "velocidadPromedio"), (RUTA, "estaEnVia"), (RUTA, "esBidireccional"),
+    (DC, "title"), (RUTA, "tieneDistancia"), (RUTA, "tieneVias"), (RUTA, "tiempoEstimado"),
+    (RUTA, "cierreTotal"), (RUTA, "duracion"), (RUTA, "tieneNombre"), (RUTA, "origen"),
+    (RUTA, "destino"), (RUTA, "tieneNodos"), (RUTA, "numero"), (RUTA, "numeracion"),
+    (RUTA, "afectadaPor"), (RUTA, "longitud"),
+]
+
+
+def traducir_referencia(g: Graph) -> list:
+    """
+    Traducción como la hacía `traducir` antes de `tabla_tipos` y de la tabla `_CAMPOS`, que sirve de
+    línea base en `medir_traduccion`:
+        - se copian todas las tripletas, también las RDF.type con el ruido de la clausura
+        - los tipos de cada sujeto se resuelven uno por uno, sin caché
+        - cada predicado se compara con los casos del antiguo `match` en orden, resolviendo el
+          término del namespace en cada comparación
+    Los valores se traducen con las mismas funciones que usa `traducir`
+    """
+    from collections import defaultdict
+
+    from practica1.traductor_ontologia import _CAMPOS, _eventos_en_vias, _traducir_tipo
+
+    tripletas = defaultdict(lambda: defaultdict(set))
+    for subj, pred, obj in g:
+        tripletas[subj][pred].add(obj)
+
+    hechos = []
+    for datos in tripletas.values():
+        tipo_clase, tipo_campo = _traducir_tipo(datos.pop(RDF.type, set()))
+        if tipo_clase is None:
+            continue
+
+        campos = {}
+        for pred, objs in datos.items():
+            for namespace, termino in _ORDEN_MATCH:
+                if pred == getattr(namespace, termino):
+                    break
+            else:
+                raise Exception(f"se encontró un predicado desconocido: {pred}")
+            llave, traducir_valor = _CAMPOS[pred]
+            campos[llave] = traducir_valor(tripletas, objs)
+
+        hecho = tipo_clase(**campos)
+        if tipo_campo is not None:
+            hecho["tipo"] = tipo_campo
+        hechos.append(hecho)
+
+    hechos.extend(_eventos_en_vias(hechos))
+    return hechos
+
+
+def medir_traduccion(tamanos=(10_000, 100_000, 1_000_000), repeticiones=1, semilla=0) -> list[dict]:
+    """
+    Mide el tiempo de `traducir`, de `traducir_stream` y de la línea base `traducir_referencia`
+    sobre ontologías sintéticas de los tamaños dados (en tripletas). Retorna una lista de
+    diccionarios con las mediciones (en segundos) y la aceleración de `traducir` respecto a la línea
+    base. Lanza una excepción si la línea base no produce los mismos hechos que `traducir`
+    """
+    from practica1.traductor_ontologia import traducir, traducir_stream
+
+    resultados = []
+    for tamano in tamanos:
+        g = grafo_sintetico(tamano, semilla=semilla)
+        medicion = {"tripletas": len(g)}
+        traducidos = {}
+        for nombre, traductor in (
+            ("referencia", traducir_referencia),
+            ("traducir", traducir),
+            ("traducir_stream", lambda g: list(traducir_stream(g))),
+        ):
+            mejor = float("inf")
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                hechos = traductor(g)
+                mejor = min(mejor, time.perf_counter() - inicio)
+            medicion[nombre] = mejor
+            medicion["hechos"] = len(hechos)
+            traducidos[nombre] = hechos
+
+        if sorted(map(repr, traducidos["referencia"])) != sorted(map(repr, traducidos["traducir"])):
+            raise Exception(f"la línea base y traducir no producen los mismos hechos ({len(g)} tripletas)")
+        medicion["aceleracion"] = medicion["referencia"] / medicion["traducir"]
+        resultados.append(medicion)
+    return resultados
+
+
+def medir_generacion_rutas(lados=(10, 20), cutoff=6, repeticiones=3, semilla=21) -> list[dict]:
+    """
+    Compara `rutas_sin_repetir_vias` (recursiva) con `iterar_rutas_sin_repetir_vias` (iterativa
+    sobre un GrafoCSR) generando las rutas de todos los pares de intersecciones de los puntos de
+    referencia, en el mapa de Medellín y en las redes sintéticas de los `lados` dados.
+
+    Retorna por cada red el número de pares y de rutas, el mejor tiempo en segundos de cada
+    función (el de la iterativa incluye construir el GrafoCSR) y si ambas generaron las mismas rutas
+    en el mismo orden
+    """
+    from practica1.ontologia import (
+        GrafoCSR,
+        iterar_rutas_sin_repetir_vias,
+        mapa_puntos_referencia,
+        rutas_sin_repetir_vias,
+    )
+
+    resultados = []
+    for lado in (None, *lados):
+        g = construir_red(lado, semilla)
+        G = construir_grafo_vial(g)
+        mapa = mapa_puntos_referencia(g)
+        pares = [
+            (origen, destino)
+            for punto_origen, origenes in mapa.items()
+            for punto_destino, destinos in mapa.items()
+            if punto_origen != punto_destino
+            for origen in origenes
+            for destino in destinos
+            if origen != destino
+        ]
+
+        def recursiva():
+            return [rutas_sin_repetir_vias(G, origen, destino, cutoff) for origen, destino in pares]
+
+        def iterativa():
+            csr = GrafoCSR(G)
+            return [list(iterar_rutas_sin_repetir_vias(csr, origen, destino, cutoff)) for origen, destino in pares]
+
+        medicion = {"red": "medellin" if lado is None else f"cuadricula {lado}x{lado}", "pares": len(pares)}
+        rutas = {}
+        for nombre, funcion in (("recursiva", recursiva), ("iterativa", iterativa)):
+            mejor = float("inf")
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                rutas[nombre] = funcion()
+                mejor = min(mejor, time.perf_counter() - inicio)
+            medicion[nombre] = mejor
+        medicion["rutas"] = sum(map(len, rutas["recursiva"]))
+        medicion["iguales"] = rutas["recursiva"] == rutas["iterativa"]
+        resultados.append(medicion)
+    return resultados
+
+
+def medir_memoria_motor(rutas=100_000, vias=60, semilla=0, ejecutar=True) -> dict:
+    """
+    Mide con tracemalloc la memoria que ocupa el `Motor` al declarar `rutas` hechos Ruta sintéticos
+    (de 2 a 10 vías cada uno, elegidas entre `vias` vías) y, si `ejecutar` es True, al ejecutarlo.
+
+    Retorna un diccionario con la memoria (en bytes) total y por ruta de cada etapa. La memoria de
+    "motor" es la reservada por el código de sistema_experto (sin contar la red RETE de experta)
+    """
+    from practica1.sistema_experto import Motor, Ruta, Via
+
+    rng = random.Random(semilla)
+    hechos_vias = [
+        Via(nombre=f"Via {i}", velocidad_promedio=float(rng.randint(20, 60)), longitud=rng.uniform(0.2, 1.5))
+        for i in range(vias)
+    ]
+    nombres_vias = [hecho["nombre"] for hecho in hechos_vias]
+    numeros = [str(numero) for numero in range(1000)]
+    hechos_rutas = []
+    for numero in range(rutas):
+        cantidad = rng.randint(2, 10)
+        nombres = [nombres_vias[rng.randrange(vias)] for _ in range(cantidad)]
+        nodos = [numeros[rng.randrange(1000)] for _ in range(cantidad + 1)]
+        hechos_rutas.append(
+            Ruta(numeracion=f"Ruta{numero}", vias=nombres, tiene_nodos=nodos, origen=nodos[0], destino=nodos[-1])
+        )
+
+    medicion = {"rutas": rutas}
+    tracemalloc.start()
+    motor = Motor()
+    motor.reset()
+    motor.declare(*hechos_vias)
+    del hechos_vias
+
+    antes = tracemalloc.take_snapshot()
+    motor.declare(*hechos_rutas)
+    del hechos_rutas
+    despues = tracemalloc.take_snapshot()
+    _agregar_memoria(medicion, "declarar", despues.compare_to(antes, "filename"), rutas)
+
+    if ejecutar:
+        inicio = time.perf_counter()
+        motor.run()
+        medicion["ejecutar_segundos"] = time.perf_counter() - inicio
+        final = tracemalloc.take_snapshot()
+        _agregar_memoria(medicion, "total", final.compare_to(antes, "filename"), rutas)
+    tracemalloc.stop()
+    return medicion
+
+
+def _agregar_memoria(medicion: dict, etapa: str, diferencias, rutas: int):
+    """
+    Agrega a `medicion` la memoria total y la del motor (sistema_experto.py) de una etapa, a partir
+    de las diferencias entre dos snapshots de tracemalloc agrupadas por archivo
+    """
+    total = sum(diferencia.size_diff for diferencia in diferencias)
+    motor = sum(
+        diferencia.size_diff
+        for diferencia in diferencias
+        if diferencia.traceback[0].filename.endswith("sistema_experto.py")
+    )
+    medicion[f"{etapa}_bytes_por_ruta"] = total / rutas
+    medicion[f"{etapa}_motor_bytes_por_ruta"] = motor / rutas
+
+
+# puntos de referencia de las redes sintéticas (ver `red_sintetica`)
+ORIGEN_SINTETICO = "Origen sintético"
+DESTINO_SINTETICO = "Destino sintético"
+
+
+def red_sintetica(lado: int, semilla=21) -> Graph:
+    """
+    Retorna una ontología sin razonar ni rutas con una red vial en cuadrícula de lado x lado
+    intersecciones, construida con las mismas funciones que el mapa de Medellín: cada cuadra es una
+    vía bidireccional (calle o carrera) con sus eventos aleatorios, una de cada cuatro cuadras tiene
+    semáforo y hay dos puntos de referencia, ORIGEN_SINTETICO en la esquina (0, 0) y
+    DESTINO_SINTETICO a 2 cuadras en diagonal (a 4 vías, con rutas de hasta 6 por el cutoff), cada uno
+    relacionado con dos intersecciones
+
+    Parámetros:
+        - lado: número de intersecciones por lado de la cuadrícula (al menos 2)
+        - semilla: semilla de los eventos, velocidades, longitudes y semáforos
+    """
+    if lado < 2:
+        raise ValueError("la cuadrícula debe tener al menos 2 intersecciones por lado")
+
+    rng = random.Random(semilla)
+    g = Graph()
+    g.bind("ruta", RUTA)
+    g.bind("geo", GEO)
+    agregar_esquema(g)
+    agregar_eventos(g)
+
+    intersecciones = agregar_intersecciones(g, lado * lado)
+    nodos = {(i, j): intersecciones[f"Interseccion{i * lado + j + 1}"] for i in range(lado) for j in range(lado)}
+
+    cuadras = 0
+    for i in range(lado):
+        for j in range(lado):
+            for vecino, clase, nombre in (
+                ((i, j + 1), RUTA.Calle, f"Calle {i} tramo {j}"),
+                ((i + 1, j), RUTA.Carrera, f"Carrera {j} tramo {i}"),
+            ):
+                if vecino not in nodos:
+                    continue
+                via = RUTA[nombre.replace(" ", "")]
+                agregar_via(g, rng, via, clase, nombre, (20, 60), True, round(rng.uniform(0.1, 0.5), 2))
+                intersecta(g, nodos[i, j], nodos[vecino], via)
+                if cuadras % 4 == 0:
+                    agregar_semaforo(g, via, float(rng.randint(20, 90)))
+                cuadras += 1
+
+    distancia = min(lado - 1, 2)
+    for punto, nombre, esquinas in (
+        (RUTA.OrigenSintetico, ORIGEN_SINTETICO, ((0, 0), (0, 1))),
+        (RUTA.DestinoSintetico, DESTINO_SINTETICO, ((distancia, distancia), (distancia, distancia - 1))),
+    ):
+        g.add((punto, RDF.type, RUTA.PuntoReferencia))
+        g.add((punto, RUTA.tieneNombre, Literal(nombre)))
+        for esquina in esquinas:
+            g.add((punto, RUTA.seRelacionaCon, nodos[esquina]))
+
+    return g
+
+
+def construir_red(lado: int | None, semilla=21) -> Graph:
+    """
+    Retorna la ontología sin razonar ni rutas del mapa de Medellín (si `lado` es None) o de
+    `red_sintetica(lado, semilla)`
+    """
+    from practica1.ontologia import ConfigOntologia, construir_ontologia
+
+    if lado is None:
+        return construir_ontologia(ConfigOntologia(semilla=semilla, razonar=False, generar_rutas=False))
+    return red_sintetica(lado, semilla)
+
+
+def comparar_razonadores(lado: int | None = None, semilla=21) -> list[dict]:
+    """
+    Razona la misma red (ver `construir_red`) con cada razonador de ConfigOntologia.razonador y
+    retorna por cada uno las tripletas antes y después de razonar, el tiempo en segundos y la
+    cantidad de hechos que produce `traducir`
+    """
+    from practica1.ontologia import razonar
+    from practica1.traductor_ontologia import traducir
+
+    resultados = []
+    for razonador in ("owlrl", "dirigido"):
+        g = construir_red(lado, semilla)
+        antes = len(g)
+        inicio = time.perf_counter()
+        razonar(g, razonador=razonador)
+        segundos = time.perf_counter() - inicio
+        resultados.append(
+            {
+                "razonador": razonador,
+                "tripletas_base": antes,
+                "tripletas": len(g),
+                "segundos": segundos,
+                "hechos": len(traducir(g)),
+            }
+        )
+    return resultados
+
+
+def medir_etapas(lado: int | None = None, semilla=21, memoria=True, k=3, razonador="owlrl") -> dict:
+    """
+    Mide cada etapa del flujo completo sobre el mapa de Medellín (si `lado` es None) o sobre
+    `red_sintetica(lado, semilla)`, consultando la ruta entre sus dos puntos de referencia
+
+    Parámetros:
+        - lado: lado de la red sintética, o None para usar el mapa de Medellín
+        - semilla: semilla de la ontología y de las congestiones aleatorias
+        - memoria: si es True se mide el pico de memoria de cada etapa con tracemalloc (hace más
+          lentas todas las etapas, así que los tiempos no son comparables con los medidos sin él)
+        - k: número de rutas recomendadas por el motor
+        - razonador: razonador de la etapa de razonamiento (ver ConfigOntologia.razonador)
+
+    Retorna un diccionario con la descripción de la red, el número de hechos por clase, las
+    activaciones del motor (creadas y disparadas, en total entre declarar y ejecutar) y, por cada
+    etapa, su tiempo en segundos, su pico de memoria en bytes (por encima de la memoria al iniciar
+    la etapa) y sus conteos. Las etapas "declarar" y "ejecutar" cuentan cada una sus activaciones
+    """
+    from practica1.ontologia import ConfigOntologia, GeneradorRutas, razonar
+    from practica1.sistema_experto import Motor, Objetivo, Semaforo, Via
+    from practica1.sistema_logica_difusa import calcular_fluidez_via
+    from practica1.traductor_ontologia import filtrar_por_objetivo, traducir
+
+    config = ConfigOntologia(semilla=semilla, razonar=False, generar_rutas=False, razonador=razonador)
+    if lado is None:
+        red = "medellin"
+        objetivo = Objetivo(desde="Universidad Nacional de Colombia", hasta="Estadio de Fútbol Atanasio Girardot")
+    else:
+        red = f"cuadricula {lado}x{lado}"
+        objetivo = Objetivo(desde=ORIGEN_SINTETICO, hasta=DESTINO_SINTETICO)
+
+    etapas = []
+
+    def medir(nombre, funcion, *args):
+        if memoria:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        etapa = {"etapa": nombre, "segundos": time.perf_counter() - inicio}
+        if memoria:
+            etapa["memoria_pico_bytes"] = tracemalloc.get_traced_memory()[1] - base
+        etapas.append(etapa)
+        return resultado, etapa
+
+    if memoria:
+        tracemalloc.start()
+    try:
+        g, etapa = medir("construccion", construir_red, lado, semilla)
+        etapa["tripletas"] = len(g)
+
+        _, etapa = medir("razonamiento", razonar, g, 0, razonador)
+        etapa["tripletas"] = len(g)
+
+        generador = GeneradorRutas(g, config)
+        rutas, etapa = medir("rutas", generador.rutas, objetivo["desde"], objetivo["hasta"])
+        etapa["rutas"] = len(rutas)
+        etapa["tripletas"] = len(g)
+
+        hechos, etapa = medir("traduccion", traducir, g)
+        etapa["hechos"] = len(hechos)
+        conteo_hechos = {}
+        for hecho in hechos:
+            conteo_hechos[type(hecho).__name__] = conteo_hechos.get(type(hecho).__name__, 0) + 1
+
+        (hechos, resumen), etapa = medir("filtro", filtrar_por_objetivo, hechos, objetivo)
+        etapa["hechos"] = len(hechos)
+        etapa["hechos_evitados"] = resumen.hechos_evitados
+
+        motor = Motor(k=k)
+        motor.reset()
+        # experta también crea activaciones al declarar, así que cada etapa reporta las suyas
+        activaciones = _contar_activaciones(motor)
+        _, etapa = medir("declarar", lambda: motor.declare(*hechos, objetivo))
+        etapa["hechos"] = len(motor.facts)
+        etapa.update(activaciones)
+        al_declarar = dict(activaciones)
+
+        random.seed(semilla)
+        recomendaciones, etapa = medir("ejecutar", motor.run)
+        etapa["recomendaciones"] = len(recomendaciones)
+        etapa.update({llave: activaciones[llave] - al_declarar[llave] for llave in activaciones})
+
+        # fluidez difusa de cada vía con una congestión aleatoria, como en las reglas del motor
+        rng = random.Random(semilla)
+        esperas = {}
+        for hecho in hechos:
+            if isinstance(hecho, Semaforo):
+                esperas[hecho["via"]] = esperas.get(hecho["via"], 0) + hecho["tiempo_espera"]
+        entradas = [
+            (rng.randint(0, 100), hecho["velocidad_promedio"], esperas.get(hecho["nombre"], 0))
+            for hecho in hechos
+            if isinstance(hecho, Via)
+        ]
+        _, etapa = medir("fluidez", lambda: [calcular_fluidez_via(*entrada) for entrada in entradas])
+        etapa["vias"] = len(entradas)
+    finally:
+        if memoria:
+            tracemalloc.stop()
+
+    return {
+        "red": red,
+        "semilla": semilla,
+        "razonador": razonador,
+        "python": platform.python_version(),
+        "memoria_medida": memoria,
+        "hechos": conteo_hechos,
+        "activaciones": dict(activaciones),
+        "etapas": etapas,
+    }
+
+
+def _contar_activaciones(motor) -> dict:
+    """
+    Cuenta las activaciones que crea y dispara `motor` desde este momento, envolviendo en la
+    instancia los métodos de experta que actualizan la agenda. `get_activations` se consulta tanto
+    en `declare` (y `retract`) como en `run`, así que las activaciones creadas incluyen las de los
+    hechos declarados después de llamar esta función. Retorna el diccionario de conteos, que se
+    actualiza mientras se usa el motor
+    """
+    conteo = {"activaciones_creadas": 0, "activaciones_disparadas": 0}
+    get_activations = motor.get_activations
+    get_next = motor.agenda.get_next
+
+    def contar_creadas():
+        agregadas, eliminadas = get_activations()
+        conteo["activaciones_creadas"] += len(agregadas)
+        return agregadas, eliminadas
+
+    def contar_disparadas():
+        activacion = get_next()
+        if activacion is not None:
+            conteo["activaciones_disparadas"] += 1
+        return activacion
+
+    motor.get_activations = contar_creadas
+    motor.agenda.get_next = contar_disparadas
+    return conteo
+
+
+if __name__ == "__main__":
+    for medicion in medir_traduccion():
+        print(medicion)
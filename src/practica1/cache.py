@@ -0,0 +1,38 @@
+"""
+Utilidades para guardar en disco resultados costosos de calcular
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+
+def directorio_cache() -> Path:
+    """
+    Retorna el directorio donde se guardan los archivos de caché, creándolo si no existe.
+
+    Se usa la variable de entorno PRACTICA1_CACHE si está definida, de lo contrario
+    $XDG_CACHE_HOME/practica1 (o ~/.cache/practica1).
+    """
+    directorio = os.environ.get("PRACTICA1_CACHE")
+    if directorio is None:
+        base = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+        directorio = Path(base) / "practica1"
+
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    return directorio
+
+
+def huella(*partes: bytes | str) -> str:
+    """
+    Retorna un hash (sha256 en hexadecimal) del contenido de `partes`, usado como llave de caché
+    """
+    h = hashlib.sha256()
+    for parte in partes:
+        if isinstance(parte, str):
+            parte = parte.encode("utf-8")
+        h.update(parte)
+        # separador para que ("ab", "c") y ("a", "bc") tengan huellas distintas
+        h.update(b"\0")
+    return h.hexdigest()
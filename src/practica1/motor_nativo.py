@@ -0,0 +1,552 @@
+"""
+Motor nativo de recomendación de rutas
+
+Calcula los mismos ajustes de tiempo por vía que las reglas del `Motor` de experta (tiempo base,
+fluidez, semáforos, eventos y bonificación bidireccional), sin pasar por la red RETE, y con ellos
+puntúa todas las rutas a la vez sobre arreglos de NumPy. El `Motor` de experta sigue disponible para
+explicar la recomendación; `verificar_paridad` compara ambos.
+
+En el `Motor` los ajustes de una vía tienen la misma salience, así que experta los aplica en el
+orden de su estrategia (DepthStrategy): primero el del hecho declarado más recientemente. Por eso el
+`MotorNativo` guarda la posición de cada hecho y supone que se declaran en el orden de `hechos`.
+
+Los eventos y la fluidez se pueden declarar o retractar uno a uno (`declarar_evento`,
+`retractar_fluidez`, ...): solo se recalculan las vías afectadas y las rutas que pasan por ellas, y
+la recomendación para el objetivo del motor se lee de montículos en los que solo se agregan esas
+rutas.
+"""
+
+import heapq
+import random
+import time
+from collections import defaultdict
+from math import inf
+from typing import Sequence
+
+import networkx as nx
+import numpy as np
+from experta import Fact
+
+from practica1.sistema_experto import (
+    FACTORES_FLUIDEZ,
+    Actualizacion,
+    Evento,
+    EventoEnVia,
+    Fluidez,
+    Motor,
+    Nodo,
+    Objetivo,
+    Recomendacion,
+    Ruta,
+    Semaforo,
+    TiempoVia,
+    Via,
+)
+from practica1.sistema_logica_difusa import calcular_fluidez_lote
+
+
+class MotorNativo:
+    """
+    Motor de recomendación que trabaja directamente sobre arreglos
+
+    Parámetros:
+        - hechos: hechos traducidos de la ontología (los mismos que se declaran en el `Motor`, en el
+          mismo orden)
+        - fluidez: diccionario {nombre de la vía: fluidez}. Si es None la fluidez de cada vía se
+          calcula con el sistema difuso a partir de una congestión aleatoria, igual que en las
+          reglas calcular_fluidez_con_semaforo/calcular_fluidez_sin_semaforo. Como en el `Motor`,
+          la fluidez se considera declarada después de todos los hechos
+        - semilla: semilla de la congestión aleatoria usada cuando `fluidez` es None
+        - objetivo: objetivo usado por defecto en `recomendar` y en las actualizaciones incrementales
+    """
+
+    def __init__(self, hechos: Sequence[Fact], fluidez=None, semilla=42, objetivo=None):
+        vias = {}
+        rutas = []
+        self.eventos = {}
+        self._puntos_de_referencia = {}
+        self._intersecciones = {}
+
+        # posición de los hechos que ajustan el tiempo de cada vía (ver `_tiempo_via`). Los hechos
+        # repetidos conservan la posición del primero, pues experta ignora los que ya existen
+        posiciones_via = {}
+        semaforos = defaultdict(dict)
+        eventos_en_via = defaultdict(dict)
+        for posicion, hecho in enumerate(hechos):
+            if isinstance(hecho, Via):
+                vias[hecho["nombre"]] = hecho
+                posiciones_via[hecho["nombre"]] = posicion
+            elif isinstance(hecho, Semaforo):
+                semaforos[hecho["via"]].setdefault(hecho["tiempo_espera"], posicion)
+            elif isinstance(hecho, Evento):
+                self.eventos[hecho["tipo"]] = hecho
+            elif isinstance(hecho, EventoEnVia):
+                llave = (hecho["tipo"], hecho["duracion"], hecho["cierre_total"])
+                eventos_en_via[hecho["via"]].setdefault(llave, posicion)
+            elif isinstance(hecho, Ruta):
+                rutas.append(hecho)
+            elif isinstance(hecho, Nodo):
+                if "nombre" in hecho:
+                    self._puntos_de_referencia[hecho["nombre"]] = hecho
+                elif "numero" in hecho:
+                    self._intersecciones[hecho["numero"]] = hecho
+
+        # arreglos por vía (el índice de cada vía es su posición en `self.nombres_via`)
+        self.nombres_via = list(vias)
+        self.indice_via = {nombre: i for i, nombre in enumerate(self.nombres_via)}
+        n = len(self.nombres_via)
+        self.longitud = np.array([vias[v]["longitud"] for v in self.nombres_via], dtype=np.float64)
+        self.velocidad = np.array([vias[v]["velocidad_promedio"] for v in self.nombres_via], dtype=np.float64)
+        self.bidireccional = np.array([bool(vias[v].get("es_bidireccional", False)) for v in self.nombres_via])
+        self.tiene_semaforo = np.array([v in semaforos for v in self.nombres_via])
+        self._posicion_via = [posiciones_via[v] for v in self.nombres_via]
+
+        # como en agregar_tiempos_semaforos, solo se aplica un semáforo por vía: el más reciente
+        self._semaforo = [
+            max((posicion, espera) for espera, posicion in semaforos[v].items()) if v in semaforos else None
+            for v in self.nombres_via
+        ]
+
+        # los eventos pueden declararse y retractarse (ver `declarar_evento`), por lo que se guardan
+        # los EventoEnVia de cada vía ({(tipo, duracion, cierre_total): posición}) y qué vías afecta
+        # cada tipo de evento
+        self._eventos_en_via = [eventos_en_via[v] for v in self.nombres_via]
+        self.vias_por_evento = defaultdict(list)
+        for i, v in enumerate(self.nombres_via):
+            for tipo in vias[v].get("afectada_por", []):
+                self.vias_por_evento[tipo].append(i)
+        self.cerrada = np.zeros(n, dtype=bool)
+        for i in range(n):
+            self._aplicar_eventos(i)
+
+        if fluidez is None:
+            fluidez = self._calcular_fluidez(semilla)
+        self.fluidez = dict(fluidez)
+        self._posicion_fluidez = {via: len(hechos) + j for j, via in enumerate(self.fluidez)}
+        self._siguiente_posicion = len(hechos) + len(self.fluidez)
+
+        # rutas en una matriz con una fila por ruta y una columna por posición de vía. Las filas se
+        # rellenan con el índice n + 1 y las vías desconocidas tienen el índice n (ver `_sumar_por_ruta`)
+        self.rutas = rutas
+        self.numeraciones = [ruta["numeracion"] for ruta in rutas]
+        ancho = max((len(ruta["vias"]) for ruta in rutas), default=0)
+        self.matriz_vias = np.full((len(rutas), ancho), n + 1, dtype=np.intp)
+        for r, ruta in enumerate(rutas):
+            self.matriz_vias[r, : len(ruta["vias"])] = [self.indice_via.get(v, n) for v in ruta["vias"]]
+
+        # índice inverso: rutas que pasan por cada vía
+        rutas_por_via = defaultdict(list)
+        for r in range(len(rutas)):
+            for i in self.matriz_vias[r]:
+                rutas_por_via[int(i)].append(r)
+        self.rutas_por_via = {i: np.unique(rs) for i, rs in rutas_por_via.items() if i < n}
+
+        # estado que se mantiene al declarar o retractar eventos y fluidez
+        self.distancias = self._sumar_por_ruta(self.longitud)
+        self.tiempos_via = self.calcular_tiempos_via()
+        self.tiempos_ruta = self._sumar_por_ruta(self.tiempos_via)
+        self.objetivo = objetivo
+        self._rutas_objetivo = {}
+
+        # montículos con las parejas (tiempo, ruta) y (distancia, ruta) de las rutas vivas del
+        # objetivo del motor (ver `_preparar_monticulos`)
+        self._llave_monticulos = None
+        self._monticulo_tiempos = []
+        self._monticulo_distancias = []
+
+    def _calcular_fluidez(self, semilla) -> dict[str, str]:
+        """
+        Calcula la fluidez de las vías abiertas con el sistema difuso, en un solo lote
+        """
+        rng = random.Random(semilla)
+        abiertas = [i for i in range(len(self.nombres_via)) if not self.cerrada[i]]
+        congestiones = [rng.randint(0, 100) for _ in abiertas]
+        esperas = [rng.randint(30, 120) if self.tiene_semaforo[i] else 0 for i in abiertas]
+        _, etiquetas = calcular_fluidez_lote(congestiones, self.velocidad[abiertas], esperas)
+        return {self.nombres_via[i]: str(etiqueta) for i, etiqueta in zip(abiertas, etiquetas)}
+
+    def _aplicar_eventos(self, i):
+        """
+        Recalcula el cierre de la vía `i` a partir de sus EventoEnVia
+        """
+        self.cerrada[i] = any(cierre_total for _, _, cierre_total in self._eventos_en_via[i])
+
+    def _nueva_posicion(self) -> int:
+        """
+        Retorna la posición de un hecho declarado después de todos los anteriores
+        """
+        posicion = self._siguiente_posicion
+        self._siguiente_posicion += 1
+        return posicion
+
+    def _tiempo_via(self, i) -> float:
+        """
+        Calcula el tiempo de la vía `i` con las mismas operaciones, y en el mismo orden, que las reglas
+        del `Motor`: como los ajustes tienen la misma salience, se aplica primero el del hecho más
+        reciente (la fluidez, que se declara al ejecutar el motor, suele ir primero)
+        """
+        fluidez = self.fluidez.get(self.nombres_via[i])
+        if self.cerrada[i] or fluidez == "nula":
+            return inf
+
+        ajustes = []
+        factor = FACTORES_FLUIDEZ.get(fluidez, 1.0)
+        if factor != 1.0:
+            ajustes.append((self._posicion_fluidez[self.nombres_via[i]], "fluidez", factor))
+        if self._semaforo[i] is not None:
+            posicion, espera = self._semaforo[i]
+            ajustes.append((posicion, "semaforo", espera))
+        if self._eventos_en_via[i]:
+            # como en agregar_tiempos_eventos, solo se aplica un evento por vía: el más reciente
+            (_, duracion, _), posicion = max(self._eventos_en_via[i].items(), key=lambda par: par[1])
+            ajustes.append((posicion, "evento", duracion))
+        if self.bidireccional[i]:
+            ajustes.append((self._posicion_via[i], "bidireccional", 0.9))
+
+        tiempo = float(self.longitud[i]) / float(self.velocidad[i])
+        for _, ajuste, valor in sorted(ajustes, reverse=True):
+            match ajuste:
+                case "fluidez" | "bidireccional":
+                    tiempo = tiempo * valor
+                case "semaforo":
+                    tiempo = tiempo + (valor / 60 / 60)
+                case "evento":
+                    tiempo = tiempo + (valor / 60)
+        return tiempo
+
+    def vias_eliminadas(self) -> np.ndarray:
+        """
+        Retorna un arreglo booleano con las vías eliminadas por un cierre total o por fluidez nula
+        """
+        nula = np.array([self.fluidez.get(v) == "nula" for v in self.nombres_via], dtype=bool)
+        return self.cerrada | nula
+
+    def calcular_tiempos_via(self) -> np.ndarray:
+        """
+        Retorna el tiempo estimado en horas de cada vía (inf para las vías eliminadas), ver
+        `_tiempo_via`
+        """
+        return np.array([self._tiempo_via(i) for i in range(len(self.nombres_via))], dtype=np.float64)
+
+    def _sumar_por_ruta(self, valores_via: np.ndarray, rutas=slice(None)) -> np.ndarray:
+        """
+        Suma, para cada ruta (o solo para las rutas `rutas`), los valores de sus vías. Las columnas
+        se suman de izquierda a derecha, en el mismo orden que calcular_distancia_rutas y
+        calcular_tiempo_ruta, así que el resultado es idéntico al del `Motor`
+        """
+        # índice n: vía desconocida (inf), índice n + 1: relleno (0)
+        valores = np.concatenate([valores_via, [np.inf, 0.0]])
+        matriz = self.matriz_vias[rutas]
+        sumas = np.zeros(len(matriz))
+        for columna in matriz.T:
+            sumas = sumas + valores[columna]
+        return sumas
+
+    def _rutas_del_objetivo(self, objetivo: Objetivo) -> np.ndarray:
+        """
+        Retorna un arreglo booleano con las rutas que inician y terminan en los puntos del objetivo
+        (ver las reglas ruta_que_no_inicia_en_objetivo y ruta_que_no_termina_en_objetivo)
+        """
+        llave = (objetivo.get("desde"), objetivo.get("hasta"))
+        if llave in self._rutas_objetivo:
+            return self._rutas_objetivo[llave]
+
+        sirven = np.ones(len(self.rutas), dtype=bool)
+        desde = self._puntos_de_referencia.get(llave[0])
+        hasta = self._puntos_de_referencia.get(llave[1])
+        for i, ruta in enumerate(self.rutas):
+            if desde is not None and ruta["origen"] not in desde["se_relaciona_con"]:
+                sirven[i] = False
+            if hasta is not None and ruta["destino"] not in hasta["se_relaciona_con"]:
+                sirven[i] = False
+        self._rutas_objetivo[llave] = sirven
+        return sirven
+
+    def _recomendaciones(self, rutas) -> list[Recomendacion]:
+        return [
+            Recomendacion(
+                ruta=self.numeraciones[r],
+                tiempo_estimado=float(self.tiempos_ruta[r]),
+                distancia=float(self.distancias[r]),
+                vias=list(self.rutas[r]["vias"]),
+                intersecciones=list(self.rutas[r]["tiene_nodos"]),
+            )
+            for r in rutas
+        ]
+
+    def recomendar(self, objetivo: Objetivo | None = None, k=1) -> list[Recomendacion]:
+        """
+        Retorna las `k` mejores rutas para el objetivo (por defecto `self.objetivo`), de la más
+        rápida a la más lenta. Para `self.objetivo` se usan los montículos que mantienen las
+        actualizaciones; para otro objetivo se recorren todas las rutas (ver `recomendar_recorriendo`)
+        """
+        if objetivo is None or self._llave(objetivo) == self._llave(self.objetivo):
+            return self._recomendar_con_monticulos(k)
+        return self.recomendar_recorriendo(objetivo, k)
+
+    def recomendar_recorriendo(self, objetivo: Objetivo | None = None, k=1) -> list[Recomendacion]:
+        """
+        Igual que `recomendar`, pero recorriendo todas las rutas
+        """
+        objetivo = objetivo if objetivo is not None else self.objetivo
+        tiempos = self.tiempos_ruta
+        distancias = self.distancias
+
+        vivas = self._rutas_del_objetivo(objetivo) & np.isfinite(tiempos)
+        if not vivas.any():
+            return []
+
+        # se eliminan las rutas 3 veces más largas que la más corta (regla eliminar_rutas_muy_largas)
+        vivas &= distancias <= 3 * distancias[vivas].min()
+
+        candidatas = np.flatnonzero(vivas)
+        return self._recomendaciones(candidatas[np.argsort(tiempos[candidatas], kind="stable")][:k])
+
+    @staticmethod
+    def _llave(objetivo: Objetivo | None):
+        return None if objetivo is None else (objetivo.get("desde"), objetivo.get("hasta"))
+
+    def _preparar_monticulos(self):
+        """
+        Construye los montículos de las rutas vivas (con tiempo finito) de `self.objetivo`, si no
+        existen o si el objetivo cambió
+        """
+        llave = self._llave(self.objetivo)
+        if llave == self._llave_monticulos:
+            return
+        rutas = np.flatnonzero(self._rutas_del_objetivo(self.objetivo) & np.isfinite(self.tiempos_ruta))
+        self._monticulo_tiempos = list(zip(self.tiempos_ruta[rutas].tolist(), rutas.tolist()))
+        self._monticulo_distancias = list(zip(self.distancias[rutas].tolist(), rutas.tolist()))
+        heapq.heapify(self._monticulo_tiempos)
+        heapq.heapify(self._monticulo_distancias)
+        self._llave_monticulos = llave
+
+    def _actualizar_monticulos(self, rutas: np.ndarray, tiempos_anteriores: np.ndarray):
+        """
+        Agrega a los montículos las rutas `rutas` del objetivo cuyo tiempo cambió. Las parejas
+        anteriores no se sacan: se descartan al leer los montículos, pues su tiempo ya no coincide
+        con `self.tiempos_ruta` (o la ruta ya no está viva)
+        """
+        if self._llave_monticulos is None or self._llave_monticulos != self._llave(self.objetivo):
+            return
+        tiempos = self.tiempos_ruta[rutas]
+        vivas = self._rutas_del_objetivo(self.objetivo)[rutas] & np.isfinite(tiempos)
+        for tiempo, r in zip(tiempos[vivas].tolist(), rutas[vivas].tolist()):
+            heapq.heappush(self._monticulo_tiempos, (tiempo, r))
+
+        # las rutas que vuelven a estar vivas se agregan de nuevo al montículo de distancias
+        revividas = vivas & ~np.isfinite(tiempos_anteriores)
+        for r in rutas[revividas].tolist():
+            heapq.heappush(self._monticulo_distancias, (float(self.distancias[r]), r))
+
+        # si las parejas descartadas se acumulan, se reconstruyen los montículos
+        if len(self._monticulo_tiempos) > 4 * len(self.rutas) + 64:
+            self._llave_monticulos = None
+            self._preparar_monticulos()
+
+    def _recomendar_con_monticulos(self, k) -> list[Recomendacion]:
+        """
+        Retorna las `k` mejores rutas para `self.objetivo` leyendo los montículos
+        """
+        if self.objetivo is None:
+            return []
+        self._preparar_monticulos()
+
+        # la menor distancia entre las rutas vivas (regla eliminar_rutas_muy_largas)
+        distancias = self._monticulo_distancias
+        while distancias and not np.isfinite(self.tiempos_ruta[distancias[0][1]]):
+            heapq.heappop(distancias)
+        if not distancias:
+            return []
+        limite = 3 * distancias[0][0]
+
+        mejores = []
+        sacadas = []
+        vistas = set()
+        tiempos = self._monticulo_tiempos
+        while tiempos and len(mejores) < k:
+            tiempo, r = heapq.heappop(tiempos)
+            # se descartan los tiempos reemplazados y las parejas repetidas
+            if tiempo != self.tiempos_ruta[r] or r in vistas:
+                continue
+            vistas.add(r)
+            sacadas.append((tiempo, r))
+            if self.distancias[r] <= limite:
+                mejores.append(r)
+
+        # las rutas sacadas siguen vivas, se devuelven al montículo
+        for pareja in sacadas:
+            heapq.heappush(tiempos, pareja)
+        return self._recomendaciones(mejores)
+
+    def _actualizar_vias(self, vias: Sequence[int], inicio: float, k=1) -> Actualizacion:
+        """
+        Recalcula el tiempo de las vías `vias` y el de las rutas que pasan por ellas, y lee la
+        recomendación para `self.objetivo` de los montículos
+        """
+        # como en el `Motor`, la fluidez de las vías actualizadas se declara otra vez y queda como el
+        # hecho más reciente, igual que al construir el motor desde cero
+        for i in vias:
+            if self.nombres_via[i] in self._posicion_fluidez:
+                self._posicion_fluidez[self.nombres_via[i]] = self._nueva_posicion()
+
+        vias_cambiadas = []
+        for i in vias:
+            tiempo = self._tiempo_via(i)
+            if tiempo != self.tiempos_via[i]:
+                self.tiempos_via[i] = tiempo
+                vias_cambiadas.append(i)
+
+        rutas = set()
+        for i in vias_cambiadas:
+            rutas.update(self.rutas_por_via.get(i, ()).tolist())
+        rutas = np.fromiter(rutas, dtype=np.intp, count=len(rutas))
+        tiempos_anteriores = self.tiempos_ruta[rutas]
+        self.tiempos_ruta[rutas] = self._sumar_por_ruta(self.tiempos_via, rutas)
+        self._actualizar_monticulos(rutas, tiempos_anteriores)
+
+        recomendacion = self._recomendar_con_monticulos(k) if self.objetivo is not None else None
+        return Actualizacion(
+            vias=[self.nombres_via[i] for i in vias_cambiadas],
+            rutas=len(rutas),
+            recomendacion=recomendacion,
+            latencia=time.perf_counter() - inicio,
+        )
+
+    def _quitar_eventos_en_via(self, tipo: str) -> list[int]:
+        """
+        Quita los EventoEnVia del tipo dado y retorna las vías que este tipo de evento afecta
+        """
+        vias = self.vias_por_evento.get(tipo, [])
+        for i in vias:
+            for llave in [llave for llave in self._eventos_en_via[i] if llave[0] == tipo]:
+                del self._eventos_en_via[i][llave]
+        return vias
+
+    def declarar_evento(self, evento: Evento, k=1) -> Actualizacion:
+        """
+        Declara un evento (reemplazando otro del mismo tipo si existe), con un EventoEnVia por cada
+        vía que este afecta, y actualiza solo esas vías
+        """
+        inicio = time.perf_counter()
+        self.eventos[evento["tipo"]] = evento
+        vias = self._quitar_eventos_en_via(evento["tipo"])
+        for i in vias:
+            llave = (evento["tipo"], evento["duracion"], evento["cierre_total"])
+            self._eventos_en_via[i][llave] = self._nueva_posicion()
+            self._aplicar_eventos(i)
+        return self._actualizar_vias(vias, inicio, k)
+
+    def retractar_evento(self, tipo: str, k=1) -> Actualizacion:
+        """
+        Retracta el evento de tipo `tipo` (y sus EventoEnVia) y actualiza solo las vías que este
+        afectaba
+        """
+        inicio = time.perf_counter()
+        self.eventos.pop(tipo, None)
+        vias = self._quitar_eventos_en_via(tipo)
+        for i in vias:
+            self._aplicar_eventos(i)
+        return self._actualizar_vias(vias, inicio, k)
+
+    def declarar_fluidez(self, fluidez: Fluidez, k=1) -> Actualizacion:
+        """
+        Declara (o reemplaza) la fluidez de una vía y la actualiza
+        """
+        inicio = time.perf_counter()
+        self.fluidez[fluidez["via"]] = fluidez["fluidez"]
+        self._posicion_fluidez[fluidez["via"]] = self._nueva_posicion()
+        return self._actualizar_vias([self.indice_via[fluidez["via"]]], inicio, k)
+
+    def retractar_fluidez(self, via: str, k=1) -> Actualizacion:
+        """
+        Retracta la fluidez de una vía (su tiempo deja de ajustarse por fluidez) y la actualiza
+        """
+        inicio = time.perf_counter()
+        self.fluidez.pop(via, None)
+        self._posicion_fluidez.pop(via, None)
+        return self._actualizar_vias([self.indice_via[via]], inicio, k)
+
+    def ruta_mas_rapida_en_grafo(self, G: nx.DiGraph, objetivo: Objetivo) -> Recomendacion | None:
+        """
+        Busca con Dijkstra la ruta más rápida sobre el grafo vial `G` (ver
+        `ontologia.construir_grafo_vial`) usando los tiempos por vía de este motor.
+
+        A diferencia de `recomendar`, no se limita a las rutas generadas: puede repetir vías y no
+        tiene límite de longitud.
+        """
+        tiempos_via = self.tiempos_via
+        por_numero = {datos["numero"]: nodo for nodo, datos in G.nodes(data=True)}
+        origenes = [por_numero[n] for n in self._puntos_de_referencia[objetivo["desde"]]["se_relaciona_con"]]
+        destinos = {por_numero[n] for n in self._puntos_de_referencia[objetivo["hasta"]]["se_relaciona_con"]}
+
+        def peso(_u, _v, datos):
+            i = self.indice_via.get(datos["nombre"])
+            if i is None or not np.isfinite(tiempos_via[i]):
+                return None  # las aristas con peso None se ignoran
+            return tiempos_via[i]
+
+        tiempos, caminos = nx.multi_source_dijkstra(G, origenes, weight=peso)
+        alcanzables = [d for d in destinos if d in tiempos]
+        if not alcanzables:
+            return None
+
+        destino = min(alcanzables, key=lambda d: tiempos[d])
+        camino = caminos[destino]
+        vias = [G[a][b]["nombre"] for a, b in zip(camino, camino[1:])]
+        return Recomendacion(
+            ruta=None,
+            tiempo_estimado=float(tiempos[destino]),
+            distancia=sum(G[a][b]["longitud"] for a, b in zip(camino, camino[1:])),
+            vias=vias,
+            intersecciones=[G.nodes[n]["numero"] for n in camino],
+        )
+
+
+def verificar_paridad(hechos: Sequence[Fact], objetivo: Objetivo, k=1, tolerancia=1e-9) -> list[str]:
+    """
+    Ejecuta el `Motor` de experta y el `MotorNativo` sobre los mismos hechos y retorna una lista
+    con las diferencias encontradas (vacía si ambos coinciden). El `MotorNativo` usa la fluidez
+    calculada por el `Motor`, pues esta depende de una congestión aleatoria. Se comparan las `k`
+    rutas recomendadas.
+    """
+    motor = Motor(k=k)
+    motor.reset()
+    motor.declare(*hechos)
+    motor.declare(Objetivo(**objetivo.as_dict()))
+    recomendaciones_experta = motor.run()
+
+    hechos_finales = list(motor.facts.values())
+    fluidez = {h["via"]: h["fluidez"] for h in hechos_finales if isinstance(h, Fluidez)}
+    nativo = MotorNativo(hechos, fluidez=fluidez)
+
+    diferencias = []
+
+    # tiempos por vía
+    tiempos_nativos = nativo.calcular_tiempos_via()
+    tiempos_experta = {h["via"]: h["tiempo_estimado"] for h in hechos_finales if isinstance(h, TiempoVia)}
+    for nombre, tiempo in tiempos_experta.items():
+        tiempo_nativo = tiempos_nativos[nativo.indice_via[nombre]]
+        if abs(tiempo_nativo - tiempo) > tolerancia:
+            diferencias.append(f"tiempo de la vía {nombre}: experta={tiempo}, nativo={tiempo_nativo}")
+    eliminadas = {nativo.nombres_via[i] for i in np.flatnonzero(nativo.vias_eliminadas())}
+    for nombre in set(nativo.nombres_via) - eliminadas - set(tiempos_experta):
+        diferencias.append(f"la vía {nombre} no fue eliminada por el nativo pero no tiene tiempo en experta")
+
+    # rutas recomendadas
+    recomendaciones_nativas = nativo.recomendar(objetivo, k=k)
+    if len(recomendaciones_experta) != len(recomendaciones_nativas):
+        diferencias.append(
+            f"cantidad de rutas recomendadas: experta={len(recomendaciones_experta)}, "
+            f"nativo={len(recomendaciones_nativas)}"
+        )
+    for experta, nativa in zip(recomendaciones_experta, recomendaciones_nativas):
+        if experta.ruta != nativa.ruta:
+            diferencias.append(f"ruta recomendada: experta={experta.ruta}, nativo={nativa.ruta}")
+        if abs(experta.tiempo_estimado - nativa.tiempo_estimado) > tolerancia:
+            diferencias.append(
+                f"tiempo de la ruta {experta.ruta}: experta={experta.tiempo_estimado}, "
+                f"nativo={nativa.tiempo_estimado}"
+            )
+
+    return diferencias
@@ -1,174 +1,319 @@
 """
 Componente Ontología y Razonamiento Semántico
+
+La ontología se construye bajo demanda con `construir_ontologia(config)`; importar este módulo no
+construye el grafo. Para compatibilidad, `ontologia.g` construye (una sola vez) la ontología con la
+configuración por defecto la primera vez que se accede.
 """
 #Importamos las librerías requeridas para la elaboración de la ontología
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from math import inf
+import pickle
+import rdflib
 from rdflib import Graph, Namespace, URIRef, BNode, Literal
-from rdflib.namespace import RDF, RDFS, XSD, DC, GEO
+from rdflib.compare import to_isomorphic
+from rdflib.namespace import RDF, RDFS, XSD, DC
 from rdflib.collection import Collection
 from owlrl import DeductiveClosure, RDFS_Semantics
 import networkx as nx
 import random
-import numpy as np
-
-'''Fijamos el valor de la semilla aleatoria para agregar tripletas al grafo de
-manera aleatoria simulando sucesos aleatorios en el contexto del trabajo'''
-random.seed(21)
-np.random.seed(21)
+import time
 
-#Se crea el grafo
-g = Graph()
+from practica1.cache import directorio_cache, huella
 
-#Se crean los Namespaces y se usan Binds para enlazar las Uri a los Namespaces
+#Se crean los Namespaces
 GEO = Namespace("http://www.w3.org/2003/01/geo/wgs84_pos#")
 RUTA = Namespace("http://example.org/mejor_ruta#")
-g.bind("ruta", RUTA)
-g.bind("rdfs", RDFS)
-g.bind("geo", GEO)
-g.bind("rdf", RDF)
-g.bind("xsd", XSD)
-g.bind("dc", DC)
-
-#Definición de Clases
-g.add((RUTA.Via,RDF.type,RDFS.Class))
-g.add((RUTA.Nodo,RDF.type,RDFS.Class))
-g.add((RUTA.Semaforo,RDF.type,RDFS.Class))
-g.add((RUTA.Evento,RDF.type,RDFS.Class))
-g.add((RUTA.Ruta,RDF.type,RDFS.Class))
-g.add((RUTA.Interseccion,RDF.type,RDFS.Class))
-g.add((RUTA.PuntoReferencia,RDF.type,RDFS.Class))
-g.add((RUTA.Calle,RDF.type,RDFS.Class))
-g.add((RUTA.Avenida,RDF.type,RDFS.Class))
-g.add((RUTA.Autopista,RDF.type,RDFS.Class))
-g.add((RUTA.Carrera,RDF.type,RDFS.Class))
-g.add((RUTA.Transversal,RDF.type,RDFS.Class))
-
-#Jerarquía de Clases
-g.add((RUTA.Interseccion,RDFS.subClassOf,RUTA.Nodo))
-g.add((RUTA.PuntoReferencia,RDFS.subClassOf,RUTA.Nodo))
-g.add((RUTA.Calle,RDFS.subClassOf,RUTA.Via))
-g.add((RUTA.Avenida,RDFS.subClassOf,RUTA.Via))
-g.add((RUTA.Autopista,RDFS.subClassOf,RUTA.Via))
-g.add((RUTA.Carrera,RDFS.subClassOf,RUTA.Via))
-g.add((RUTA.Transversal,RDFS.subClassOf,RUTA.Via))
-g.add((RUTA.Nodo,RDFS.subClassOf,GEO.SpatialThing))
-g.add((RUTA.Via,RDFS.subClassOf,GEO.SpatialThing))
-
-#Propiedades
-#Via:
-#Nombre para la via que hereda de DC.title
-g.add((RUTA.nombre,RDF.type,RDF.Property))
-g.add((RUTA.nombre, RDFS.subPropertyOf, DC.title))
-g.add((RUTA.nombre,RDFS.domain,RUTA.Via))
-g.add((RUTA.nombre,RDFS.range,XSD.string))
-
-#Eventos que afectan a las vias
-g.add((RUTA.afectadaPor,RDF.type,RDF.Property))
-g.add((RUTA.afectadaPor,RDFS.domain,RUTA.Via))
-g.add((RUTA.afectadaPor,RDFS.range,RUTA.Evento))
-
-#Cantidad de velocidad promedio de las vias
-g.add((RUTA.velocidadPromedio,RDF.type,RDF.Property)) #Km/H
-g.add((RUTA.velocidadPromedio,RDFS.domain,RUTA.Via))
-g.add((RUTA.velocidadPromedio,RDFS.range,XSD.double))
-
-#Deduce si cada via se puede recorrer en ambos sentidos o no
-g.add((RUTA.esBidireccional,RDF.type,RDF.Property))
-g.add((RUTA.esBidireccional,RDFS.domain,RUTA.Via))
-g.add((RUTA.esBidireccional,RDFS.range,XSD.boolean))
-
-#Define la longitud de cada via
-g.add((RUTA.longitud,RDF.type,RDF.Property)) #Km
-g.add((RUTA.longitud,RDFS.domain,RUTA.Via))
-g.add((RUTA.longitud,RDFS.range,XSD.double))
-
-#Interseccion
-#Se define un número asignado para identificar cada una
-g.add((RUTA.numero,RDF.type,RDF.Property))
-g.add((RUTA.numero,RDFS.domain,RUTA.Interseccion))
-g.add((RUTA.numero,RDFS.range,XSD.string))
-
-#Semáforo
-#Se establece un tiempo de espera para cada uno
-g.add((RUTA.tiempoEspera,RDF.type,RDF.Property)) # segundos
-g.add((RUTA.tiempoEspera,RDFS.domain,RUTA.Semaforo))
-g.add((RUTA.tiempoEspera,RDFS.range,XSD.double))
-
-#Se le asigna una vía a cada semáforo instanciado
-g.add((RUTA.estaEnVia,RDF.type,RDF.Property))
-g.add((RUTA.estaEnVia,RDFS.domain,RUTA.Semaforo))
-g.add((RUTA.estaEnVia,RDFS.range,RUTA.Via))
-
-#Ruta:
-#Se muestra los nodos que enlazan la ruta
-g.add((RUTA.tieneNodos,RDF.type,RDF.Property))
-g.add((RUTA.tieneNodos,RDFS.domain,RUTA.Ruta))
-g.add((RUTA.tieneNodos,RDFS.range,RUTA.Interseccion))
-
-#Se muestran las vias que enlazan la ruta
-g.add((RUTA.tieneVias, RDF.type, RDF.Property))
-g.add((RUTA.tieneVias, RDFS.domain, RUTA.Ruta))
-g.add((RUTA.tieneVias, RDFS.range, RUTA.Via))
-
-#Se establece el punto de interés de Origen de la ruta como una interseccion
-g.add((RUTA.origen,RDF.type,RDF.Property))
-g.add((RUTA.origen,RDFS.domain,RUTA.Ruta))
-g.add((RUTA.origen,RDFS.range,RUTA.Interseccion))
-
-#Se establece el punto de interés de Destino de la ruta como una interseccion
-g.add((RUTA.destino,RDF.type,RDF.Property))
-g.add((RUTA.destino,RDFS.domain,RUTA.Ruta))
-g.add((RUTA.destino,RDFS.range,RUTA.Interseccion))
-
-#Se le pone un número que diferencia a cada ruta encontrada
-g.add((RUTA.numeracion,RDF.type, RDF.Property))
-g.add((RUTA.numeracion,RDFS.subClassOf,DC.title))
-g.add((RUTA.numeracion,RDFS.domain,RUTA.Ruta))
-g.add((RUTA.numeracion,RDFS.range,XSD.string))
-
-#Evento:
-#Se le asigna un tipo que indica de que se trata el evento
-g.add((RUTA.tipo,RDF.type,RDF.Property))
-g.add((RUTA.tipo,RDFS.domain,RUTA.Evento))
-g.add((RUTA.tipo,RDFS.range,XSD.string))
-
-#Se establece una duración específica para cada evento
-g.add((RUTA.duracion,RDF.type,RDF.Property)) #se define en minutos
-g.add((RUTA.duracion,RDFS.domain,RUTA.Evento))
-g.add((RUTA.duracion,RDFS.range,XSD.double))
-
-#Se indica si el evento causa un cierre total de la vía o no
-g.add((RUTA.cierreTotal,RDF.type,RDF.Property))
-g.add((RUTA.cierreTotal,RDFS.domain,RUTA.Evento))
-g.add((RUTA.cierreTotal,RDFS.range,XSD.boolean))
-
-#Nodo:
-#Establece la relación entre un punto de referencia y la intersección desde la cual se puede acceder a él
-g.add((RUTA.seRelacionaCon,RDF.type,RDF.Property))
-g.add((RUTA.seRelacionaCon,RDFS.domain,RUTA.Nodo))
-g.add((RUTA.seRelacionaCon,RDFS.range,RUTA.Nodo))
-
-#Establece la relación de interconexión entre nodos
-g.add((RUTA.intersectaCon, RDFS.subPropertyOf, RUTA.seRelacionaCon))
-g.add((RUTA.intersectaCon,RDFS.domain,RUTA.Interseccion))
-g.add((RUTA.intersectaCon,RDFS.range,RUTA.Interseccion))
-
-#Conecciones entre nodos e interseccion:
-#conectaCon indica que una intersección se enlaza con una vía
-g.add((RUTA.conectaCon,RDF.type,RDF.Property))
-g.add((RUTA.conectaCon,RDFS.domain,RUTA.Interseccion))
-g.add((RUTA.conectaCon,RDFS.range,RUTA.Via))
-
-#esConectada indica que una via se enlaza con una intersección
-g.add((RUTA.esConectada,RDF.type,RDF.Property))
-g.add((RUTA.esConectada,RDFS.domain,RUTA.Via))
-g.add((RUTA.esConectada,RDFS.range,RUTA.Interseccion))
-
-#Punto de referencia:
-#Se le asigna un nombre para identificar el lugar al que se hacer referencia
-g.add((RUTA.tieneNombre,RDF.type,RDF.Property))
-g.add((RUTA.tieneNombre, RDFS.subPropertyOf, DC.title))
-g.add((RUTA.tieneNombre,RDFS.domain,RUTA.PuntoReferencia))
-g.add((RUTA.tieneNombre,RDFS.range,XSD.string))
+
+
+@dataclass
+class ConfigOntologia:
+    """
+    Opciones de construcción de la ontología
+    Campos:
+        - semilla: semilla aleatoria con la que se simulan los eventos y velocidades de las vías
+        - razonar: si es True se aplica el razonamiento RDFS
+        - razonador: "owlrl" calcula la clausura RDFS completa con owlrl, "dirigido" materializa
+          solo las inferencias que usa el traductor (ver `razonar_dirigido`)
+        - generar_rutas: si es True se generan las rutas entre todos los puntos de referencia
+        - cutoff: número máximo de vías de las rutas generadas
+        - verbosidad: 0 no imprime nada, 1 imprime un resumen con los tiempos de cada etapa,
+          2 imprime además las tripletas antes y después del razonamiento y la serialización final
+        - usar_cache: si es True el grafo razonado (con sus rutas) se guarda en disco y se reutiliza
+          mientras no cambien las tripletas base ni la configuración
+        - modo_rutas: "todas" genera todas las rutas sin repetir vías (hasta `cutoff` vías),
+          "k_mejores" genera solo las `k_rutas` rutas más rápidas por cada par origen/destino
+        - k_rutas: número de rutas por par origen/destino en el modo "k_mejores"
+        - podar_rutas: si es True, en el modo "todas" no se generan las rutas que la regla
+          eliminar_rutas_muy_largas del Motor descartaría por medir más de FACTOR_DISTANCIA_MAXIMA
+          veces la ruta más corta de su par de puntos de referencia (ver `generar_rutas_puntos`)
+        - trabajadores: número de procesos entre los que `agregar_rutas` reparte los pares de
+          puntos de referencia (1 genera todas las rutas en el proceso actual). No cambia el grafo
+          resultante: las rutas se numeran en el mismo orden sin importar cuántos procesos haya
+        - codificacion_rutas: "coleccion" guarda las intersecciones y vías de cada ruta como
+          colecciones RDF (tieneNodos, tieneVias), "compacta" las guarda empaquetadas en un literal
+          cada una (nodosCodificados, viasCodificadas), con muchas menos tripletas por ruta
+    """
+
+    semilla: int = 21
+    razonar: bool = True
+    razonador: str = "owlrl"
+    generar_rutas: bool = True
+    cutoff: int = 6
+    verbosidad: int = 0
+    usar_cache: bool = False
+    modo_rutas: str = "todas"
+    k_rutas: int = 5
+    podar_rutas: bool = False
+    trabajadores: int = 1
+    codificacion_rutas: str = "coleccion"
+
+
+# se incrementa cuando cambia la forma en que se razona o se generan las rutas, para invalidar
+# los grafos guardados en caché por versiones anteriores
+_VERSION_CACHE = 2
+
+# campos de la configuración que no afectan el grafo resultante (no hacen parte de la llave de caché)
+_CAMPOS_SIN_EFECTO = {"verbosidad", "usar_cache", "trabajadores"}
+
+
+def construir_ontologia(config: ConfigOntologia | None = None) -> Graph:
+    """
+    Construye el grafo de la ontología ejecutando solo las etapas indicadas en `config`
+    """
+    if config is None:
+        config = ConfigOntologia()
+
+    '''Se usa un generador aleatorio propio con la semilla de la configuración para agregar
+    tripletas al grafo de manera aleatoria simulando sucesos aleatorios en el contexto del
+    trabajo'''
+    rng = random.Random(config.semilla)
+
+    inicio = time.perf_counter()
+
+    #Se crea el grafo
+    g = Graph()
+    g.bind("ruta", RUTA)
+    g.bind("rdfs", RDFS)
+    g.bind("geo", GEO)
+    g.bind("rdf", RDF)
+    g.bind("xsd", XSD)
+    g.bind("dc", DC)
+
+    agregar_esquema(g)
+    agregar_instancias(g, rng)
+
+    if config.verbosidad >= 1:
+        print('Tripletas elaboradas a mano:', len(g), f"({time.perf_counter() - inicio:.3f} s)\n")
+
+    archivo_cache = None
+    if config.usar_cache:
+        archivo_cache = directorio_cache() / f"ontologia_{_llave_cache(g, config)[:16]}.pickle"
+        if archivo_cache.exists():
+            inicio = time.perf_counter()
+            with open(archivo_cache, "rb") as archivo:
+                g = pickle.load(archivo)
+            if config.verbosidad >= 1:
+                print(f"Ontología cargada desde caché: {len(g)} tripletas ({time.perf_counter() - inicio:.3f} s)")
+            return g
+
+    if config.razonar:
+        razonar(g, config.verbosidad, config.razonador)
+
+    if config.generar_rutas:
+        agregar_rutas(g, config)
+
+    if config.verbosidad >= 2:
+        #Serialización final
+        print(g.serialize(format="turtle"))
+
+    if archivo_cache is not None:
+        # se escribe a un archivo temporal y luego se renombra, para que otro proceso nunca lea un
+        # archivo a medio escribir
+        temporal = archivo_cache.with_suffix(".tmp")
+        with open(temporal, "wb") as archivo:
+            pickle.dump(g, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        temporal.replace(archivo_cache)
+
+    return g
+
+
+def _llave_cache(g: Graph, config: ConfigOntologia) -> str:
+    """
+    Llave de caché de la ontología: hash del contenido de las tripletas base (independiente de los
+    identificadores de los nodos blancos) junto con la semilla y las opciones que afectan el grafo
+    """
+    opciones = {
+        campo.name: getattr(config, campo.name)
+        for campo in fields(config)
+        if campo.name not in _CAMPOS_SIN_EFECTO
+    }
+    return huella(
+        str(to_isomorphic(g).graph_digest()),
+        repr(sorted(opciones.items())),
+        str(_VERSION_CACHE),
+        rdflib.__version__,
+    )
+
+
+def agregar_esquema(g: Graph):
+    """
+    Agrega al grafo las clases, su jerarquía y las propiedades de la ontología
+    """
+    #Definición de Clases
+    g.add((RUTA.Via,RDF.type,RDFS.Class))
+    g.add((RUTA.Nodo,RDF.type,RDFS.Class))
+    g.add((RUTA.Semaforo,RDF.type,RDFS.Class))
+    g.add((RUTA.Evento,RDF.type,RDFS.Class))
+    g.add((RUTA.Ruta,RDF.type,RDFS.Class))
+    g.add((RUTA.Interseccion,RDF.type,RDFS.Class))
+    g.add((RUTA.PuntoReferencia,RDF.type,RDFS.Class))
+    g.add((RUTA.Calle,RDF.type,RDFS.Class))
+    g.add((RUTA.Avenida,RDF.type,RDFS.Class))
+    g.add((RUTA.Autopista,RDF.type,RDFS.Class))
+    g.add((RUTA.Carrera,RDF.type,RDFS.Class))
+    g.add((RUTA.Transversal,RDF.type,RDFS.Class))
+
+    #Jerarquía de Clases
+    g.add((RUTA.Interseccion,RDFS.subClassOf,RUTA.Nodo))
+    g.add((RUTA.PuntoReferencia,RDFS.subClassOf,RUTA.Nodo))
+    g.add((RUTA.Calle,RDFS.subClassOf,RUTA.Via))
+    g.add((RUTA.Avenida,RDFS.subClassOf,RUTA.Via))
+    g.add((RUTA.Autopista,RDFS.subClassOf,RUTA.Via))
+    g.add((RUTA.Carrera,RDFS.subClassOf,RUTA.Via))
+    g.add((RUTA.Transversal,RDFS.subClassOf,RUTA.Via))
+    g.add((RUTA.Nodo,RDFS.subClassOf,GEO.SpatialThing))
+    g.add((RUTA.Via,RDFS.subClassOf,GEO.SpatialThing))
+
+    #Propiedades
+    #Via:
+    #Nombre para la via que hereda de DC.title
+    g.add((RUTA.nombre,RDF.type,RDF.Property))
+    g.add((RUTA.nombre, RDFS.subPropertyOf, DC.title))
+    g.add((RUTA.nombre,RDFS.domain,RUTA.Via))
+    g.add((RUTA.nombre,RDFS.range,XSD.string))
+
+    #Eventos que afectan a las vias
+    g.add((RUTA.afectadaPor,RDF.type,RDF.Property))
+    g.add((RUTA.afectadaPor,RDFS.domain,RUTA.Via))
+    g.add((RUTA.afectadaPor,RDFS.range,RUTA.Evento))
+
+    #Cantidad de velocidad promedio de las vias
+    g.add((RUTA.velocidadPromedio,RDF.type,RDF.Property)) #Km/H
+    g.add((RUTA.velocidadPromedio,RDFS.domain,RUTA.Via))
+    g.add((RUTA.velocidadPromedio,RDFS.range,XSD.double))
+
+    #Deduce si cada via se puede recorrer en ambos sentidos o no
+    g.add((RUTA.esBidireccional,RDF.type,RDF.Property))
+    g.add((RUTA.esBidireccional,RDFS.domain,RUTA.Via))
+    g.add((RUTA.esBidireccional,RDFS.range,XSD.boolean))
+
+    #Define la longitud de cada via
+    g.add((RUTA.longitud,RDF.type,RDF.Property)) #Km
+    g.add((RUTA.longitud,RDFS.domain,RUTA.Via))
+    g.add((RUTA.longitud,RDFS.range,XSD.double))
+
+    #Interseccion
+    #Se define un número asignado para identificar cada una
+    g.add((RUTA.numero,RDF.type,RDF.Property))
+    g.add((RUTA.numero,RDFS.domain,RUTA.Interseccion))
+    g.add((RUTA.numero,RDFS.range,XSD.string))
+
+    #Semáforo
+    #Se establece un tiempo de espera para cada uno
+    g.add((RUTA.tiempoEspera,RDF.type,RDF.Property)) # segundos
+    g.add((RUTA.tiempoEspera,RDFS.domain,RUTA.Semaforo))
+    g.add((RUTA.tiempoEspera,RDFS.range,XSD.double))
+
+    #Se le asigna una vía a cada semáforo instanciado
+    g.add((RUTA.estaEnVia,RDF.type,RDF.Property))
+    g.add((RUTA.estaEnVia,RDFS.domain,RUTA.Semaforo))
+    g.add((RUTA.estaEnVia,RDFS.range,RUTA.Via))
+
+    #Ruta:
+    #Se muestra los nodos que enlazan la ruta
+    g.add((RUTA.tieneNodos,RDF.type,RDF.Property))
+    g.add((RUTA.tieneNodos,RDFS.domain,RUTA.Ruta))
+    g.add((RUTA.tieneNodos,RDFS.range,RUTA.Interseccion))
+
+    #Se muestran las vias que enlazan la ruta
+    g.add((RUTA.tieneVias, RDF.type, RDF.Property))
+    g.add((RUTA.tieneVias, RDFS.domain, RUTA.Ruta))
+    g.add((RUTA.tieneVias, RDFS.range, RUTA.Via))
+
+    #Codificación compacta de la ruta (ver ConfigOntologia.codificacion_rutas): los números de sus
+    #intersecciones y los nombres de sus vías empaquetados en un solo literal cada uno
+    g.add((RUTA.nodosCodificados, RDF.type, RDF.Property))
+    g.add((RUTA.nodosCodificados, RDFS.domain, RUTA.Ruta))
+    g.add((RUTA.nodosCodificados, RDFS.range, XSD.string))
+    g.add((RUTA.viasCodificadas, RDF.type, RDF.Property))
+    g.add((RUTA.viasCodificadas, RDFS.domain, RUTA.Ruta))
+    g.add((RUTA.viasCodificadas, RDFS.range, XSD.string))
+
+    #Se establece el punto de interés de Origen de la ruta como una interseccion
+    g.add((RUTA.origen,RDF.type,RDF.Property))
+    g.add((RUTA.origen,RDFS.domain,RUTA.Ruta))
+    g.add((RUTA.origen,RDFS.range,RUTA.Interseccion))
+
+    #Se establece el punto de interés de Destino de la ruta como una interseccion
+    g.add((RUTA.destino,RDF.type,RDF.Property))
+    g.add((RUTA.destino,RDFS.domain,RUTA.Ruta))
+    g.add((RUTA.destino,RDFS.range,RUTA.Interseccion))
+
+    #Se le pone un número que diferencia a cada ruta encontrada
+    g.add((RUTA.numeracion,RDF.type, RDF.Property))
+    g.add((RUTA.numeracion,RDFS.subClassOf,DC.title))
+    g.add((RUTA.numeracion,RDFS.domain,RUTA.Ruta))
+    g.add((RUTA.numeracion,RDFS.range,XSD.string))
+
+    #Evento:
+    #Se le asigna un tipo que indica de que se trata el evento
+    g.add((RUTA.tipo,RDF.type,RDF.Property))
+    g.add((RUTA.tipo,RDFS.domain,RUTA.Evento))
+    g.add((RUTA.tipo,RDFS.range,XSD.string))
+
+    #Se establece una duración específica para cada evento
+    g.add((RUTA.duracion,RDF.type,RDF.Property)) #se define en minutos
+    g.add((RUTA.duracion,RDFS.domain,RUTA.Evento))
+    g.add((RUTA.duracion,RDFS.range,XSD.double))
+
+    #Se indica si el evento causa un cierre total de la vía o no
+    g.add((RUTA.cierreTotal,RDF.type,RDF.Property))
+    g.add((RUTA.cierreTotal,RDFS.domain,RUTA.Evento))
+    g.add((RUTA.cierreTotal,RDFS.range,XSD.boolean))
+
+    #Nodo:
+    #Establece la relación entre un punto de referencia y la intersección desde la cual se puede acceder a él
+    g.add((RUTA.seRelacionaCon,RDF.type,RDF.Property))
+    g.add((RUTA.seRelacionaCon,RDFS.domain,RUTA.Nodo))
+    g.add((RUTA.seRelacionaCon,RDFS.range,RUTA.Nodo))
+
+    #Establece la relación de interconexión entre nodos
+    g.add((RUTA.intersectaCon, RDFS.subPropertyOf, RUTA.seRelacionaCon))
+    g.add((RUTA.intersectaCon,RDFS.domain,RUTA.Interseccion))
+    g.add((RUTA.intersectaCon,RDFS.range,RUTA.Interseccion))
+
+    #Conecciones entre nodos e interseccion:
+    #conectaCon indica que una intersección se enlaza con una vía
+    g.add((RUTA.conectaCon,RDF.type,RDF.Property))
+    g.add((RUTA.conectaCon,RDFS.domain,RUTA.Interseccion))
+    g.add((RUTA.conectaCon,RDFS.range,RUTA.Via))
+
+    #esConectada indica que una via se enlaza con una intersección
+    g.add((RUTA.esConectada,RDF.type,RDF.Property))
+    g.add((RUTA.esConectada,RDFS.domain,RUTA.Via))
+    g.add((RUTA.esConectada,RDFS.range,RUTA.Interseccion))
+
+    #Punto de referencia:
+    #Se le asigna un nombre para identificar el lugar al que se hacer referencia
+    g.add((RUTA.tieneNombre,RDF.type,RDF.Property))
+    g.add((RUTA.tieneNombre, RDFS.subPropertyOf, DC.title))
+    g.add((RUTA.tieneNombre,RDFS.domain,RUTA.PuntoReferencia))
+    g.add((RUTA.tieneNombre,RDFS.range,XSD.string))
+
 
 #Instancias
 #Se le asignan URIs específicas a cada punto de interés
@@ -180,68 +325,279 @@ estadio=URIRef(RUTA.ESTADIO)
 estacion=URIRef(RUTA.ESTACION)
 piloto=URIRef(RUTA.PILOTO)
 
-#Puntos de referencia y sus nombres:
-g.add((unal,RDF.type,RUTA.PuntoReferencia))
-g.add((unal,RUTA.tieneNombre,Literal("Universidad Nacional de Colombia")))
-
-g.add((carlose,RDF.type,RUTA.PuntoReferencia))
-g.add((carlose,RUTA.tieneNombre,Literal("Parque Carlos E. Restrepo")))
-
-g.add((exito,RDF.type,RUTA.PuntoReferencia))
-g.add((exito,RUTA.tieneNombre,Literal("Exito Colombia")))
-
-g.add((luisamigo,RDF.type,RUTA.PuntoReferencia))
-g.add((luisamigo,RUTA.tieneNombre,Literal("Universidad Católica Luis Amigó")))
-
-g.add((estadio,RDF.type,RUTA.PuntoReferencia))
-g.add((estadio,RUTA.tieneNombre,Literal("Estadio de Fútbol Atanasio Girardot")))
-
-g.add((estacion,RDF.type,RUTA.PuntoReferencia))
-g.add((estacion,RUTA.tieneNombre,Literal("Estación Suramericana del Metro")))
-
-g.add((piloto,RDF.type,RUTA.PuntoReferencia))
-g.add((piloto,RUTA.tieneNombre,Literal("Biblioteca Pública Piloto")))
-
-#Eventos con su tipo, duración y si generan cierre total o no:
-g.add((RUTA.ObraVial,RDF.type,RUTA.Evento)) #Probabilidad del 10% de ocurrencia
-g.add((RUTA.ObraVial,RUTA.tipo,Literal("Obra Vial")))
-g.add((RUTA.ObraVial,RUTA.duracion,Literal(360.0)))
-g.add((RUTA.ObraVial,RUTA.cierreTotal,Literal(True)))
-
-g.add((RUTA.AccidenteGrave,RDF.type,RUTA.Evento)) #Probabilidad del 5% de ocurrencia
-g.add((RUTA.AccidenteGrave,RUTA.tipo,Literal("Accidente Grave")))
-g.add((RUTA.AccidenteGrave,RUTA.duracion,Literal(30.0)))
-g.add((RUTA.AccidenteGrave,RUTA.cierreTotal,Literal(True)))
-
-g.add((RUTA.ObraMenor,RDF.type,RUTA.Evento)) #Probabilidad del 15% de ocurrencia
-g.add((RUTA.ObraMenor,RUTA.tipo,Literal("Obra Menor")))
-g.add((RUTA.ObraMenor,RUTA.duracion,Literal(360.0)))
-g.add((RUTA.ObraMenor,RUTA.cierreTotal,Literal(False)))
-
-g.add((RUTA.AccidenteLeve,RDF.type,RUTA.Evento)) #Probabilidad del 10% de ocurrencia
-g.add((RUTA.AccidenteLeve,RUTA.tipo,Literal("Accidente Leve")))
-g.add((RUTA.AccidenteLeve,RUTA.duracion,Literal(30.0)))
-g.add((RUTA.AccidenteLeve,RUTA.cierreTotal,Literal(False)))
+#Se define una lista con los puntos de referencia
+puntos_referencia = [unal, estadio, exito, luisamigo, estacion, piloto, carlose]
 
-g.add((RUTA.Manifestacion,RDF.type,RUTA.Evento)) #Probabilidad del 10% de ocurrencia
-g.add((RUTA.Manifestacion,RUTA.tipo,Literal("Manifestacion")))
-g.add((RUTA.Manifestacion,RUTA.duracion,Literal(120.0)))
-g.add((RUTA.Manifestacion,RUTA.cierreTotal,Literal(True)))
+#Vías del mapa: (uri, clase, nombre, rango de velocidad promedio, es bidireccional, longitud)
+VIAS = [
+    (RUTA.AutopistaSur, RUTA.Autopista, "Autopista Sur", (80, 100), False, 1.0),
+    (RUTA.AvenidaColombia, RUTA.Avenida, "Avenida Colombia", (40, 60), True, 1.5),
+    (RUTA.Transversal51a, RUTA.Transversal, "Transversal 51a", (30, 40), False, 0.5),
+    (RUTA.Transversal53A, RUTA.Transversal, "Transversal 53A", (30, 40), False, 0.2),
+    (RUTA.Transversal53B, RUTA.Transversal, "Transversal 53B", (30, 40), False, 0.2),
+    (RUTA.Diagonal63B, RUTA.Transversal, "Diagonal 63B", (30, 40), False, 0.3),
+    (RUTA.Calle55, RUTA.Calle, "Calle 55", (20, 30), True, 1.5),
+    (RUTA.Calle48, RUTA.Calle, "Calle 48", (20, 30), False, 1.5),
+    (RUTA.Calle51, RUTA.Calle, "Calle 51", (20, 30), False, 1.5),
+    (RUTA.Calle48D, RUTA.Calle, "Calle 48D", (20, 30), False, 0.4),
+    (RUTA.Calle49A, RUTA.Calle, "Calle 49A", (20, 30), False, 0.1),
+    (RUTA.Calle49B, RUTA.Calle, "Calle 49B", (20, 30), False, 0.6),
+    (RUTA.Calle53, RUTA.Calle, "Calle 53", (20, 30), False, 0.2),
+    (RUTA.Calle52, RUTA.Calle, "Calle 52", (20, 30), False, 0.1),
+    (RUTA.Carrera65, RUTA.Carrera, "Carrera 65", (20, 30), True, 1.5),
+    (RUTA.Carrera66, RUTA.Carrera, "Carrera 66", (20, 30), False, 0.4),
+    (RUTA.Carrera67, RUTA.Carrera, "Carrera 67", (20, 30), False, 0.4),
+    (RUTA.Carrera73, RUTA.Carrera, "Carrera 73", (20, 30), False, 0.6),
+    (RUTA.Carrera74, RUTA.Carrera, "Carrera 74", (20, 30), True, 0.8),
+    (RUTA.Carrera67B, RUTA.Carrera, "Carrera 67B", (20, 30), False, 0.2),
+    (RUTA.BulevarLibertadores, RUTA.Carrera, "Bulevar Libertadores de América", (20, 30), False, 1.5),
+    (RUTA.Carrera68, RUTA.Carrera, "Carrera 68", (20, 30), False, 0.3),
+    (RUTA.Carrera64, RUTA.Carrera, "Carrera 64", (20, 30), False, 0.2),
+    (RUTA.Carrera64B, RUTA.Carrera, "Carrera 64B", (20, 30), False, 0.1),
+]
+
+#Conexiones viales: (intersección de salida, intersección de llegada, vía)
+CONEXIONES = [
+    (1, 3, RUTA.Calle55),
+    (2, 3, RUTA.BulevarLibertadores),
+    (3, 4, RUTA.Calle55),
+    (3, 21, RUTA.BulevarLibertadores),
+    (4, 2, RUTA.Calle55),
+    (4, 19, RUTA.Calle55),
+    (5, 17, RUTA.Carrera65),
+    (6, 7, RUTA.Calle55),
+    (7, 13, RUTA.Calle55),
+    (7, 8, RUTA.AutopistaSur),
+    (8, 9, RUTA.AutopistaSur),
+    (9, 10, RUTA.AutopistaSur),
+    (10, 37, RUTA.AvenidaColombia),
+    (10, 11, RUTA.AutopistaSur),
+    (11, 31, RUTA.AutopistaSur),
+    (12, 9, RUTA.Calle52),
+    (13, 7, RUTA.Calle55),
+    (7, 6, RUTA.Calle55),
+    (12, 36, RUTA.Carrera64),
+    (13, 8, RUTA.Diagonal63B),
+    (14, 13, RUTA.Calle55),
+    (14, 15, RUTA.Carrera64),
+    (14, 17, RUTA.Calle55),
+    (15, 12, RUTA.Carrera64),
+    (16, 15, RUTA.Calle53),
+    (17, 19, RUTA.Calle55),
+    (17, 14, RUTA.Calle55),
+    (17, 18, RUTA.Carrera65),
+    (18, 16, RUTA.Transversal53A),
+    (18, 40, RUTA.Carrera65),
+    (19, 17, RUTA.Calle55),
+    (19, 18, RUTA.Transversal53B),
+    (20, 21, RUTA.Transversal51a),
+    (19, 4, RUTA.Calle55),
+    (20, 4, RUTA.Carrera67B),
+    (20, 49, RUTA.Calle51),
+    (21, 49, RUTA.BulevarLibertadores),
+    (22, 1, RUTA.Carrera73),
+    (23, 22, RUTA.Carrera73),
+    (23, 24, RUTA.AvenidaColombia),
+    (23, 50, RUTA.AvenidaColombia),
+    (24, 23, RUTA.AvenidaColombia),
+    (24, 25, RUTA.Carrera74),
+    (25, 24, RUTA.Carrera74),
+    (25, 26, RUTA.Calle48),
+    (26, 25, RUTA.Calle48),
+    (26, 27, RUTA.Calle48),
+    (27, 48, RUTA.Carrera68),
+    (27, 28, RUTA.Calle48),
+    (27, 26, RUTA.Calle48),
+    (28, 27, RUTA.Calle48),
+    (28, 29, RUTA.Calle48),
+    (29, 28, RUTA.Calle48),
+    (29, 30, RUTA.Calle48),
+    (29, 43, RUTA.Carrera66),
+    (30, 29, RUTA.Calle48),
+    (30, 31, RUTA.Calle48),
+    (30, 38, RUTA.Carrera65),
+    (31, 30, RUTA.Calle48),
+    (32, 11, RUTA.Calle49A),
+    (33, 32, RUTA.Carrera64B),
+    (34, 33, RUTA.Carrera64B),
+    (38, 39, RUTA.Carrera65),
+    (39, 40, RUTA.Carrera65),
+    (40, 18, RUTA.Carrera65),
+    (18, 17, RUTA.Carrera65),
+    (17, 5, RUTA.Carrera65),
+    (34, 37, RUTA.AvenidaColombia),
+    (34, 39, RUTA.AvenidaColombia),
+    (35, 16, RUTA.Calle53),
+    (35, 40, RUTA.Calle51),
+    (35, 34, RUTA.Carrera64B),
+    (36, 35, RUTA.Calle51),
+    (36, 37, RUTA.Carrera64),
+    (37, 34, RUTA.AvenidaColombia),
+    (37, 11, RUTA.AvenidaColombia),
+    (9, 37, RUTA.AvenidaColombia),
+    (37, 10, RUTA.AvenidaColombia),
+    (38, 30, RUTA.Carrera65),
+    (38, 33, RUTA.Calle49B),
+    (39, 38, RUTA.Carrera65),
+    (39, 41, RUTA.AvenidaColombia),
+    (39, 34, RUTA.AvenidaColombia),
+    (40, 39, RUTA.Carrera65),
+    (40, 20, RUTA.Calle51),
+    (41, 44, RUTA.AvenidaColombia),
+    (41, 39, RUTA.AvenidaColombia),
+    (42, 41, RUTA.Carrera66),
+    (42, 38, RUTA.Calle49B),
+    (43, 42, RUTA.Carrera66),
+    (44, 20, RUTA.Transversal51a),
+    (44, 41, RUTA.AvenidaColombia),
+    (44, 50, RUTA.AvenidaColombia),
+    (44, 45, RUTA.Carrera67),
+    (45, 42, RUTA.Calle49B),
+    (45, 46, RUTA.Carrera67),
+    (46, 28, RUTA.Carrera67),
+    (46, 43, RUTA.Calle48D),
+    (47, 45, RUTA.Calle49B),
+    (48, 47, RUTA.Carrera68),
+    (48, 46, RUTA.Calle48D),
+    (49, 22, RUTA.Calle51),
+    (49, 50, RUTA.BulevarLibertadores),
+    (50, 51, RUTA.BulevarLibertadores),
+    (50, 23, RUTA.AvenidaColombia),
+    (50, 44, RUTA.AvenidaColombia),
+    (51, 26, RUTA.BulevarLibertadores),
+    (51, 47, RUTA.Calle49B),
+]
 
-g.add((RUTA.VehiculoDetenido,RDF.type,RUTA.Evento)) #Probabilidad del 30% de ocurrencia
-g.add((RUTA.VehiculoDetenido,RUTA.tipo,Literal("Vehiculo Detenido")))
-g.add((RUTA.VehiculoDetenido,RUTA.duracion,Literal(10.0)))
-g.add((RUTA.VehiculoDetenido,RUTA.cierreTotal,Literal(False)))
+#Intersecciones desde las cuales se hacen accesibles cada uno de los puntos de referencia
+RELACIONES_PUNTOS = [
+    (estadio, 25),
+    (estacion, 30),
+    (exito, 41),
+    (luisamigo, 20),
+    (carlose, 36),
+    (piloto, 9),
+    (unal, 5),
+    (unal, 6),
+]
+
+#Semáforos: (vía, tiempo de espera en segundos)
+SEMAFOROS = [
+    (RUTA.AvenidaColombia, 45.0),
+    (RUTA.Transversal51a, 40.0),
+    (RUTA.Calle55, 35.0),
+    (RUTA.Calle48, 30.0),
+    (RUTA.Calle51, 50.0),
+    (RUTA.Calle48D, 30.0),
+    (RUTA.Calle49B, 40.0),
+    (RUTA.Calle53, 35.0),
+    (RUTA.Carrera65, 60.0),
+    (RUTA.Carrera66, 45.0),
+    (RUTA.Carrera67, 40.0),
+    (RUTA.Carrera73, 55.0),
+    (RUTA.Carrera74, 50.0),
+    (RUTA.BulevarLibertadores, 45.0),
+    (RUTA.Carrera68, 35.0),
+    (RUTA.Carrera64, 40.0),
+    (RUTA.Carrera64B, 30.0),
+]
+
+#Número de intersecciones del mapa
+NUM_INTERSECCIONES = 51
+
+
+def agregar_instancias(g: Graph, rng: random.Random):
+    """
+    Agrega al grafo los puntos de referencia, eventos, vías, intersecciones y semáforos del mapa
+    """
+    #Puntos de referencia y sus nombres:
+    g.add((unal,RDF.type,RUTA.PuntoReferencia))
+    g.add((unal,RUTA.tieneNombre,Literal("Universidad Nacional de Colombia")))
+
+    g.add((carlose,RDF.type,RUTA.PuntoReferencia))
+    g.add((carlose,RUTA.tieneNombre,Literal("Parque Carlos E. Restrepo")))
+
+    g.add((exito,RDF.type,RUTA.PuntoReferencia))
+    g.add((exito,RUTA.tieneNombre,Literal("Exito Colombia")))
+
+    g.add((luisamigo,RDF.type,RUTA.PuntoReferencia))
+    g.add((luisamigo,RUTA.tieneNombre,Literal("Universidad Católica Luis Amigó")))
+
+    g.add((estadio,RDF.type,RUTA.PuntoReferencia))
+    g.add((estadio,RUTA.tieneNombre,Literal("Estadio de Fútbol Atanasio Girardot")))
+
+    g.add((estacion,RDF.type,RUTA.PuntoReferencia))
+    g.add((estacion,RUTA.tieneNombre,Literal("Estación Suramericana del Metro")))
+
+    g.add((piloto,RDF.type,RUTA.PuntoReferencia))
+    g.add((piloto,RUTA.tieneNombre,Literal("Biblioteca Pública Piloto")))
+
+    agregar_eventos(g)
+
+    #Vías junto con sus propiedades
+    for via, clase, nombre, velocidad, es_bidireccional, longitud in VIAS:
+        agregar_via(g, rng, via, clase, nombre, velocidad, es_bidireccional, longitud)
+
+    #Intersecciones
+    intersecciones = agregar_intersecciones(g, NUM_INTERSECCIONES)
+
+    #Se establecen cada una de las conexiones viales presentes en el grafo
+    for origen, destino, via in CONEXIONES:
+        intersecta(g, intersecciones[f"Interseccion{origen}"], intersecciones[f"Interseccion{destino}"], via)
+
+    #Intersecciones desde las cuales se hacen accesibles cada uno de los puntos de referencia
+    for punto, numero in RELACIONES_PUNTOS:
+        g.add((punto, RUTA.seRelacionaCon, intersecciones[f"Interseccion{numero}"]))
+
+    #Se agregan los semáforos con sus respectivos parámetros
+    for via, tiempo in SEMAFOROS:
+        agregar_semaforo(g, via, tiempo)
+
+
+def agregar_eventos(g: Graph):
+    """
+    Agrega al grafo los tipos de eventos que pueden afectar una vía (ver `probabilidad`)
+    """
+    #Eventos con su tipo, duración y si generan cierre total o no:
+    g.add((RUTA.ObraVial,RDF.type,RUTA.Evento)) #Probabilidad del 10% de ocurrencia
+    g.add((RUTA.ObraVial,RUTA.tipo,Literal("Obra Vial")))
+    g.add((RUTA.ObraVial,RUTA.duracion,Literal(360.0)))
+    g.add((RUTA.ObraVial,RUTA.cierreTotal,Literal(True)))
+
+    g.add((RUTA.AccidenteGrave,RDF.type,RUTA.Evento)) #Probabilidad del 5% de ocurrencia
+    g.add((RUTA.AccidenteGrave,RUTA.tipo,Literal("Accidente Grave")))
+    g.add((RUTA.AccidenteGrave,RUTA.duracion,Literal(30.0)))
+    g.add((RUTA.AccidenteGrave,RUTA.cierreTotal,Literal(True)))
+
+    g.add((RUTA.ObraMenor,RDF.type,RUTA.Evento)) #Probabilidad del 15% de ocurrencia
+    g.add((RUTA.ObraMenor,RUTA.tipo,Literal("Obra Menor")))
+    g.add((RUTA.ObraMenor,RUTA.duracion,Literal(360.0)))
+    g.add((RUTA.ObraMenor,RUTA.cierreTotal,Literal(False)))
+
+    g.add((RUTA.AccidenteLeve,RDF.type,RUTA.Evento)) #Probabilidad del 10% de ocurrencia
+    g.add((RUTA.AccidenteLeve,RUTA.tipo,Literal("Accidente Leve")))
+    g.add((RUTA.AccidenteLeve,RUTA.duracion,Literal(30.0)))
+    g.add((RUTA.AccidenteLeve,RUTA.cierreTotal,Literal(False)))
+
+    g.add((RUTA.Manifestacion,RDF.type,RUTA.Evento)) #Probabilidad del 10% de ocurrencia
+    g.add((RUTA.Manifestacion,RUTA.tipo,Literal("Manifestacion")))
+    g.add((RUTA.Manifestacion,RUTA.duracion,Literal(120.0)))
+    g.add((RUTA.Manifestacion,RUTA.cierreTotal,Literal(True)))
+
+    g.add((RUTA.VehiculoDetenido,RDF.type,RUTA.Evento)) #Probabilidad del 30% de ocurrencia
+    g.add((RUTA.VehiculoDetenido,RUTA.tipo,Literal("Vehiculo Detenido")))
+    g.add((RUTA.VehiculoDetenido,RUTA.duracion,Literal(10.0)))
+    g.add((RUTA.VehiculoDetenido,RUTA.cierreTotal,Literal(False)))
+
+    g.add((RUTA.ColapsoEstructural,RDF.type,RUTA.Evento)) #Probabilidad del 5% de ocurrencia
+    g.add((RUTA.ColapsoEstructural,RUTA.tipo,Literal("Colapso Estructural")))
+    g.add((RUTA.ColapsoEstructural,RUTA.duracion,Literal(10080.0)))
+    g.add((RUTA.ColapsoEstructural,RUTA.cierreTotal,Literal(True)))
 
-g.add((RUTA.ColapsoEstructural,RDF.type,RUTA.Evento)) #Probabilidad del 5% de ocurrencia
-g.add((RUTA.ColapsoEstructural,RUTA.tipo,Literal("Colapso Estructural")))
-g.add((RUTA.ColapsoEstructural,RUTA.duracion,Literal(10080.0)))
-g.add((RUTA.ColapsoEstructural,RUTA.cierreTotal,Literal(True)))
 
 '''Función que genera un número aleatorio y asigna a una ruta específica uno de
 los eventos o ninguno según el número aleatorio generado'''
-def probabilidad(ruta):
-    u=random.random()
+def probabilidad(g, ruta, rng):
+    u=rng.random()
     if u<0.1:
         g.add((ruta,RUTA.afectadaPor,RUTA.ObraVial))
     elif u<0.15:
@@ -257,192 +613,28 @@ def probabilidad(ruta):
     elif u<0.85:
         g.add((ruta,RUTA.afectadaPor,RUTA.ColapsoEstructural))
 
-#Autopista junto con sus propiedades y se llama a la función anterior:
-g.add((RUTA.AutopistaSur,RDF.type,RUTA.Autopista))
-g.add((RUTA.AutopistaSur,RUTA.nombre,Literal("Autopista Sur")))
-probabilidad(RUTA.AutopistaSur)
-g.add((RUTA.AutopistaSur,RUTA.velocidadPromedio,Literal(float(random.randint(80, 100)))))
-g.add((RUTA.AutopistaSur,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.AutopistaSur,RUTA.longitud,Literal(1.0)))
-
-#Avenida y sus propiedades:
-g.add((RUTA.AvenidaColombia,RDF.type,RUTA.Avenida))
-g.add((RUTA.AvenidaColombia,RUTA.nombre,Literal("Avenida Colombia")))
-probabilidad(RUTA.AvenidaColombia)
-g.add((RUTA.AvenidaColombia,RUTA.velocidadPromedio,Literal(float(random.randint(40, 60)))))
-g.add((RUTA.AvenidaColombia,RUTA.esBidireccional,Literal(True)))
-g.add((RUTA.AvenidaColombia,RUTA.longitud,Literal(1.5)))
-
-#Transversales y sus propiedades:
-g.add((RUTA.Transversal51a,RDF.type,RUTA.Transversal))
-g.add((RUTA.Transversal51a,RUTA.nombre,Literal("Transversal 51a")))
-probabilidad(RUTA.Transversal51a)
-g.add((RUTA.Transversal51a,RUTA.velocidadPromedio,Literal(float(random.randint(30, 40)))))
-g.add((RUTA.Transversal51a,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Transversal51a,RUTA.longitud,Literal(0.5)))
-
-g.add((RUTA.Transversal53A,RDF.type,RUTA.Transversal))
-g.add((RUTA.Transversal53A,RUTA.nombre,Literal("Transversal 53A")))
-probabilidad(RUTA.Transversal53A)
-g.add((RUTA.Transversal53A,RUTA.velocidadPromedio,Literal(float(random.randint(30, 40)))))
-g.add((RUTA.Transversal53A,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Transversal53A,RUTA.longitud,Literal(0.2)))
-
-g.add((RUTA.Transversal53B,RDF.type,RUTA.Transversal))
-g.add((RUTA.Transversal53B,RUTA.nombre,Literal("Transversal 53B")))
-probabilidad(RUTA.Transversal53B)
-g.add((RUTA.Transversal53B,RUTA.velocidadPromedio,Literal(float(random.randint(30, 40)))))
-g.add((RUTA.Transversal53B,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Transversal53B,RUTA.longitud,Literal(0.2)))
-
-g.add((RUTA.Diagonal63B,RDF.type,RUTA.Transversal))
-g.add((RUTA.Diagonal63B,RUTA.nombre,Literal("Diagonal 63B")))
-probabilidad(RUTA.Diagonal63B)
-g.add((RUTA.Diagonal63B,RUTA.velocidadPromedio,Literal(float(random.randint(30, 40)))))
-g.add((RUTA.Diagonal63B,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Diagonal63B,RUTA.longitud,Literal(0.3)))
-
-#Calles y sus propiedades:
-g.add((RUTA.Calle55,RDF.type,RUTA.Calle))
-g.add((RUTA.Calle55,RUTA.nombre,Literal("Calle 55")))
-probabilidad(RUTA.Calle55)
-g.add((RUTA.Calle55,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Calle55,RUTA.esBidireccional,Literal(True)))
-g.add((RUTA.Calle55,RUTA.longitud,Literal(1.5)))
-
-g.add((RUTA.Calle48,RDF.type,RUTA.Calle))
-g.add((RUTA.Calle48,RUTA.nombre,Literal("Calle 48")))
-probabilidad(RUTA.Calle48)
-g.add((RUTA.Calle48,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Calle48,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Calle48,RUTA.longitud,Literal(1.5)))
-
-g.add((RUTA.Calle51,RDF.type,RUTA.Calle))
-g.add((RUTA.Calle51,RUTA.nombre,Literal("Calle 51")))
-probabilidad(RUTA.Calle51)
-g.add((RUTA.Calle51,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Calle51,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Calle51,RUTA.longitud,Literal(1.5)))
-
-g.add((RUTA.Calle48D,RDF.type,RUTA.Calle))
-g.add((RUTA.Calle48D,RUTA.nombre,Literal("Calle 48D")))
-probabilidad(RUTA.Calle48D)
-g.add((RUTA.Calle48D,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Calle48D,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Calle48D,RUTA.longitud,Literal(0.4)))
-
-g.add((RUTA.Calle49A,RDF.type,RUTA.Calle))
-g.add((RUTA.Calle49A,RUTA.nombre,Literal("Calle 49A")))
-probabilidad(RUTA.Calle49A)
-g.add((RUTA.Calle49A,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Calle49A,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Calle49A,RUTA.longitud,Literal(0.1)))
-
-g.add((RUTA.Calle49B,RDF.type,RUTA.Calle))
-g.add((RUTA.Calle49B,RUTA.nombre,Literal("Calle 49B")))
-probabilidad(RUTA.Calle49B)
-g.add((RUTA.Calle49B,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Calle49B,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Calle49B,RUTA.longitud,Literal(0.6)))
-
-g.add((RUTA.Calle53,RDF.type,RUTA.Calle))
-g.add((RUTA.Calle53,RUTA.nombre,Literal("Calle 53")))
-probabilidad(RUTA.Calle53)
-g.add((RUTA.Calle53,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Calle53,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Calle53,RUTA.longitud,Literal(0.2)))
-
-g.add((RUTA.Calle52,RDF.type,RUTA.Calle))
-g.add((RUTA.Calle52,RUTA.nombre,Literal("Calle 52")))
-probabilidad(RUTA.Calle52)
-g.add((RUTA.Calle52,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Calle52,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Calle52,RUTA.longitud,Literal(0.1)))
-
-#Carreras y sus propiedades
-g.add((RUTA.Carrera65,RDF.type,RUTA.Carrera))
-g.add((RUTA.Carrera65,RUTA.nombre,Literal("Carrera 65")))
-probabilidad(RUTA.Carrera65)
-g.add((RUTA.Carrera65,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Carrera65,RUTA.esBidireccional,Literal(True)))
-g.add((RUTA.Carrera65,RUTA.longitud,Literal(1.5)))
-
-g.add((RUTA.Carrera66,RDF.type,RUTA.Carrera))
-g.add((RUTA.Carrera66,RUTA.nombre,Literal("Carrera 66")))
-probabilidad(RUTA.Carrera66)
-g.add((RUTA.Carrera66,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Carrera66,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Carrera66,RUTA.longitud,Literal(0.4)))
-
-g.add((RUTA.Carrera67,RDF.type,RUTA.Carrera))
-g.add((RUTA.Carrera67,RUTA.nombre,Literal("Carrera 67")))
-probabilidad(RUTA.Carrera67)
-g.add((RUTA.Carrera67,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Carrera67,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Carrera67,RUTA.longitud,Literal(0.4)))
-
-g.add((RUTA.Carrera73,RDF.type,RUTA.Carrera))
-g.add((RUTA.Carrera73,RUTA.nombre,Literal("Carrera 73")))
-probabilidad(RUTA.Carrera73)
-g.add((RUTA.Carrera73,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Carrera73,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Carrera73,RUTA.longitud,Literal(0.6)))
-
-g.add((RUTA.Carrera74,RDF.type,RUTA.Carrera))
-g.add((RUTA.Carrera74,RUTA.nombre,Literal("Carrera 74")))
-probabilidad(RUTA.Carrera74)
-g.add((RUTA.Carrera74,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Carrera74,RUTA.esBidireccional,Literal(True)))
-g.add((RUTA.Carrera74,RUTA.longitud,Literal(0.8)))
-
-g.add((RUTA.Carrera67B,RDF.type,RUTA.Carrera))
-g.add((RUTA.Carrera67B,RUTA.nombre,Literal("Carrera 67B")))
-probabilidad(RUTA.Carrera67B)
-g.add((RUTA.Carrera67B,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Carrera67B,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Carrera67B,RUTA.longitud,Literal(0.2)))
-
-g.add((RUTA.BulevarLibertadores,RDF.type,RUTA.Carrera))
-g.add((RUTA.BulevarLibertadores,RUTA.nombre,Literal("Bulevar Libertadores de América")))
-probabilidad(RUTA.BulevarLibertadores)
-g.add((RUTA.BulevarLibertadores,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.BulevarLibertadores,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.BulevarLibertadores,RUTA.longitud,Literal(1.5)))
-
-g.add((RUTA.Carrera68,RDF.type,RUTA.Carrera))
-g.add((RUTA.Carrera68,RUTA.nombre,Literal("Carrera 68")))
-probabilidad(RUTA.Carrera68)
-g.add((RUTA.Carrera68,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Carrera68,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Carrera68,RUTA.longitud,Literal(0.3)))
-
-g.add((RUTA.Carrera64,RDF.type,RUTA.Carrera))
-g.add((RUTA.Carrera64,RUTA.nombre,Literal("Carrera 64")))
-probabilidad(RUTA.Carrera64)
-g.add((RUTA.Carrera64,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Carrera64,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Carrera64,RUTA.longitud,Literal(0.2)))
-
-g.add((RUTA.Carrera64B,RDF.type,RUTA.Carrera))
-g.add((RUTA.Carrera64B,RUTA.nombre,Literal("Carrera 64B")))
-probabilidad(RUTA.Carrera64B)
-g.add((RUTA.Carrera64B,RUTA.velocidadPromedio,Literal(float(random.randint(20, 30)))))
-g.add((RUTA.Carrera64B,RUTA.esBidireccional,Literal(False)))
-g.add((RUTA.Carrera64B,RUTA.longitud,Literal(0.1)))
-
-#Intersecciones:
-#Se crea un diccionario en el cual se almacenan los Bnodes generados por cada interseccion
-intersecciones = dict()
+#Agrega una vía junto con sus propiedades y se llama a la función anterior
+def agregar_via(g, rng, via, clase, nombre, velocidad, es_bidireccional, longitud):
+    g.add((via,RDF.type,clase))
+    g.add((via,RUTA.nombre,Literal(nombre)))
+    probabilidad(g, via, rng)
+    g.add((via,RUTA.velocidadPromedio,Literal(float(rng.randint(*velocidad)))))
+    g.add((via,RUTA.esBidireccional,Literal(es_bidireccional)))
+    g.add((via,RUTA.longitud,Literal(longitud)))
 
-#Además se asignan las tripletas con el número dado a cada una de ellas
-for i in range(1, 52):
-    nodo = BNode()
-    intersecciones[f"Interseccion{i}"] = nodo
-    g.add((nodo, RDF.type, RUTA.Interseccion))
-    g.add((nodo, RUTA.numero, Literal(str(i), datatype=XSD.string)))
+#Se crea un diccionario en el cual se almacenan los Bnodes generados por cada interseccion
+#además se asignan las tripletas con el número dado a cada una de ellas
+def agregar_intersecciones(g, cantidad):
+    intersecciones = dict()
+    for i in range(1, cantidad + 1):
+        nodo = BNode()
+        intersecciones[f"Interseccion{i}"] = nodo
+        g.add((nodo, RDF.type, RUTA.Interseccion))
+        g.add((nodo, RUTA.numero, Literal(str(i), datatype=XSD.string)))
+    return intersecciones
 
 #Este método genera las conexiones viales del gráfico, es decir define los nodos intersectados entre sí, además establece las relaciones Nodo-Via-Nodo
-def intersecta(nodo1, nodo2, via):
+def intersecta(g, nodo1, nodo2, via):
     g.add((nodo1, RUTA.intersectaCon, nodo2))
     g.add((nodo1, RUTA.conectaCon, via))
     g.add((via, RUTA.esConectada, nodo2))
@@ -454,234 +646,322 @@ def intersecta(nodo1, nodo2, via):
             g.add((nodo2, RUTA.conectaCon, via))
             g.add((via, RUTA.esConectada, nodo1))
 
-#Se establecen cada una de las conexiones viales presentes en el grafo
-intersecta(intersecciones["Interseccion1"], intersecciones["Interseccion3"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion2"], intersecciones["Interseccion3"],RUTA.BulevarLibertadores)
-intersecta(intersecciones["Interseccion3"], intersecciones["Interseccion4"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion3"], intersecciones["Interseccion21"],RUTA.BulevarLibertadores)
-intersecta(intersecciones["Interseccion4"], intersecciones["Interseccion2"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion4"], intersecciones["Interseccion19"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion5"], intersecciones["Interseccion17"],RUTA.Carrera65)
-intersecta(intersecciones["Interseccion6"], intersecciones["Interseccion7"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion7"], intersecciones["Interseccion13"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion7"], intersecciones["Interseccion8"],RUTA.AutopistaSur)
-intersecta(intersecciones["Interseccion8"], intersecciones["Interseccion9"],RUTA.AutopistaSur)
-intersecta(intersecciones["Interseccion9"], intersecciones["Interseccion10"],RUTA.AutopistaSur)
-intersecta(intersecciones["Interseccion10"], intersecciones["Interseccion37"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion10"], intersecciones["Interseccion11"],RUTA.AutopistaSur)
-intersecta(intersecciones["Interseccion11"], intersecciones["Interseccion31"],RUTA.AutopistaSur)
-intersecta(intersecciones["Interseccion12"], intersecciones["Interseccion9"],RUTA.Calle52)
-intersecta(intersecciones["Interseccion13"], intersecciones["Interseccion7"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion7"], intersecciones["Interseccion6"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion12"], intersecciones["Interseccion36"],RUTA.Carrera64)
-intersecta(intersecciones["Interseccion13"], intersecciones["Interseccion8"],RUTA.Diagonal63B)
-intersecta(intersecciones["Interseccion14"], intersecciones["Interseccion13"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion14"], intersecciones["Interseccion15"],RUTA.Carrera64)
-intersecta(intersecciones["Interseccion14"], intersecciones["Interseccion17"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion15"], intersecciones["Interseccion12"],RUTA.Carrera64)
-intersecta(intersecciones["Interseccion16"], intersecciones["Interseccion15"],RUTA.Calle53)
-intersecta(intersecciones["Interseccion17"], intersecciones["Interseccion19"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion17"], intersecciones["Interseccion14"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion17"], intersecciones["Interseccion18"],RUTA.Carrera65)
-intersecta(intersecciones["Interseccion18"], intersecciones["Interseccion16"],RUTA.Transversal53A)
-intersecta(intersecciones["Interseccion18"], intersecciones["Interseccion40"],RUTA.Carrera65)
-intersecta(intersecciones["Interseccion19"], intersecciones["Interseccion17"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion19"], intersecciones["Interseccion18"],RUTA.Transversal53B)
-intersecta(intersecciones["Interseccion20"], intersecciones["Interseccion21"],RUTA.Transversal51a)
-intersecta(intersecciones["Interseccion19"], intersecciones["Interseccion4"],RUTA.Calle55)
-intersecta(intersecciones["Interseccion20"], intersecciones["Interseccion4"],RUTA.Carrera67B)
-intersecta(intersecciones["Interseccion20"], intersecciones["Interseccion49"],RUTA.Calle51)
-intersecta(intersecciones["Interseccion21"], intersecciones["Interseccion49"],RUTA.BulevarLibertadores)
-intersecta(intersecciones["Interseccion22"], intersecciones["Interseccion1"],RUTA.Carrera73)
-intersecta(intersecciones["Interseccion23"], intersecciones["Interseccion22"],RUTA.Carrera73)
-intersecta(intersecciones["Interseccion23"], intersecciones["Interseccion24"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion23"], intersecciones["Interseccion50"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion24"], intersecciones["Interseccion23"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion24"], intersecciones["Interseccion25"],RUTA.Carrera74)
-intersecta(intersecciones["Interseccion25"], intersecciones["Interseccion24"],RUTA.Carrera74)
-intersecta(intersecciones["Interseccion25"], intersecciones["Interseccion26"],RUTA.Calle48)
-intersecta(intersecciones["Interseccion26"], intersecciones["Interseccion25"],RUTA.Calle48)
-intersecta(intersecciones["Interseccion26"], intersecciones["Interseccion27"],RUTA.Calle48)
-intersecta(intersecciones["Interseccion27"], intersecciones["Interseccion48"],RUTA.Carrera68)
-intersecta(intersecciones["Interseccion27"], intersecciones["Interseccion28"],RUTA.Calle48)
-intersecta(intersecciones["Interseccion27"], intersecciones["Interseccion26"],RUTA.Calle48)
-intersecta(intersecciones["Interseccion28"], intersecciones["Interseccion27"],RUTA.Calle48)
-intersecta(intersecciones["Interseccion28"], intersecciones["Interseccion29"],RUTA.Calle48)
-intersecta(intersecciones["Interseccion29"], intersecciones["Interseccion28"],RUTA.Calle48)
-intersecta(intersecciones["Interseccion29"], intersecciones["Interseccion30"],RUTA.Calle48)
-intersecta(intersecciones["Interseccion29"], intersecciones["Interseccion43"],RUTA.Carrera66)
-intersecta(intersecciones["Interseccion30"], intersecciones["Interseccion29"],RUTA.Calle48)
-intersecta(intersecciones["Interseccion30"], intersecciones["Interseccion31"],RUTA.Calle48)
-intersecta(intersecciones["Interseccion30"], intersecciones["Interseccion38"],RUTA.Carrera65)
-intersecta(intersecciones["Interseccion31"], intersecciones["Interseccion30"],RUTA.Calle48)
-intersecta(intersecciones["Interseccion32"], intersecciones["Interseccion11"],RUTA.Calle49A)
-intersecta(intersecciones["Interseccion33"], intersecciones["Interseccion32"],RUTA.Carrera64B)
-intersecta(intersecciones["Interseccion34"], intersecciones["Interseccion33"],RUTA.Carrera64B)
-intersecta(intersecciones["Interseccion38"], intersecciones["Interseccion39"],RUTA.Carrera65)
-intersecta(intersecciones["Interseccion39"], intersecciones["Interseccion40"],RUTA.Carrera65)
-intersecta(intersecciones["Interseccion40"], intersecciones["Interseccion18"],RUTA.Carrera65)
-intersecta(intersecciones["Interseccion18"], intersecciones["Interseccion17"],RUTA.Carrera65)
-intersecta(intersecciones["Interseccion17"], intersecciones["Interseccion5"],RUTA.Carrera65)
-intersecta(intersecciones["Interseccion34"], intersecciones["Interseccion37"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion34"], intersecciones["Interseccion39"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion35"], intersecciones["Interseccion16"],RUTA.Calle53)
-intersecta(intersecciones["Interseccion35"], intersecciones["Interseccion40"],RUTA.Calle51)
-intersecta(intersecciones["Interseccion35"], intersecciones["Interseccion34"],RUTA.Carrera64B)
-intersecta(intersecciones["Interseccion36"], intersecciones["Interseccion35"],RUTA.Calle51)
-intersecta(intersecciones["Interseccion36"], intersecciones["Interseccion37"],RUTA.Carrera64)
-intersecta(intersecciones["Interseccion37"], intersecciones["Interseccion34"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion37"], intersecciones["Interseccion11"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion9"], intersecciones["Interseccion37"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion37"], intersecciones["Interseccion10"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion38"], intersecciones["Interseccion30"],RUTA.Carrera65)
-intersecta(intersecciones["Interseccion38"], intersecciones["Interseccion33"],RUTA.Calle49B)
-intersecta(intersecciones["Interseccion39"], intersecciones["Interseccion38"],RUTA.Carrera65)
-intersecta(intersecciones["Interseccion39"], intersecciones["Interseccion41"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion39"], intersecciones["Interseccion34"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion40"], intersecciones["Interseccion39"],RUTA.Carrera65)
-intersecta(intersecciones["Interseccion40"], intersecciones["Interseccion20"],RUTA.Calle51)
-intersecta(intersecciones["Interseccion41"], intersecciones["Interseccion44"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion41"], intersecciones["Interseccion39"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion42"], intersecciones["Interseccion41"],RUTA.Carrera66)
-intersecta(intersecciones["Interseccion42"], intersecciones["Interseccion38"],RUTA.Calle49B)
-intersecta(intersecciones["Interseccion43"], intersecciones["Interseccion42"],RUTA.Carrera66)
-intersecta(intersecciones["Interseccion44"], intersecciones["Interseccion20"],RUTA.Transversal51a)
-intersecta(intersecciones["Interseccion44"], intersecciones["Interseccion41"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion44"], intersecciones["Interseccion50"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion44"], intersecciones["Interseccion45"],RUTA.Carrera67)
-intersecta(intersecciones["Interseccion45"], intersecciones["Interseccion42"],RUTA.Calle49B)
-intersecta(intersecciones["Interseccion45"], intersecciones["Interseccion46"],RUTA.Carrera67)
-intersecta(intersecciones["Interseccion46"], intersecciones["Interseccion28"],RUTA.Carrera67)
-intersecta(intersecciones["Interseccion46"], intersecciones["Interseccion43"],RUTA.Calle48D)
-intersecta(intersecciones["Interseccion47"], intersecciones["Interseccion45"],RUTA.Calle49B)
-intersecta(intersecciones["Interseccion48"], intersecciones["Interseccion47"],RUTA.Carrera68)
-intersecta(intersecciones["Interseccion48"], intersecciones["Interseccion46"],RUTA.Calle48D)
-intersecta(intersecciones["Interseccion49"], intersecciones["Interseccion22"],RUTA.Calle51)
-intersecta(intersecciones["Interseccion49"], intersecciones["Interseccion50"],RUTA.BulevarLibertadores)
-intersecta(intersecciones["Interseccion50"], intersecciones["Interseccion51"],RUTA.BulevarLibertadores)
-intersecta(intersecciones["Interseccion50"], intersecciones["Interseccion23"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion50"], intersecciones["Interseccion44"],RUTA.AvenidaColombia)
-intersecta(intersecciones["Interseccion51"], intersecciones["Interseccion26"],RUTA.BulevarLibertadores)
-intersecta(intersecciones["Interseccion51"], intersecciones["Interseccion47"],RUTA.Calle49B)
-
-#Intersecciones desde las cuales se hacen accesibles cada uno de los puntos de referencia
-g.add((estadio,RUTA.seRelacionaCon,intersecciones["Interseccion25"]))
-g.add((estacion,RUTA.seRelacionaCon,intersecciones["Interseccion30"]))
-g.add((exito,RUTA.seRelacionaCon,intersecciones["Interseccion41"]))
-g.add((luisamigo,RUTA.seRelacionaCon,intersecciones["Interseccion20"]))
-g.add((carlose,RUTA.seRelacionaCon,intersecciones["Interseccion36"]))
-g.add((piloto,RUTA.seRelacionaCon,intersecciones["Interseccion9"]))
-g.add((unal,RUTA.seRelacionaCon,intersecciones["Interseccion5"]))
-g.add((unal,RUTA.seRelacionaCon,intersecciones["Interseccion6"]))
-
 #Función que permite agregar semáforos incluyendo el tiempo de espera en cada uno y la vía a la cual pertenece
-def agregar_semaforo(via, tiempo):
+def agregar_semaforo(g, via, tiempo):
     semaforo = BNode()
     g.add((semaforo, RDF.type, RUTA.Semaforo))
     g.add((semaforo, RUTA.tiempoEspera, Literal(tiempo, datatype=XSD.double)))
     g.add((semaforo, RUTA.estaEnVia, via))
     return semaforo
 
-#Se agregan los semáforos con sus respectivos parámetros
-agregar_semaforo(RUTA.AvenidaColombia, 45.0)
-agregar_semaforo(RUTA.Transversal51a, 40.0)
-agregar_semaforo(RUTA.Calle55, 35.0)
-agregar_semaforo(RUTA.Calle48, 30.0)
-agregar_semaforo(RUTA.Calle51, 50.0)
-agregar_semaforo(RUTA.Calle48D, 30.0)
-agregar_semaforo(RUTA.Calle49B, 40.0)
-agregar_semaforo(RUTA.Calle53, 35.0)
-agregar_semaforo(RUTA.Carrera65, 60.0)
-agregar_semaforo(RUTA.Carrera66, 45.0)
-agregar_semaforo(RUTA.Carrera67, 40.0)
-agregar_semaforo(RUTA.Carrera73, 55.0)
-agregar_semaforo(RUTA.Carrera74, 50.0)
-agregar_semaforo(RUTA.BulevarLibertadores, 45.0)
-agregar_semaforo(RUTA.Carrera68, 35.0)
-agregar_semaforo(RUTA.Carrera64, 40.0)
-agregar_semaforo(RUTA.Carrera64B, 30.0)
-
-print('Tripletas elaboradas a mano:',len(g),'\n')
 
 #Razonador
-
-#Guardamos las tripletas antes del razonamiento
-g1=set(g)
-
-print(f"Antes del análisis existe {len(g1)} tripletas\n")
-
-print("=== Tripletas de tipos antes del razonamiento ===")
-for s, p, o in g:
-    if p == RDF.type:
-        print(f"{s} {p} {o}")
-
-
-print("\n=== Tripletas de propiedades antes del razonamiento ===")
-for s, p, o in g:
-    if (str(s).startswith(str(RUTA)) or str(o).startswith(str(RUTA))) and (o!=RDFS.Resource) and (p!=RDFS.subClassOf) and (p!=RDFS.subPropertyOf):
-        print(f"{s} {p} {o}")
-
-print("\n=== Tripletas totales antes del razonamiento ===")
-for s, p, o in g:
-    print(f"{s} {p} {o}")
-
-# Aplicamos razonamiento de la librería owlrl
-DeductiveClosure(RDFS_Semantics, axiomatic_triples=True, datatype_axioms=False).expand(g)
-
-print(f"\nTras el análisis existen {len(g)} tripletas.\n")
-
-#Guardamos las tripletas después del razonamiento
-g2=set(g)
-
-print(f"Se han generado {len(g2-g1)} nuevas tripletas.\n")
-
-# Ver resultados
-
-print("=== Tripletas de tipos después del razonamiento ===")
-for s, p, o in g:
-    if p == RDF.type:
-        print(f"{s} {p} {o}")
-
-
-print("\n=== Tripletas de propiedades después del razonamiento ===")
-for s, p, o in g:
-    if (str(s).startswith(str(RUTA)) or str(o).startswith(str(RUTA))) and (o!=RDFS.Resource) and (p!=RDFS.subClassOf) and (p!=RDFS.subPropertyOf):
-        print(f"{s} {p} {o}")
-
-print("\n=== Tripletas nuevas relevantes obtenidas dentro del dominio del problema ===")
-for s, p, o in g:
-    if (s, p, o) not in g1:
-        if (str(s).startswith(str(RUTA)) or str(p).startswith(str(RUTA)) or str(o).startswith(str(RUTA))) and ((o!=RDFS.Resource)):
+def razonar(g: Graph, verbosidad=0, razonador="owlrl"):
+    """
+    Aplica el razonamiento RDFS sobre el grafo con el `razonador` dado ("owlrl" o "dirigido", ver
+    ConfigOntologia.razonador), imprimiendo las tripletas antes y después del razonamiento según la
+    `verbosidad`
+    """
+    inicio = time.perf_counter()
+
+    #Guardamos las tripletas antes del razonamiento
+    g1=set(g)
+
+    if verbosidad >= 1:
+        print(f"Antes del análisis existe {len(g1)} tripletas\n")
+
+    if verbosidad >= 2:
+        print("=== Tripletas de tipos antes del razonamiento ===")
+        for s, p, o in g:
+            if p == RDF.type:
+                print(f"{s} {p} {o}")
+
+        print("\n=== Tripletas de propiedades antes del razonamiento ===")
+        for s, p, o in g:
+            if (str(s).startswith(str(RUTA)) or str(o).startswith(str(RUTA))) and (o!=RDFS.Resource) and (p!=RDFS.subClassOf) and (p!=RDFS.subPropertyOf):
+                print(f"{s} {p} {o}")
+
+        print("\n=== Tripletas totales antes del razonamiento ===")
+        for s, p, o in g:
             print(f"{s} {p} {o}")
 
+    match razonador:
+        case "owlrl":
+            # Aplicamos razonamiento de la librería owlrl
+            DeductiveClosure(RDFS_Semantics, axiomatic_triples=True, datatype_axioms=False).expand(g)
+        case "dirigido":
+            razonar_dirigido(g)
+        case _:
+            raise Exception(f"razonador desconocido: {razonador}")
+
+    if verbosidad >= 1:
+        print(f"\nTras el análisis existen {len(g)} tripletas ({time.perf_counter() - inicio:.3f} s).\n")
+
+        #Guardamos las tripletas después del razonamiento
+        g2=set(g)
+
+        print(f"Se han generado {len(g2-g1)} nuevas tripletas.\n")
+
+    # Ver resultados
+    if verbosidad >= 2:
+        print("=== Tripletas de tipos después del razonamiento ===")
+        for s, p, o in g:
+            if p == RDF.type:
+                print(f"{s} {p} {o}")
+
+        print("\n=== Tripletas de propiedades después del razonamiento ===")
+        for s, p, o in g:
+            if (str(s).startswith(str(RUTA)) or str(o).startswith(str(RUTA))) and (o!=RDFS.Resource) and (p!=RDFS.subClassOf) and (p!=RDFS.subPropertyOf):
+                print(f"{s} {p} {o}")
+
+        print("\n=== Tripletas nuevas relevantes obtenidas dentro del dominio del problema ===")
+        for s, p, o in g:
+            if (s, p, o) not in g1:
+                if (str(s).startswith(str(RUTA)) or str(p).startswith(str(RUTA)) or str(o).startswith(str(RUTA))) and ((o!=RDFS.Resource)):
+                    print(f"{s} {p} {o}")
+
+
+def razonar_dirigido(g: Graph):
+    """
+    Materializa solo las inferencias RDFS que necesita el traductor:
+        - rdfs9: si s tiene tipo C y C es subclase de D, s tiene tipo D
+        - rdfs7: si (s p o) y p es subpropiedad de q, entonces (s q o) (p. ej. intersectaCon implica
+          seRelacionaCon)
+    usando las jerarquías de clases y propiedades del esquema precalculadas con `jerarquia`.
+
+    A diferencia de la clausura de owlrl no agrega los tipos rdfs:Resource, los axiomas, los tipos
+    por dominio y rango ni las tripletas de las jerarquías, que el traductor descarta
+    """
+    superpropiedades = jerarquia(g, RDFS.subPropertyOf)
+    nuevas = [
+        (s, ancestro, o)
+        for propiedad, ancestros in superpropiedades.items()
+        for s, _, o in g.triples((None, propiedad, None))
+        for ancestro in ancestros
+    ]
+    for tripleta in nuevas:
+        g.add(tripleta)
+
+    # los tipos se propagan después, por si alguna tripleta nueva es de RDF.type
+    superclases = jerarquia(g, RDFS.subClassOf)
+    nuevas = [
+        (s, RDF.type, ancestro)
+        for clase, ancestros in superclases.items()
+        for s in g.subjects(RDF.type, clase)
+        for ancestro in ancestros
+    ]
+    for tripleta in nuevas:
+        g.add(tripleta)
+
+
+def jerarquia(g: Graph, relacion) -> dict:
+    """
+    Retorna un diccionario cuyas llaves son las clases (o propiedades) que tienen alguna superclase
+    (o superpropiedad) en `g` según la `relacion` (RDFS.subClassOf o RDFS.subPropertyOf) y cuyos
+    valores son el frozenset de todos sus ancestros, directos e indirectos, sin incluirlas a ellas
+    """
+    padres = defaultdict(set)
+    for hijo, _, padre in g.triples((None, relacion, None)):
+        padres[hijo].add(padre)
+
+    ancestros = {}
+    for nodo in padres:
+        vistos = set()
+        pendientes = list(padres[nodo])
+        while pendientes:
+            actual = pendientes.pop()
+            if actual in vistos:
+                continue
+            vistos.add(actual)
+            pendientes.extend(padres.get(actual, ()))
+        vistos.discard(nodo)
+        ancestros[nodo] = frozenset(vistos)
+    return ancestros
+
+
+class RazonadorIncremental:
+    """
+    Mantiene razonado el grafo `g` con las mismas inferencias de `razonar_dirigido` mientras se le
+    agregan o quitan tripletas, derivando solo las inferencias que cambian con cada modificación.
+
+    Como las jerarquías de clases y propiedades se precalculan, cada inferencia se deriva en un solo
+    paso desde una tripleta explícita, así que basta con contar cuántas tripletas explícitas la
+    soportan: una inferencia se agrega al grafo cuando su soporte pasa de 0 a 1 y se quita cuando
+    vuelve a 0 (y no es explícita). Si la modificación cambia las jerarquías (tripletas
+    subClassOf o subPropertyOf) se recalculan todas las inferencias.
+
+    Las tripletas se pueden tomar de un grafo auxiliar, p. ej. para agregar un semáforo:
+        nuevas = Graph()
+        agregar_semaforo(nuevas, via, 30.0)
+        razonador.agregar(nuevas)
+
+    Campos:
+        - g: el grafo razonado (no se debe modificar directamente)
+        - explicitas: las tripletas de `g` que no son inferidas
+        - soporte: llave tripleta inferida, valor número de tripletas explícitas que la derivan
+    """
+
+    def __init__(self, g: Graph):
+        """
+        Parámetros:
+            - g: grafo sin razonar; todas sus tripletas se consideran explícitas
+        """
+        self.g = g
+        self.explicitas = set(g)
+        self.soporte = defaultdict(int)
+        self._calcular_jerarquias()
+        for tripleta in self._agregar_soporte(self.explicitas):
+            g.add(tripleta)
+
+    def agregar(self, tripletas) -> set:
+        """
+        Agrega `tripletas` (explícitas) al grafo junto con sus inferencias. Retorna el `set` de
+        tripletas inferidas que se agregaron al grafo
+        """
+        nuevas = [tripleta for tripleta in tripletas if tripleta not in self.explicitas]
+        self.explicitas.update(nuevas)
+        if any(p in (RDFS.subClassOf, RDFS.subPropertyOf) for _, p, _ in nuevas):
+            for tripleta in nuevas:
+                self.g.add(tripleta)
+            return self._recalcular()[0]
+
+        inferidas = set()
+        for tripleta in self._agregar_soporte(nuevas):
+            if tripleta not in self.explicitas:
+                inferidas.add(tripleta)
+        for tripleta in nuevas:
+            self.g.add(tripleta)
+        for tripleta in inferidas:
+            self.g.add(tripleta)
+        return inferidas
+
+    def quitar(self, tripletas) -> set:
+        """
+        Quita `tripletas` del grafo junto con las inferencias que ya no tienen soporte. Retorna el
+        `set` de tripletas inferidas que se quitaron del grafo. Las tripletas que no son explícitas
+        se ignoran (seguirían derivándose de las demás)
+        """
+        quitadas = {tripleta for tripleta in tripletas if tripleta in self.explicitas}
+        self.explicitas.difference_update(quitadas)
+        if any(p in (RDFS.subClassOf, RDFS.subPropertyOf) for _, p, _ in quitadas):
+            # las jerarquías se leen del grafo, así que primero se quitan las tripletas; las que
+            # se sigan infiriendo las vuelve a agregar _recalcular
+            for tripleta in quitadas:
+                self.g.remove(tripleta)
+            return self._recalcular()[1] - quitadas
+
+        invalidadas = set()
+        for tripleta in self._quitar_soporte(quitadas):
+            if tripleta not in self.explicitas and tripleta not in quitadas:
+                invalidadas.add(tripleta)
+        for tripleta in quitadas:
+            # una tripleta explícita que también se infiere se queda en el grafo como inferida
+            if self.soporte.get(tripleta, 0) == 0:
+                self.g.remove(tripleta)
+        for tripleta in invalidadas:
+            self.g.remove(tripleta)
+        return invalidadas
+
+    def _calcular_jerarquias(self):
+        self._superpropiedades = jerarquia(self.g, RDFS.subPropertyOf)
+        self._superclases = jerarquia(self.g, RDFS.subClassOf)
+
+    def _derivadas(self, tripleta):
+        """
+        Retorna la lista de tripletas que se derivan en un paso de `tripleta` (reglas rdfs7 y rdfs9
+        con las jerarquías precalculadas, como en `razonar_dirigido`)
+        """
+        s, p, o = tripleta
+        derivadas = []
+        for ancestro in self._superpropiedades.get(p, ()):
+            derivadas.append((s, ancestro, o))
+            if ancestro == RDF.type:
+                derivadas.extend((s, RDF.type, clase) for clase in self._superclases.get(o, ()))
+        if p == RDF.type:
+            derivadas.extend((s, RDF.type, clase) for clase in self._superclases.get(o, ()))
+        return derivadas
+
+    def _agregar_soporte(self, tripletas) -> list:
+        """
+        Suma el soporte de las derivadas de `tripletas` y retorna las que pasaron de 0 a 1
+        """
+        nuevas = []
+        for tripleta in tripletas:
+            for derivada in self._derivadas(tripleta):
+                self.soporte[derivada] += 1
+                if self.soporte[derivada] == 1:
+                    nuevas.append(derivada)
+        return nuevas
+
+    def _quitar_soporte(self, tripletas) -> list:
+        """
+        Resta el soporte de las derivadas de `tripletas` y retorna las que quedaron sin soporte
+        """
+        sin_soporte = []
+        for tripleta in tripletas:
+            for derivada in self._derivadas(tripleta):
+                self.soporte[derivada] -= 1
+                if self.soporte[derivada] == 0:
+                    del self.soporte[derivada]
+                    sin_soporte.append(derivada)
+        return sin_soporte
+
+    def _recalcular(self) -> tuple[set, set]:
+        """
+        Recalcula todas las inferencias con las jerarquías actuales. Retorna los `set` de tripletas
+        inferidas que se agregaron y que se quitaron del grafo
+        """
+        anteriores = set(self.soporte) - self.explicitas
+        self._calcular_jerarquias()
+        self.soporte = defaultdict(int)
+        self._agregar_soporte(self.explicitas)
+        actuales = set(self.soporte) - self.explicitas
+
+        for tripleta in anteriores - actuales:
+            self.g.remove(tripleta)
+        # se agregan todas las inferencias actuales (no solo las nuevas) porque alguna pudo haberse
+        # quitado del grafo como tripleta explícita (ver `quitar`)
+        for tripleta in actuales:
+            self.g.add(tripleta)
+        return actuales - anteriores, anteriores - actuales
 
-#Serialización parcial de la Ontología en Turtle
-#print(g.serialize(format="turtle"))
 
 '''A partir de ahora usaremos grafos y recorridos dfs para generar todas las
 posibles rutas entre cada uno de los puntos de interés y guardarlas en tripletas
 específicas que luego podrán ser comparadas en el sistema experto para
 determinar cual es la mejor ruta de todas entre dos puntos específicos'''
 
-#Se crea el grafo usando la librería networkx
-G = nx.DiGraph()
+def construir_grafo_vial(g: Graph) -> nx.DiGraph:
+    """
+    Crea el grafo dirigido de networkx cuyos nodos son las intersecciones de la ontología (con su
+    número) y cuyas aristas guardan la vía que las conecta, su nombre, su longitud (km) y el tiempo
+    en horas que toma recorrerla a su velocidad promedio
+    """
+    G = nx.DiGraph()
 
-#Se obtienen los nodos del grafo filtrando las tripletas de la ontología
-for s, _, _ in g.triples((None, RDF.type, RUTA.Interseccion)):
-    G.add_node(s)
+    #Se obtienen los nodos del grafo filtrando las tripletas de la ontología
+    for s, _, _ in g.triples((None, RDF.type, RUTA.Interseccion)):
+        G.add_node(s, numero=str(g.value(s, RUTA.numero)))
 
-#Se obtienen las vias del grafo filtrando las tripletas de la ontología
-for inter, _, via in g.triples((None, RUTA.conectaCon, None)):
-    for _, _, inter2 in g.triples((via, RUTA.esConectada, None)):
-        G.add_edge(inter, inter2, via=via)
+    #Se obtienen las vias del grafo filtrando las tripletas de la ontología
+    for inter, _, via in g.triples((None, RUTA.conectaCon, None)):
+        nombre = str(g.value(via, RUTA.nombre))
+        longitud = float(g.value(via, RUTA.longitud))
+        tiempo = longitud / float(g.value(via, RUTA.velocidadPromedio))
+        for _, _, inter2 in g.triples((via, RUTA.esConectada, None)):
+            G.add_edge(inter, inter2, via=via, nombre=nombre, longitud=longitud, tiempo=tiempo)
+
+    return G
 
 #Se establecen referencias numéricas a cada intersección
-mapa_numeros = {}
-for s, _, num in g.triples((None, RUTA.numero, None)):
-    try:
-        mapa_numeros[s] = int(num)
-    except ValueError:
-        continue
+def mapa_numeros_intersecciones(g: Graph) -> dict:
+    mapa_numeros = {}
+    for s, _, num in g.triples((None, RUTA.numero, None)):
+        try:
+            mapa_numeros[s] = int(num)
+        except ValueError:
+            continue
+    return mapa_numeros
 
 '''Método que usa dfs para calcular todas las posibles vias entre los
 intersecciones definidas por sus números con una longitud máxima de 10 y
@@ -706,9 +986,273 @@ def rutas_sin_repetir_vias(G, inicio, fin, cutoff=10):
     dfs(inicio, fin, [(inicio, None)], set(), {inicio}, 0)
     return rutas
 
+class GrafoCSR:
+    """
+    Grafo vial con índices enteros en formato CSR (compressed sparse row), construido a partir del
+    grafo de networkx de `construir_grafo_vial` y usado por `iterar_rutas_sin_repetir_vias`. Los
+    vecinos de cada nodo conservan el orden de networkx, así que las rutas se enumeran en el mismo
+    orden que con `rutas_sin_repetir_vias`.
+    Campos:
+        - nodos: lista con el nodo (BNode) de cada índice
+        - indices: diccionario {nodo: índice}
+        - vias: lista con la vía (URIRef) de cada índice de vía
+        - indices_vias: diccionario {vía: índice}
+        - inicios: los vecinos del nodo i están en las posiciones inicios[i]:inicios[i + 1]
+        - vecinos: índice del nodo vecino de cada arista
+        - vias_aristas: índice de la vía de cada arista
+        - longitudes: longitud (km) de cada arista
+        - sello_nodos, sello_vias: sellos de visita de cada nodo y vía (ver `nuevo_sello`)
+    """
+
+    def __init__(self, G: nx.DiGraph):
+        self.nodos = list(G.nodes)
+        self.indices = {nodo: i for i, nodo in enumerate(self.nodos)}
+        self.vias = []
+        self.indices_vias = indices_vias = {}
+        self.inicios = array("i", [0])
+        self.vecinos = array("i")
+        self.vias_aristas = array("i")
+        self.longitudes = array("d")
+        for nodo in self.nodos:
+            for vecino, datos in G[nodo].items():
+                via = datos["via"]
+                if via not in indices_vias:
+                    indices_vias[via] = len(self.vias)
+                    self.vias.append(via)
+                self.vecinos.append(self.indices[vecino])
+                self.vias_aristas.append(indices_vias[via])
+                self.longitudes.append(datos["longitud"])
+            self.inicios.append(len(self.vecinos))
+
+        self.sello_nodos = array("i", [0]) * len(self.nodos)
+        self.sello_vias = array("i", [0]) * len(self.vias)
+        self._sello = 0
+
+    def nuevo_sello(self) -> int:
+        """
+        Retorna un sello nuevo: un nodo (o vía) está visitado en un recorrido si su sello es el del
+        recorrido, así que no hay que limpiar los arreglos de sellos entre recorridos
+        """
+        self._sello += 1
+        return self._sello
+
+
+'''Versión iterativa de `rutas_sin_repetir_vias` sobre un `GrafoCSR`: genera las mismas rutas en
+el mismo orden, una a una, sin crear conjuntos nuevos en cada paso (los nodos y vías visitados se
+marcan con sellos y se desmarcan al retroceder). Si se pasan las `cotas` de `cotas_distancia` para
+`fin`, se podan las ramas cuya distancia recorrida más la cota del nodo siguiente supera `umbral`,
+así que solo se generan las rutas de distancia menor o igual a `umbral`'''
+def iterar_rutas_sin_repetir_vias(csr: GrafoCSR, inicio, fin, cutoff=10, cotas=None, umbral=inf):
+    nodos, vias = csr.nodos, csr.vias
+    inicios, vecinos, vias_aristas, longitudes = csr.inicios, csr.vecinos, csr.vias_aristas, csr.longitudes
+    sello_nodos, sello_vias = csr.sello_nodos, csr.sello_vias
+    podar = cotas is not None
+    # las cotas y la distancia recorrida se suman en otro orden que la distancia del Motor, así que
+    # se deja un margen para no podar por errores de redondeo
+    umbral_poda = umbral * (1 + 1e-9)
+
+    if inicio == fin:
+        yield [(inicio, None)]
+        return
+
+    origen = csr.indices[inicio]
+    destino = csr.indices[fin]
+    sello = csr.nuevo_sello()
+    sello_nodos[origen] = sello
+
+    # pilas del recorrido: nodos y vías del camino actual, la siguiente arista por revisar de cada
+    # nodo y la distancia recorrida hasta cada nodo (sumada en el orden de la ruta, como en el Motor)
+    camino_nodos = [origen]
+    camino_vias = []
+    cursores = [inicios[origen]]
+    distancias = [0]
+    while cursores:
+        actual = camino_nodos[-1]
+        cursor = cursores[-1]
+        ultimo = inicios[actual + 1]
+        while cursor < ultimo:
+            vecino = vecinos[cursor]
+            via = vias_aristas[cursor]
+            cursor += 1
+            if sello_vias[via] == sello or sello_nodos[vecino] == sello:
+                continue
+            if podar:
+                distancia = distancias[-1] + longitudes[cursor - 1]
+                if distancia + cotas[vecino] > umbral_poda:
+                    continue
+            if vecino == destino:
+                if podar and distancia > umbral:
+                    continue
+                ruta = [(inicio, None)]
+                ruta.extend((nodos[n], vias[v]) for n, v in zip(camino_nodos[1:], camino_vias))
+                ruta.append((fin, vias[via]))
+                yield ruta
+                continue
+            if len(camino_nodos) <= cutoff - 1:
+                cursores[-1] = cursor
+                sello_nodos[vecino] = sello
+                sello_vias[via] = sello
+                camino_nodos.append(vecino)
+                camino_vias.append(via)
+                cursores.append(inicios[vecino])
+                if podar:
+                    distancias.append(distancia)
+                break
+        else:
+            # se revisaron todas las aristas del nodo actual: se retrocede
+            cursores.pop()
+            sello_nodos[camino_nodos.pop()] = 0
+            if camino_vias:
+                sello_vias[camino_vias.pop()] = 0
+                if podar:
+                    distancias.pop()
+
+
+# la regla eliminar_rutas_muy_largas del Motor elimina las rutas que miden más de este factor por
+# la distancia de la ruta más corta
+FACTOR_DISTANCIA_MAXIMA = 3
+
+
+def cotas_distancia(G: nx.DiGraph, csr: GrafoCSR, fin) -> array:
+    """
+    Retorna un arreglo con una cota inferior admisible de la distancia (km) que falta desde cada
+    nodo de `csr` hasta `fin`: la del camino más corto por longitud (Dijkstra sobre el grafo
+    invertido), que no tiene en cuenta las vías repetidas ni el cutoff. Es inf si no hay camino
+    """
+    cotas = array("d", [inf]) * len(csr.nodos)
+    for nodo, distancia in nx.single_source_dijkstra_path_length(G.reverse(copy=False), fin, weight="longitud").items():
+        cotas[csr.indices[nodo]] = distancia
+    return cotas
+
+
+def vias_cerradas(g: Graph) -> set:
+    """
+    Retorna el `set` de vías afectadas por algún evento de cierre total, que la regla
+    evento_cierre_total del Motor elimina con todas sus rutas
+    """
+    cerradas = set()
+    for via, _, evento in g.triples((None, RUTA.afectadaPor, None)):
+        cierre = g.value(evento, RUTA.cierreTotal)
+        if cierre is not None and cierre.toPython():
+            cerradas.add(via)
+    return cerradas
+
+
+def vias_cerradas_para(g: Graph, config: ConfigOntologia) -> frozenset:
+    """
+    Retorna las vías con cierre total que la generación de rutas tiene que evitar con la
+    configuración `config`: las usa la poda (`podar_rutas`) y el modo "k_mejores". En el modo
+    "todas" sin poda se generan todas las rutas y es el Motor el que elimina las que están cerradas
+    """
+    if config.podar_rutas or config.modo_rutas == "k_mejores":
+        return frozenset(vias_cerradas(g))
+    return frozenset()
+
+
+def grafo_sin_vias(G: nx.DiGraph, vias) -> nx.DiGraph:
+    """
+    Retorna una vista de `G` sin las aristas de las `vias` dadas (el mismo `G` si no hay ninguna)
+    """
+    if not vias:
+        return G
+    return nx.subgraph_view(G, filter_edge=lambda a, b: G[a][b]["via"] not in vias)
+
+
+def distancia_minima_valida(csr: GrafoCSR, inicio, fin, cutoff, cotas, cerradas=frozenset(), mejor=inf) -> float:
+    """
+    Retorna la distancia de la ruta más corta entre `inicio` y `fin` que no repite vías, tiene a lo
+    sumo `cutoff` vías y no pasa por las vías `cerradas` (inf si no hay ninguna, o `mejor` si no hay
+    una más corta que `mejor`). Es una búsqueda en profundidad que poda con las `cotas` de
+    `cotas_distancia` las ramas que no pueden mejorar la mejor distancia encontrada
+    """
+    if inicio == fin:
+        return 0
+    inicios, vecinos, vias_aristas, longitudes = csr.inicios, csr.vecinos, csr.vias_aristas, csr.longitudes
+    sello_nodos, sello_vias = csr.sello_nodos, csr.sello_vias
+    origen = csr.indices[inicio]
+    destino = csr.indices[fin]
+    sello = csr.nuevo_sello()
+    sello_nodos[origen] = sello
+    # las vías cerradas se marcan como visitadas para no pasar por ellas
+    for via in cerradas:
+        if via in csr.indices_vias:
+            sello_vias[csr.indices_vias[via]] = sello
+
+    camino_nodos = [origen]
+    camino_vias = []
+    cursores = [inicios[origen]]
+    distancias = [0]
+    while cursores:
+        actual = camino_nodos[-1]
+        cursor = cursores[-1]
+        ultimo = inicios[actual + 1]
+        while cursor < ultimo:
+            vecino = vecinos[cursor]
+            via = vias_aristas[cursor]
+            cursor += 1
+            if sello_vias[via] == sello or sello_nodos[vecino] == sello:
+                continue
+            distancia = distancias[-1] + longitudes[cursor - 1]
+            if distancia + cotas[vecino] >= mejor:
+                continue
+            if vecino == destino:
+                mejor = distancia
+                continue
+            if len(camino_nodos) <= cutoff - 1:
+                cursores[-1] = cursor
+                sello_nodos[vecino] = sello
+                sello_vias[via] = sello
+                camino_nodos.append(vecino)
+                camino_vias.append(via)
+                cursores.append(inicios[vecino])
+                distancias.append(distancia)
+                break
+        else:
+            cursores.pop()
+            sello_nodos[camino_nodos.pop()] = 0
+            if camino_vias:
+                sello_vias[camino_vias.pop()] = 0
+                distancias.pop()
+
+    return mejor
+
+'''Método que genera solo las `k` rutas más rápidas (usando el tiempo de cada vía a
+su velocidad promedio como peso) entre dos intersecciones, con el algoritmo de Yen
+de networkx. Se descartan las rutas que repiten vías o que superan `cutoff` vías,
+y para no recorrer todas las rutas simples cuando hay menos de `k` válidas se
+examinan como máximo `max_candidatos` rutas'''
+def k_rutas_mas_rapidas(G, inicio, fin, k, cutoff=10, max_candidatos=None):
+    if max_candidatos is None:
+        max_candidatos = 20 * k
+    rutas = []
+    try:
+        candidatos = nx.shortest_simple_paths(G, inicio, fin, weight="tiempo")
+        for examinados, nodos in enumerate(candidatos, 1):
+            if len(nodos) - 1 <= cutoff:
+                vias = [G[a][b]["via"] for a, b in zip(nodos, nodos[1:])]
+                if len(set(vias)) == len(vias):
+                    rutas.append([(nodos[0], None)] + list(zip(nodos[1:], vias)))
+                    if len(rutas) == k:
+                        break
+            if examinados >= max_candidatos:
+                break
+    except nx.NetworkXNoPath:
+        pass
+    return rutas
+
+# separadores de los literales de la codificación compacta de las rutas (los números de las
+# intersecciones no tienen espacios y los nombres de las vías no tienen "|")
+SEPARADOR_NODOS = " "
+SEPARADOR_VIAS = "|"
+
 '''Método mediante el cual se crean rutas y se les asigna un número para agregar
-como tripletas a la ontología según lo arrojado del método anterior'''
-def agregar_ruta_al_grafo(ruta, id, origen, destino):
+como tripletas a la ontología según lo arrojado del método anterior. La codificación
+"compacta" necesita el grafo vial `G` (ver construir_grafo_vial)'''
+def agregar_ruta_al_grafo(g, ruta, id, origen, destino, codificacion="coleccion", G=None):
+    # se valida antes de agregar tripletas para no dejar una ruta a medias en el grafo
+    if codificacion == "compacta" and G is None:
+        raise Exception("la codificación compacta de las rutas necesita el grafo vial G")
+
     ruta_node = BNode()
     g.add((ruta_node, RDF.type, RUTA.Ruta))
     g.add((ruta_node, RUTA.numeracion, Literal(f"Ruta{id}")))
@@ -717,58 +1261,242 @@ def agregar_ruta_al_grafo(ruta, id, origen, destino):
     g.add((ruta_node, RUTA.origen, origen))
     g.add((ruta_node, RUTA.destino, destino))
 
-    # Secuencia de intersecciones de la ruta usando Collections y Bnodes
-    nodos_ruta = [nodo for nodo, _ in ruta]
-    lista_nodos = BNode()
-    Collection(g, lista_nodos, nodos_ruta)
-    g.add((ruta_node, RUTA.tieneNodos, lista_nodos))
-
-    # Secuencia de vias de la ruta usando Collections y Bnodes
-    vias_ruta = [via for _, via in ruta if via is not None]
-    lista_vias = BNode()
-    Collection(g, lista_vias, vias_ruta)
-    g.add((ruta_node, RUTA.tieneVias, lista_vias))
+    match codificacion:
+        case "coleccion":
+            # Secuencia de intersecciones de la ruta usando Collections y Bnodes
+            nodos_ruta = [nodo for nodo, _ in ruta]
+            lista_nodos = BNode()
+            Collection(g, lista_nodos, nodos_ruta)
+            g.add((ruta_node, RUTA.tieneNodos, lista_nodos))
+
+            # Secuencia de vias de la ruta usando Collections y Bnodes
+            vias_ruta = [via for _, via in ruta if via is not None]
+            lista_vias = BNode()
+            Collection(g, lista_vias, vias_ruta)
+            g.add((ruta_node, RUTA.tieneVias, lista_vias))
+        case "compacta":
+            # Los números y nombres se toman del grafo vial `G` (ver construir_grafo_vial) para no
+            # consultar la ontología por cada intersección
+            numeros = [G.nodes[nodo]["numero"] for nodo, _ in ruta]
+            nombres = [G[a][b]["nombre"] for (a, _), (b, _) in zip(ruta, ruta[1:])]
+            g.add((ruta_node, RUTA.nodosCodificados, Literal(SEPARADOR_NODOS.join(numeros))))
+            g.add((ruta_node, RUTA.viasCodificadas, Literal(SEPARADOR_VIAS.join(nombres))))
+        case _:
+            raise Exception(f"codificación de rutas desconocida: {codificacion}")
 
     #Se retorna el BNode de la ruta
     return ruta_node
 
-#Se define una lista con los puntos de referencia creados anteriormente
-puntos_referencia = [unal, estadio, exito, luisamigo, estacion, piloto, carlose]
-
 #Se crea un diccionario que contiene las intersecciones desde las cuales se
 #puede acceder a cada punto de referencia
-mapa_origen_destino = {}
-for punto in puntos_referencia:
-    inters = []
-    for _, _, inter in g.triples((punto, RUTA.seRelacionaCon, None)):
-        inters.append(inter)
-    mapa_origen_destino[punto] = inters
+def mapa_puntos_referencia(g: Graph) -> dict:
+    #Además de los puntos de referencia del mapa se incluyen los que tenga el grafo (p. ej. los de
+    #las redes sintéticas de benchmark.py), en orden para que la numeración de las rutas sea estable
+    otros = set(g.subjects(RDF.type, RUTA.PuntoReferencia)) - set(puntos_referencia)
+    mapa_origen_destino = {}
+    for punto in puntos_referencia + sorted(otros):
+        inters = []
+        for _, _, inter in g.triples((punto, RUTA.seRelacionaCon, None)):
+            inters.append(inter)
+        mapa_origen_destino[punto] = inters
+    return mapa_origen_destino
 
 '''Se agregan las rutas como tripletas al grafo usando los métodos definidos
-anteriormente y teniendo en cuenta los valores agregados en el diccionario
-anterior. Tras este proceso se obtienen en el grafo de la Ontología todas las
+anteriormente y teniendo en cuenta los valores del diccionario de puntos de
+referencia. Tras este proceso se obtienen en el grafo de la Ontología todas las
 posibles rutas que se pueden realizar entre los puntos de referencia definidos
 anteriormente'''
-contador = 1
-for p_origen, origenes in mapa_origen_destino.items():
-    for p_destino, destinos in mapa_origen_destino.items():
-        if p_origen == p_destino:
-            continue
-        for origen in origenes:
-            for destino in destinos:
-                if origen == destino:
-                    continue
-                rutas = rutas_sin_repetir_vias(G, origen, destino, cutoff=6)
-                for ruta in rutas:
-                    agregar_ruta_al_grafo(ruta, contador, origen, destino)
-                    contador += 1
-
-print("Total de tripletas con todas las rutas:", len(g))
+def agregar_rutas(g: Graph, config: ConfigOntologia):
+    inicio = time.perf_counter()
+
+    G = construir_grafo_vial(g)
+    csr = GrafoCSR(G)
+    cerradas = vias_cerradas_para(g, config)
+    mapa_origen_destino = mapa_puntos_referencia(g)
+
+    #Cada par de puntos de referencia es independiente, así que se pueden generar en paralelo
+    pares = [
+        (origenes, destinos)
+        for p_origen, origenes in mapa_origen_destino.items()
+        for p_destino, destinos in mapa_origen_destino.items()
+        if p_origen != p_destino
+    ]
+    if config.trabajadores > 1:
+        resultados = _generar_rutas_en_paralelo(G, pares, config, cerradas)
+    else:
+        resultados = (generar_rutas_puntos(G, origenes, destinos, config, csr, cerradas) for origenes, destinos in pares)
+
+    #Las rutas se numeran al agregarlas, en el orden de los pares
+    contador = 1
+    for resultado in resultados:
+        for origen, destino, rutas in resultado:
+            for ruta in rutas:
+                agregar_ruta_al_grafo(g, ruta, contador, origen, destino, config.codificacion_rutas, G)
+                contador += 1
+
+    if config.verbosidad >= 1:
+        print("Total de tripletas con todas las rutas:", len(g), f"({time.perf_counter() - inicio:.3f} s)")
+
+
+# grafo vial, GrafoCSR, configuración y vías cerradas de cada proceso trabajador de
+# `_generar_rutas_en_paralelo`, se envían una sola vez al crear el proceso
+_datos_trabajador = None
+
+
+def _iniciar_trabajador(G, config: ConfigOntologia, cerradas):
+    global _datos_trabajador
+    _datos_trabajador = (G, GrafoCSR(G), config, cerradas)
+
+
+def _generar_rutas_puntos_trabajador(par) -> list:
+    G, csr, config, cerradas = _datos_trabajador
+    origenes, destinos = par
+    return generar_rutas_puntos(G, origenes, destinos, config, csr, cerradas)
+
+
+def _generar_rutas_en_paralelo(G, pares, config: ConfigOntologia, cerradas) -> list:
+    """
+    Genera las rutas de cada par (origenes, destinos) de puntos de referencia en un grupo de
+    `config.trabajadores` procesos. Retorna los resultados de `generar_rutas_puntos` en el orden de
+    `pares`, sin importar cuál proceso termina primero
+    """
+    with ProcessPoolExecutor(
+        max_workers=config.trabajadores, initializer=_iniciar_trabajador, initargs=(G, config, cerradas)
+    ) as ejecutor:
+        return list(ejecutor.map(_generar_rutas_puntos_trabajador, pares))
+
+
+#Genera las rutas entre dos intersecciones según el modo de la configuración. En el modo "todas"
+#se recorre el GrafoCSR de G (si no se pasa `csr` se construye uno). En el modo "k_mejores" la
+#búsqueda no pasa por las vías `cerradas`, pues el Motor eliminaría esas rutas y el par podría
+#quedarse sin ninguna
+def generar_rutas_par(G, origen, destino, config: ConfigOntologia, csr: GrafoCSR | None = None, cerradas=frozenset()):
+    match config.modo_rutas:
+        case "todas":
+            if csr is None:
+                csr = GrafoCSR(G)
+            return list(iterar_rutas_sin_repetir_vias(csr, origen, destino, cutoff=config.cutoff))
+        case "k_mejores":
+            return k_rutas_mas_rapidas(grafo_sin_vias(G, cerradas), origen, destino, config.k_rutas, cutoff=config.cutoff)
+        case modo:
+            raise Exception(f"modo de generación de rutas desconocido: {modo}")
+
+
+def generar_rutas_puntos(G, origenes, destinos, config: ConfigOntologia, csr=None, cerradas=frozenset()) -> list:
+    """
+    Genera las rutas de cada par de intersecciones (origen, destino) de dos puntos de referencia, en
+    el mismo orden que los ciclos de `agregar_rutas`. Retorna una lista de tuplas
+    (origen, destino, rutas)
+
+    Con `config.podar_rutas` (en el modo "todas") primero se calcula la distancia de la ruta válida
+    más corta entre los dos puntos (`distancia_minima_valida`, sin pasar por las vías `cerradas`) y
+    luego solo se generan las rutas que no superan FACTOR_DISTANCIA_MAXIMA veces esa distancia,
+    podando la búsqueda con las cotas de `cotas_distancia`. Son las rutas que la regla
+    eliminar_rutas_muy_largas del Motor no descartaría, con una salvedad: el Motor toma la mínima
+    entre las rutas que siguen vivas, y además de las vías con cierre total (que aquí se excluyen
+    del cálculo) también elimina las vías cuya fluidez difusa resulta "nula", que dependen de una
+    congestión aleatoria. Si la ruta más corta pasa por una de esas vías, el Motor habría conservado
+    algunas rutas más largas que aquí se podan, por lo que la poda es opcional.
+
+    Parámetros:
+        - G: el grafo vial de `construir_grafo_vial`
+        - origenes, destinos: intersecciones de los puntos de referencia de origen y destino
+        - config: configuración con el modo de generación, el cutoff y si se podan las rutas
+        - csr: el GrafoCSR de `G` (si es None se construye)
+        - cerradas: vías con cierre total (ver `vias_cerradas_para`), que no se usan para la
+          distancia mínima de la poda ni en las búsquedas del modo "k_mejores"
+    """
+    if csr is None:
+        csr = GrafoCSR(G)
+    pares = [(origen, destino) for origen in origenes for destino in destinos if origen != destino]
+
+    if not (config.podar_rutas and config.modo_rutas == "todas"):
+        return [
+            (origen, destino, generar_rutas_par(G, origen, destino, config, csr, cerradas))
+            for origen, destino in pares
+        ]
+
+    cotas = {destino: cotas_distancia(G, csr, destino) for destino in destinos}
+    minima = inf
+    for origen, destino in pares:
+        minima = distancia_minima_valida(csr, origen, destino, config.cutoff, cotas[destino], cerradas, minima)
+    umbral = FACTOR_DISTANCIA_MAXIMA * minima
+
+    return [
+        (
+            origen,
+            destino,
+            list(iterar_rutas_sin_repetir_vias(csr, origen, destino, config.cutoff, cotas[destino], umbral)),
+        )
+        for origen, destino in pares
+    ]
+
+
+class GeneradorRutas:
+    """
+    Genera bajo demanda las rutas entre dos puntos de referencia y las agrega al grafo `g`,
+    recordando las rutas ya generadas por cada par (desde, hasta). Se usa con una ontología
+    construida con `generar_rutas=False`, de modo que cada consulta solo paga por su propio par.
+    Campos:
+        - g: el grafo de la ontología al que se agregan las rutas
+        - G: el grafo vial de networkx construido a partir de `g`
+        - csr: el GrafoCSR de `G`, con el que se recorren las rutas
+        - config: configuración con el modo de generación y el cutoff de las rutas
+    """
+
+    def __init__(self, g: Graph, config: ConfigOntologia | None = None):
+        self.g = g
+        self.config = config if config is not None else ConfigOntologia()
+        self.G = construir_grafo_vial(g)
+        self.csr = GrafoCSR(self.G)
+        self._cerradas = vias_cerradas_para(g, self.config)
+
+        # llave: nombre del punto de referencia, valor: intersecciones desde las cuales es accesible
+        self._intersecciones = {}
+        for punto, inters in mapa_puntos_referencia(g).items():
+            nombre = g.value(punto, RUTA.tieneNombre)
+            if nombre is not None:
+                self._intersecciones[str(nombre)] = inters
+
+        # llave: (desde, hasta), valor: lista con los BNodes de las rutas generadas
+        self._rutas = {}
+        self._contador = 1
+
+    def rutas(self, desde: str, hasta: str) -> list[BNode]:
+        """
+        Retorna los BNodes de las rutas entre los puntos de referencia llamados `desde` y `hasta`,
+        generándolas y agregándolas al grafo solo la primera vez que se piden
+        """
+        par = (desde, hasta)
+        if par in self._rutas:
+            return self._rutas[par]
+
+        if desde not in self._intersecciones or hasta not in self._intersecciones:
+            raise Exception(f"punto de referencia desconocido: {desde if desde not in self._intersecciones else hasta}")
+
+        nuevas = []
+        for origen, destino, rutas in generar_rutas_puntos(
+            self.G, self._intersecciones[desde], self._intersecciones[hasta], self.config, self.csr, self._cerradas
+        ):
+            for ruta in rutas:
+                nuevas.append(
+                    agregar_ruta_al_grafo(
+                        self.g, ruta, self._contador, origen, destino, self.config.codificacion_rutas, self.G
+                    )
+                )
+                self._contador += 1
+
+        self._rutas[par] = nuevas
+        return nuevas
 
 
 """Esta sección de código se puede usar para observar todas las rutas generadas
 entre dos puntos específicos
 
+g = construir_ontologia(ConfigOntologia(generar_rutas=False))
+G = construir_grafo_vial(g)
+mapa_numeros = mapa_numeros_intersecciones(g)
+
 inicios = [v for (_, _, v) in g.triples((unal, RUTA.seRelacionaCon, None))]
 fines = [v for (_, _, v) in g.triples((piloto, RUTA.seRelacionaCon, None))]
 
@@ -788,5 +1516,16 @@ for i, ruta in enumerate(rutas_totales, 1):
         partes.append(f"{via.split('#')[-1]} → {num}")
     print(f"Ruta {i}: " + " | ".join(partes))"""
 
-#Serialización final
-print(g.serialize(format="turtle"))
\ No newline at end of file
+
+# ontología construida con la configuración por defecto, usada por `ontologia.g`
+_g = None
+
+
+def __getattr__(nombre):
+    # `g` se construye solo la primera vez que se accede (ver docstring del módulo)
+    global _g
+    if nombre == "g":
+        if _g is None:
+            _g = construir_ontologia()
+        return _g
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
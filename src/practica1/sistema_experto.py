@@ -9,11 +9,15 @@ if not hasattr(collections, "Mapping"):
     setattr(collections, "Mapping", collections.abc.Mapping)
 
 from collections import defaultdict
+from array import array
+from dataclasses import dataclass
+import heapq
 from math import inf
 from experta import MATCH, Fact, KnowledgeEngine, Rule, NOT
 import random
+import time
 
-from numpy import isin
+from practica1.sistema_logica_difusa import calcular_fluidez_via
 
 random.seed(42)
 
@@ -64,6 +68,18 @@ class Evento(Fact):
     """
 
 
+class EventoEnVia(Fact):
+    """
+    Representa un evento que afecta una vía específica (uno por cada tipo de evento en el campo
+    afectada_por de la vía), así las reglas no tienen que cruzar todos los eventos con todas las vías
+    Campos:
+        - via: el nombre de la vía afectada
+        - tipo: el tipo del evento (ver Evento)
+        - duracion: tiempo en minutos que este evento afecta la via
+        - cierre_total: indica si este evento causa un cierre total (True/False)
+    """
+
+
 class Ruta(Fact):
     """
     Representa una ruta (un conjunto ordenado de vías) que un carro puede seguir
@@ -125,14 +141,110 @@ class DistanciaRuta(Fact):
     """
 
 
+# Factor por el que se multiplica el tiempo de una vía según su fluidez
+FACTORES_FLUIDEZ = {
+    "muy mala": 1.8,
+    "mala": 1.4,
+    "aceptable": 1.1,
+    "buena": 0.9,
+    "muy buena": 0.8,
+}
+
+
+@dataclass
+class Recomendacion:
+    """
+    Ruta recomendada al usuario
+    Campos:
+        - ruta: la numeracion de la ruta (None si no es una de las rutas generadas)
+        - tiempo_estimado: tiempo en horas que toma recorrer la ruta
+        - distancia: distancia en kilómetros de la ruta
+        - vias: lista ordenada de los nombres de las vías de la ruta
+        - intersecciones: lista ordenada de los números de las intersecciones de la ruta
+    """
+
+    ruta: str | None
+    tiempo_estimado: float
+    distancia: float
+    vias: list[str]
+    intersecciones: list[str]
+
+
+@dataclass
+class Actualizacion:
+    """
+    Resultado de declarar o retractar un evento o una fluidez en un motor ya ejecutado
+    Campos:
+        - vias: nombres de las vías cuyo tiempo se recalculó
+        - rutas: cantidad de rutas cuyo tiempo se recalculó
+        - recomendacion: las mejores rutas para el objetivo del motor (None si no tiene objetivo)
+        - latencia: tiempo en segundos que tomó la actualización
+    """
+
+    vias: list[str]
+    rutas: int
+    recomendacion: list[Recomendacion] | None
+    latencia: float
+
+
+class _DatosRuta:
+    """
+    Datos internos del `Motor` sobre una ruta declarada. Se usan __slots__ y las vías se guardan
+    como un arreglo de ids enteros (ver Motor.__id_via) para ocupar poca memoria por ruta
+    Campos:
+        - id: número de la ruta en el orden en que se declaró
+        - hecho: el hecho Ruta declarado
+        - vias: arreglo con los ids de las vías de la ruta
+        - distancia: distancia de la ruta (None si aún no se ha calculado)
+        - tiempo: tiempo estimado de la ruta (None si aún no se ha calculado)
+        - hecho_tiempo: el hecho TiempoRuta declarado (None si aún no se ha calculado)
+    """
+
+    __slots__ = ("id", "hecho", "vias", "distancia", "tiempo", "hecho_tiempo")
+
+    def __init__(self, id, hecho, vias):
+        self.id = id
+        self.hecho = hecho
+        self.vias = vias
+        self.distancia = None
+        self.tiempo = None
+        self.hecho_tiempo = None
+
+
 class Motor(KnowledgeEngine):
-    def __init__(self):
+    """
+    Motor de inferencia que recomienda rutas
+    Parámetros:
+        - k: cantidad de rutas a recomendar (la mejor y k - 1 alternativas)
+
+    Luego de ejecutarlo, los eventos y la fluidez se pueden declarar o retractar uno a uno
+    (`declarar_evento`, `retractar_fluidez`, ...) sin reiniciarlo: solo se recalculan los TiempoVia
+    de las vías afectadas, los TiempoRuta de las rutas que pasan por ellas y la recomendación.
+    """
+
+    def __init__(self, k=1):
+        self.k = k
+
         # en self.__vias van a estar todos los hechos declarados de tipo Via (la llave es el nombre de la via)
         self.__vias = {}
 
-        # en self.__rutas van a estar todos los hechos declarados de tipo Ruta (la llave es la numeracion de la ruta)
+        # en self.__rutas van a estar los datos (`_DatosRuta`) de las rutas que no han sido eliminadas
+        # (la llave es la numeracion de la ruta)
         self.__rutas = {}
 
+        # en self.__datos_rutas van a estar los datos de todas las rutas declaradas, en el orden en que
+        # se declararon (la posición es el id de la ruta); las rutas eliminadas quedan en None
+        self.__datos_rutas = []
+
+        # los nombres de las vias se representan con ids enteros: self.__ids_via tiene el id de cada
+        # nombre y self.__nombres_via el nombre de cada id
+        self.__ids_via = {}
+        self.__nombres_via = []
+
+        # en self.__rutas_por_via van a estar los ids de las rutas que pasan por cada via (la posición
+        # es el id de la via). Las rutas eliminadas no se sacan de estos arreglos, se ignoran al leerlos
+        self.__rutas_por_via = []
+
         # en self.__intersecciones van a estar todos los hechos declarados de tipo Nodo que son
         # intersección (la llave es el numero de la intersección)
         self.__intersecciones = {}
@@ -144,11 +256,25 @@ class Motor(KnowledgeEngine):
         # en self.__tiempos_via van a estar todos los hechos declarados de tipo TiempoVia (la llave es el nombre de la via)
         self.__tiempos_via = {}
 
-        # en self.__tiempos_ruta van a estar todos los hechos declarados de tipo TiempoRuta (la llave es la numeracion de la ruta)
-        self.__tiempos_ruta = {}
+        # en self.__fluidez van a estar todos los hechos declarados de tipo Fluidez (la llave es el nombre de la via)
+        self.__fluidez = {}
+
+        # en self.__eventos van a estar las parejas (id, hecho) de los hechos declarados de tipo Evento y
+        # EventoEnVia (la llave es el tipo del evento). Se guarda el id pues los hechos de `traducir`
+        # pueden declararse luego en otro motor, que les cambia el __factid__
+        self.__eventos = defaultdict(list)
 
-        # en self.__distancias_ruta van a estar todos los hechos declarados de tipo DistanciaRuta (la llave es la numeracion de la ruta)
-        self.__distancias_ruta = {}
+        # montículo con las parejas (distancia, id) de las rutas con DistanciaRuta. Las rutas
+        # eliminadas no se sacan del montículo sino al consultar el mínimo (ver __distancia_minima)
+        self.__distancias_vivas = []
+
+        # montículo con las parejas (tiempo, id) de las rutas con TiempoRuta (con el id se desempatan
+        # las rutas con el mismo tiempo, a favor de la declarada primero). Las rutas eliminadas se
+        # descartan al sacar las mejores en recomendacion_final
+        self.__tiempos_vivos = []
+
+        # las k mejores rutas encontradas por la regla recomendacion_final, de la más rápida a la más lenta
+        self.recomendaciones = []
 
         super().__init__()
 
@@ -159,45 +285,98 @@ class Motor(KnowledgeEngine):
             if isinstance(fact, Via):
                 self.__vias[fact["nombre"]] = fact
             elif isinstance(fact, Ruta):
-                self.__rutas[fact["numeracion"]] = fact
+                datos = _DatosRuta(
+                    len(self.__datos_rutas), fact, array("i", map(self.__id_via, fact["vias"]))
+                )
+                self.__datos_rutas.append(datos)
+                self.__rutas[fact["numeracion"]] = datos
+                for id_via in datos.vias:
+                    self.__rutas_por_via[id_via].append(datos.id)
             elif isinstance(fact, Nodo):
                 if "nombre" in fact:
                     self.__puntos_de_referencia[fact["nombre"]] = fact
                 elif "numero" in fact:
                     self.__intersecciones[fact["numero"]] = fact
-        return super().declare(*facts)
+        ultimo = super().declare(*facts)
+
+        # los eventos y la fluidez se guardan solo si se declararon en este motor (experta ignora los
+        # hechos repetidos, que conservan el __factid__ de otro motor o ninguno)
+        for fact in facts:
+            if isinstance(fact, (Evento, EventoEnVia, Fluidez)) and self.facts.get(fact.__factid__) is fact:
+                if isinstance(fact, Fluidez):
+                    self.__fluidez[fact["via"]] = fact
+                else:
+                    self.__eventos[fact["tipo"]].append((fact.__factid__, fact))
+        return ultimo
+
+    def run(self, steps=inf):
+        """
+        Ejecuta las reglas y retorna las rutas recomendadas (una lista de `Recomendacion`, vacía si
+        no fue posible encontrar una ruta)
+        """
+        self.recomendaciones = []
+        super().run(steps)
+        return self.recomendaciones
+
+    def __id_via(self, nombre):
+        """
+        Retorna el id entero de la via con el nombre dado, asignándole uno nuevo si no tiene
+        """
+        id_via = self.__ids_via.get(nombre)
+        if id_via is None:
+            id_via = len(self.__nombres_via)
+            self.__ids_via[nombre] = id_via
+            self.__nombres_via.append(nombre)
+            self.__rutas_por_via.append(array("i"))
+        return id_via
+
+    def __eliminar_ruta(self, numeracion):
+        """
+        Retracta la ruta con la numeracion dada y la elimina de self.__rutas (y de
+        self.__rutas_por_via, al quedar en None en self.__datos_rutas)
+        """
+        datos = self.__rutas.pop(numeracion)
+        self.__datos_rutas[datos.id] = None
+        self.retract(datos.hecho)
+
+    def __distancia_minima(self):
+        """
+        Retorna la menor distancia entre las rutas que no han sido eliminadas (inf si no hay ninguna)
+        """
+        while self.__distancias_vivas and self.__datos_rutas[self.__distancias_vivas[0][1]] is None:
+            heapq.heappop(self.__distancias_vivas)
+        return self.__distancias_vivas[0][0] if self.__distancias_vivas else inf
+
+    def __eliminar_via(self, via_nombre):
+        """
+        Retracta la via con el nombre dado y todas las rutas que pasan por ella
+        """
+        self.retract(self.__vias[via_nombre])
+        del self.__vias[via_nombre]
+
+        if via_nombre not in self.__ids_via:
+            return
+        id_via = self.__ids_via[via_nombre]
+        for id_ruta in self.__rutas_por_via[id_via]:
+            datos = self.__datos_rutas[id_ruta]
+            if datos is not None:
+                self.__eliminar_ruta(datos.hecho["numeracion"])
+        self.__rutas_por_via[id_via] = array("i")
 
     @Rule(
-        Evento(cierre_total=True, tipo=MATCH.evento_tipo),
-        Via(nombre=MATCH.via_nombre, afectada_por=MATCH.via_afectada_por),
+        EventoEnVia(cierre_total=True, via=MATCH.via_nombre, tipo=MATCH.evento_tipo),
+        Via(nombre=MATCH.via_nombre),
         salience=30,
     )
-    def evento_cierre_total(self, via_nombre, evento_tipo, via_afectada_por):
+    def evento_cierre_total(self, via_nombre, evento_tipo):
         """
         Esta regla elimina las vias que están afectadas por un evento de cierre total
         También elimina todas las rutas que contienen esas vias eliminadas
         """
-        # Si este evento no afecta la via, no continuar la ejecución de esta regla
-        if evento_tipo not in via_afectada_por:
-            return
-
         '''print(
             f"Eliminando via {via_nombre} pues está afectada por evento de cierre total: {evento_tipo}"
         )'''
-        self.retract(self.__vias[via_nombre])
-        del self.__vias[via_nombre]
-
-        rutas_eliminadas = []
-        for ruta_numeracion, ruta in self.__rutas.items():
-            if via_nombre in ruta["vias"]:
-                '''print(
-                    f"También eliminando la ruta {ruta_numeracion} que contiene via con cierre total"
-                )'''
-                self.retract(ruta)
-                rutas_eliminadas.append(ruta_numeracion)
-
-        for ruta in rutas_eliminadas:
-            del self.__rutas[ruta]
+        self.__eliminar_via(via_nombre)
 
     @Rule(
         Ruta(numeracion=MATCH.ruta_numeracion, origen=MATCH.ruta_origen),
@@ -225,8 +404,7 @@ class Motor(KnowledgeEngine):
             '''print(
                 f"Eliminando ruta {ruta_numeracion} debido a que no inicia en el punto de partida deseado"
             )'''
-            self.retract(self.__rutas[ruta_numeracion])
-            del self.__rutas[ruta_numeracion]
+            self.__eliminar_ruta(ruta_numeracion)
 
     @Rule(
         Ruta(numeracion=MATCH.ruta_numeracion, destino=MATCH.ruta_destino),
@@ -254,8 +432,7 @@ class Motor(KnowledgeEngine):
             '''print(
                 f"Eliminando ruta {ruta_numeracion} debido a que no termina en el punto de llegada deseado"
             )'''
-            self.retract(self.__rutas[ruta_numeracion])
-            del self.__rutas[ruta_numeracion]
+            self.__eliminar_ruta(ruta_numeracion)
 
     @Rule(
         Ruta(numeracion=MATCH.numeracion, vias=MATCH.vias),
@@ -269,8 +446,10 @@ class Motor(KnowledgeEngine):
             distancia += via["longitud"]
 
         '''print(f"Distancia de ruta {numeracion} calculada: {distancia} km")'''
-        hecho = self.declare(DistanciaRuta(ruta=numeracion, distancia=distancia))
-        self.__distancias_ruta[numeracion] = hecho
+        self.declare(DistanciaRuta(ruta=numeracion, distancia=distancia))
+        datos = self.__rutas[numeracion]
+        datos.distancia = distancia
+        heapq.heappush(self.__distancias_vivas, (distancia, datos.id))
 
     @Rule(
         Via(
@@ -314,27 +493,14 @@ class Motor(KnowledgeEngine):
 
     @Rule(
         TiempoVia(via=MATCH.via_nombre, tiempo_estimado=MATCH.tiempo),
-        Via(nombre=MATCH.via_nombre, afectada_por=MATCH.via_afectada_por),
-        Evento(tipo=MATCH.evento_tipo, duracion=MATCH.evento_duracion),
+        EventoEnVia(via=MATCH.via_nombre, tipo=MATCH.evento_tipo, duracion=MATCH.evento_duracion),
         NOT(TiempoVia(via=MATCH.via_nombre, incluye_tiempos_eventos=True)),
         salience=5,
     )
-    def agregar_tiempos_eventos(
-        self, via_nombre, via_afectada_por, tiempo, evento_tipo, evento_duracion
-    ):
+    def agregar_tiempos_eventos(self, via_nombre, tiempo, evento_tipo, evento_duracion):
         """
         Agrega el tiempo que se demoran los eventos al tiempo estimado de atravesar la vía
         """
-        # verificar si el evento afecta esta via
-        evento_afecta_via = False
-        for evento in via_afectada_por:
-            if evento == evento_tipo:
-                evento_afecta_via = True
-                break
-
-        if not evento_afecta_via:
-            return
-
         # el nuevo tiempo será el tiempo anterior sumado a la duración del evento convertido de
         # minutos a horas
         nuevo_tiempo = tiempo + (evento_duracion / 60)
@@ -363,10 +529,10 @@ class Motor(KnowledgeEngine):
             tiempo_estimado += tiempo_via["tiempo_estimado"]
 
         '''print(f"Tiempo de la ruta {numeracion} calculado: {tiempo_estimado}")'''
-        tiempo_ruta = self.declare(
-            TiempoRuta(ruta=numeracion, tiempo_estimado=tiempo_estimado)
-        )
-        self.__tiempos_ruta[numeracion] = tiempo_ruta
+        datos = self.__rutas[numeracion]
+        datos.hecho_tiempo = self.declare(TiempoRuta(ruta=numeracion, tiempo_estimado=tiempo_estimado))
+        datos.tiempo = tiempo_estimado
+        heapq.heappush(self.__tiempos_vivos, (tiempo_estimado, datos.id))
 
     @Rule(
         Via(nombre=MATCH.via_nombre, velocidad_promedio=MATCH.velocidad),
@@ -415,16 +581,7 @@ class Motor(KnowledgeEngine):
         que transitan esa vía eliminada
         """
         #print(f"Eliminando via {via} debido a que presenta una fluidez nula")
-        self.retract(self.__vias[via])
-        del self.__vias[via]
-
-        for ruta_numeracion, ruta in self.__rutas.items():
-            if via in ruta["vias"]:
-                '''print(
-                    f"\tTambién eliminando ruta {ruta_numeracion} que contiene via con fluidez nula"
-                )'''
-                self.retract(ruta)
-                del self.__rutas[ruta_numeracion]
+        self.__eliminar_via(via)
 
     @Rule(
         Fluidez(via=MATCH.via_nombre, fluidez=MATCH.fluidez_val),
@@ -441,13 +598,7 @@ class Motor(KnowledgeEngine):
         - buena     → -10%
         - muy buena → -20%
         """
-        factor = {
-            "muy mala": 1.8,
-            "mala": 1.4,
-            "aceptable": 1.1,
-            "buena": 0.9,
-            "muy buena": 0.8,
-        }.get(fluidez_val, 1.0)  # por defecto no cambia
+        factor = FACTORES_FLUIDEZ.get(fluidez_val, 1.0)  # por defecto no cambia
 
         if factor != 1.0:
             nuevo_tiempo = tiempo * factor
@@ -490,57 +641,178 @@ class Motor(KnowledgeEngine):
     )
     def eliminar_rutas_muy_largas(self, numeracion, distancia):
         """
-        Elimina rutas cuya distancia es excesiva comparada con la más corta.
+        Elimina rutas cuya distancia es excesiva comparada con la más corta de las rutas que siguen vivas.
         """
-        min_distancia = inf
-        for distancia_ruta in self.__distancias_ruta.values():
-            if distancia_ruta["distancia"] < min_distancia:
-                min_distancia = distancia_ruta["distancia"]
+        min_distancia = self.__distancia_minima()
 
         if distancia > (3 * min_distancia):  # 3 veces más larga
             '''print(f"Eliminando ruta {numeracion} por ser demasiado larga")'''
-            self.retract(self.__rutas[numeracion])
-            del self.__rutas[numeracion]
+            self.__eliminar_ruta(numeracion)
 
     @Rule(NOT(Fact()), salience=0)
     def recomendacion_final(self):
         """
-        Recomienda una ruta al usuario luego de ejecutar todas las demás reglas
+        Guarda en self.recomendaciones las k rutas más rápidas luego de ejecutar todas las demás reglas
         """
-        mejor_ruta = None
-        mejor_ruta_tiempo = inf
-        for ruta_numeracion, ruta in self.__rutas.items():
-            tiempo_ruta = self.__tiempos_ruta[ruta_numeracion]
-            tiempo = tiempo_ruta["tiempo_estimado"]
-            if tiempo < mejor_ruta_tiempo:
-                mejor_ruta = ruta
-                mejor_ruta_tiempo = tiempo
+        self.__recomendar()
 
-        if mejor_ruta is None:
-            print("No fue posible encontrar la mejor ruta")
-            return
+    def __recomendar(self):
+        """
+        Guarda en self.recomendaciones las k rutas más rápidas según self.__tiempos_vivos
+        """
+        mejores = []
+        vistas = set()
+        while self.__tiempos_vivos and len(mejores) < self.k:
+            tiempo, id_ruta = heapq.heappop(self.__tiempos_vivos)
+            # se descartan las rutas eliminadas después de calcular su tiempo, los tiempos
+            # reemplazados por una actualización y las parejas repetidas
+            datos = self.__datos_rutas[id_ruta]
+            if datos is None or datos.tiempo != tiempo or id_ruta in vistas:
+                continue
+            vistas.add(id_ruta)
+            mejores.append((tiempo, id_ruta))
+
+        # las rutas recomendadas se devuelven al montículo por si el motor se ejecuta de nuevo
+        for mejor in mejores:
+            heapq.heappush(self.__tiempos_vivos, mejor)
+
+        recomendaciones = []
+        for tiempo, id_ruta in mejores:
+            datos = self.__datos_rutas[id_ruta]
+            recomendaciones.append(
+                Recomendacion(
+                    ruta=datos.hecho["numeracion"],
+                    tiempo_estimado=tiempo,
+                    distancia=datos.distancia,
+                    vias=[self.__nombres_via[id_via] for id_via in datos.vias],
+                    intersecciones=list(datos.hecho["tiene_nodos"]),
+                )
+            )
+        self.recomendaciones = recomendaciones
+
+    def __actualizar(self, vias, inicio) -> Actualizacion:
+        """
+        Retracta el TiempoVia de las vías `vias` y el TiempoRuta de las rutas que pasan por ellas, y
+        vuelve a ejecutar el motor para que las reglas los calculen de nuevo.
+
+        La fluidez de esas vías se declara otra vez, pues al ejecutar el motor desde cero la fluidez
+        es el hecho más reciente y su ajuste se aplica antes que los demás (ver motor_nativo)
+        """
+        vias = [via for via in dict.fromkeys(vias) if via in self.__vias]
+        rutas = 0
+        for via in vias:
+            tiempo_via = self.__tiempos_via.pop(via, None)
+            if tiempo_via is not None:
+                self.retract(tiempo_via)
+
+            fluidez = self.__fluidez.pop(via, None)
+            if fluidez is not None:
+                self.retract(fluidez)
+                self.declare(Fluidez(via=via, fluidez=fluidez["fluidez"]))
+
+            if via not in self.__ids_via:
+                continue
+            for id_ruta in self.__rutas_por_via[self.__ids_via[via]]:
+                datos = self.__datos_rutas[id_ruta]
+                if datos is not None and datos.hecho_tiempo is not None:
+                    self.retract(datos.hecho_tiempo)
+                    datos.hecho_tiempo = None
+                    rutas += 1
+
+        self.run()
+        self.__recomendar()
+        return Actualizacion(
+            vias=vias,
+            rutas=rutas,
+            recomendacion=self.recomendaciones,
+            latencia=time.perf_counter() - inicio,
+        )
+
+    def __quitar_evento(self, tipo):
+        """
+        Retracta el Evento del tipo dado y sus EventoEnVia, y retorna los nombres de las vías que
+        estos afectaban
+        """
+        vias = []
+        for id_hecho, hecho in self.__eventos.pop(tipo, []):
+            if isinstance(hecho, EventoEnVia):
+                vias.append(hecho["via"])
+            if self.facts.get(id_hecho) is hecho:
+                self.retract(id_hecho)
+        return vias
+
+    def declarar_evento(self, evento: Evento) -> Actualizacion:
+        """
+        Declara un evento (reemplazando otro del mismo tipo si existe), con un EventoEnVia por cada
+        vía que este afecta, y actualiza solo esas vías. Si el evento causa un cierre total, las
+        vías y rutas afectadas se eliminan como al ejecutar el motor desde cero
+        """
+        inicio = time.perf_counter()
+        if not evento["cierre_total"]:
+            self.__comprobar_evento_restaurable(evento["tipo"])
+        vias = self.__quitar_evento(evento["tipo"])
+        eventos_en_via = [
+            EventoEnVia(
+                via=nombre,
+                tipo=evento["tipo"],
+                duracion=evento["duracion"],
+                cierre_total=evento["cierre_total"],
+            )
+            for nombre, via in self.__vias.items()
+            if evento["tipo"] in via.get("afectada_por", [])
+        ]
+        self.declare(evento, *eventos_en_via)
+        return self.__actualizar(vias + [hecho["via"] for hecho in eventos_en_via], inicio)
 
-        tiempo_horas = self.__tiempos_ruta[mejor_ruta["numeracion"]]["tiempo_estimado"]
-        tiempo_minutos = round(tiempo_horas * 60, 2)
-        distancia = round(self.__distancias_ruta[mejor_ruta["numeracion"]]["distancia"], 2)
-        print(f"La mejor ruta es: {mejor_ruta['numeracion']} con un tiempo estimado de {tiempo_minutos} minutos y una distancia de {distancia} km")
-        for via in mejor_ruta["vias"]:
-            print(f"\t{via}")
-
-        print("Pasando por las intersecciones:")
-        # se lleva registro de la ultima via en las intersecciones para mostrar el orden correcto
-        ultima_via = None
-        for interseccion_numero in mejor_ruta["tiene_nodos"]:
-            interseccion = self.__intersecciones[interseccion_numero]
-
-            vias = []
-            if ultima_via is not None:
-              vias.append(ultima_via)
-              for via in interseccion['conecta_con']:
-                if via != ultima_via:
-                  vias.append(via)
-            else:
-              vias = list(interseccion['conecta_con'])
-
-            print(f"\t{interseccion_numero} ({vias})")
-            ultima_via = vias[-1]
\ No newline at end of file
+    def retractar_evento(self, tipo: str) -> Actualizacion:
+        """
+        Retracta el evento del tipo dado (y sus EventoEnVia) y actualiza solo las vías que este
+        afectaba. Las vías eliminadas por el cierre total del evento no se pueden restaurar (para
+        ello hay que ejecutar un nuevo motor), así que en ese caso se lanza una excepción
+        """
+        inicio = time.perf_counter()
+        self.__comprobar_evento_restaurable(tipo)
+        return self.__actualizar(self.__quitar_evento(tipo), inicio)
+
+    def __comprobar_evento_restaurable(self, tipo):
+        """
+        Lanza una excepción si el evento del tipo dado eliminó alguna vía por un cierre total, pues
+        quitar el cierre no la restaura
+        """
+        for _, hecho in self.__eventos.get(tipo, []):
+            if isinstance(hecho, EventoEnVia) and hecho["cierre_total"] and hecho["via"] not in self.__vias:
+                raise Exception(f"la vía {hecho['via']} fue eliminada por el evento {tipo}, no se puede restaurar")
+
+    def declarar_fluidez(self, fluidez: Fluidez) -> Actualizacion:
+        """
+        Declara (o reemplaza) la fluidez de una vía y la actualiza. Si la fluidez es nula, la vía y sus
+        rutas se eliminan como al ejecutar el motor desde cero
+        """
+        inicio = time.perf_counter()
+        via = fluidez["via"]
+        self.__comprobar_fluidez_restaurable(via)
+        anterior = self.__fluidez.pop(via, None)
+        if anterior is not None:
+            self.retract(anterior)
+        self.declare(fluidez)
+        return self.__actualizar([via], inicio)
+
+    def retractar_fluidez(self, via: str) -> Actualizacion:
+        """
+        Retracta la fluidez de una vía (su tiempo deja de ajustarse por fluidez) y la actualiza
+        """
+        inicio = time.perf_counter()
+        self.__comprobar_fluidez_restaurable(via)
+        anterior = self.__fluidez.pop(via, None)
+        if anterior is not None:
+            self.retract(anterior)
+        return self.__actualizar([via], inicio)
+
+    def __comprobar_fluidez_restaurable(self, via):
+        """
+        Lanza una excepción si la vía fue eliminada por tener fluidez nula, pues cambiar su fluidez
+        no la restaura
+        """
+        fluidez = self.__fluidez.get(via)
+        if fluidez is not None and fluidez["fluidez"] == "nula" and via not in self.__vias:
+            raise Exception(f"la vía {via} fue eliminada por tener fluidez nula, no se puede restaurar")
@@ -1,8 +1,19 @@
+import copy
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
 import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
+from skfuzzy.control.term import Term
 from rdflib import Literal
 
+from practica1.cache import directorio_cache, huella
+
 # 1. Definir las variables difusas
 # Variables de entrada
 congestion = ctrl.Antecedent(np.arange(0, 101, 1), 'congestion')
@@ -57,17 +68,120 @@ rule9 = ctrl.Rule(velocidad_media['rapida'] & espera_semaforo['corta'], fluidez[
 sistema_control = ctrl.ControlSystem([rule1, rule2, rule3, rule4, rule5, rule6, rule7, rule8, rule9])
 simulacion_fluidez = ctrl.ControlSystemSimulation(sistema_control)
 
+
+class PoolSimulaciones:
+    """
+    Conjunto acotado de simulaciones que se prestan a un hilo a la vez, para que varios hilos
+    puedan calcular la fluidez al mismo tiempo sin un candado global.
+
+    skfuzzy guarda las entradas en los objetos Antecedent compartidos por todas las simulaciones
+    de un mismo sistema (`input['current']`), por lo que cada simulación del pool se construye
+    sobre su propia copia de `sistema_control`.
+
+    Campos:
+        - tamano_maximo: número máximo de simulaciones que se crean (al menos 1; si es None, el
+          número de CPUs)
+        - creadas: número de simulaciones creadas hasta ahora
+        - esperas: número de veces que un hilo tuvo que esperar a que se liberara una simulación
+        - tiempo_espera_total: tiempo total en segundos que los hilos esperaron
+    """
+
+    def __init__(self, sistema=sistema_control, tamano_maximo=None):
+        if tamano_maximo is None:
+            tamano_maximo = os.cpu_count() or 1
+        if tamano_maximo < 1:
+            raise Exception(f"el pool necesita al menos una simulación, tamano_maximo={tamano_maximo}")
+        self.tamano_maximo = tamano_maximo
+        self.creadas = 0
+        self.esperas = 0
+        self.tiempo_espera_total = 0.0
+        self._sistema = sistema
+        self._libres = queue.LifoQueue()
+        # solo protege los contadores, nunca se mantiene durante un cálculo
+        self._candado = threading.Lock()
+
+    @contextmanager
+    def simulacion(self):
+        """
+        Presta una simulación durante el bloque `with` y la devuelve al pool al salir
+        """
+        sim = self._tomar()
+        try:
+            yield sim
+        finally:
+            self._libres.put(sim)
+
+    def _tomar(self) -> ctrl.ControlSystemSimulation:
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._candado:
+            crear = self.creadas < self.tamano_maximo
+            if crear:
+                self.creadas += 1
+
+        if crear:
+            return ctrl.ControlSystemSimulation(copy.deepcopy(self._sistema))
+
+        # el pool está lleno: esperar a que otro hilo devuelva una simulación
+        inicio = time.perf_counter()
+        sim = self._libres.get()
+        espera = time.perf_counter() - inicio
+        with self._candado:
+            self.esperas += 1
+            self.tiempo_espera_total += espera
+        return sim
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna los contadores del pool
+        """
+        with self._candado:
+            return {
+                "tamano_maximo": self.tamano_maximo,
+                "creadas": self.creadas,
+                "esperas": self.esperas,
+                "tiempo_espera_total": self.tiempo_espera_total,
+            }
+
+
+pool_simulaciones = PoolSimulaciones()
+
 # 5. Proceso de defuzzificación
 
 def calcular_fluidez_via(congestion_val, velocidad_val, espera_val):
-    simulacion_fluidez.input['congestion'] = congestion_val
-    simulacion_fluidez.input['velocidad_media'] = velocidad_val
-    simulacion_fluidez.input['espera_semaforo'] = espera_val
-    simulacion_fluidez.compute()
+    salida = None
+    if _superficie is not None:
+        salida = _superficie.evaluar(congestion_val, velocidad_val, espera_val)
+        # cerca de los saltos de la salida y de los límites entre etiquetas la interpolación
+        # puede cambiar la etiqueta, ahí se usa la simulación exacta
+        if not _superficie.confiable(congestion_val, velocidad_val, espera_val, salida):
+            salida = None
+    if salida is None:
+        salida = _salida_exacta(congestion_val, velocidad_val, espera_val)
+
+    return _etiqueta_fluidez(salida)
 
-    salida = simulacion_fluidez.output['fluidez']
 
-    # Mapear numérico a etiqueta del sistema experto
+def _salida_exacta(congestion_val, velocidad_val, espera_val) -> float:
+    """
+    Calcula la salida numérica de `fluidez` usando una simulación de skfuzzy del pool
+    """
+    with pool_simulaciones.simulacion() as simulacion:
+        simulacion.input['congestion'] = congestion_val
+        simulacion.input['velocidad_media'] = velocidad_val
+        simulacion.input['espera_semaforo'] = espera_val
+        simulacion.compute()
+
+        return simulacion.output['fluidez']
+
+
+def _etiqueta_fluidez(salida: float) -> str:
+    """
+    Mapea la salida numérica de `fluidez` a la etiqueta usada por el sistema experto
+    """
     if salida < 10:
         etiqueta = "nula"
     elif salida < 20:
@@ -81,4 +195,315 @@ def calcular_fluidez_via(congestion_val, velocidad_val, espera_val):
     else:
         etiqueta = "muy buena"
 
-    return etiqueta
\ No newline at end of file
+    return etiqueta
+
+
+# 6. Superficie precalculada (modo opcional)
+# En lugar de ejecutar la simulación completa (agregación y defuzzificación por centroide) en cada
+# llamada, se muestrea una sola vez el espacio de entradas en una malla y luego se interpola
+# trilinealmente. La malla se guarda en disco con una llave que depende de las reglas y las
+# funciones de pertenencia, por lo que se recalcula automáticamente si alguna de ellas cambia.
+# La salida exacta tiene saltos (ninguna resolución los elimina), así que la interpolación solo se
+# usa donde no puede cambiar la etiqueta: en las celdas cuyas esquinas tienen todas la misma
+# etiqueta y lejos de los límites entre etiquetas; en el resto se usa la simulación exacta.
+
+_ENTRADAS = (congestion, velocidad_media, espera_semaforo)
+
+# superficie en uso por `calcular_fluidez_via` (None significa usar la simulación exacta)
+_superficie = None
+
+
+class SuperficieFluidez:
+    """
+    Salida del sistema difuso muestreada en una malla regular de las tres entradas
+    Campos:
+        - ejes: puntos de muestreo de congestion, velocidad_media y espera_semaforo
+        - valores: arreglo 3D con la salida de `fluidez` en cada punto de la malla
+        - margen: distancia mínima a un límite entre etiquetas para confiar en la interpolación
+          (ver `confiable`)
+        - error_maximo: máximo error absoluto de la interpolación contra la simulación exacta en
+          los puntos donde es confiable, medido en puntos aleatorios del espacio de entradas
+        - etiquetas_distintas: cantidad de esos puntos aleatorios en los que `calcular_fluidez_via`
+          con esta superficie da una etiqueta distinta a la de la simulación exacta
+        - estables: arreglo 3D que indica, para cada celda de la malla, si sus 8 esquinas tienen
+          la misma etiqueta. La salida exacta tiene saltos donde se anulan conjuntos completos
+          (p. ej. congestion['baja'] en 40), y las celdas que los contienen suelen no ser estables
+    """
+
+    def __init__(self, ejes, valores, error_maximo, margen=2.0, etiquetas_distintas=0):
+        self.ejes = tuple(np.asarray(eje, dtype=np.float64) for eje in ejes)
+        self.valores = np.asarray(valores, dtype=np.float64)
+        self.margen = float(margen)
+        self.error_maximo = float(error_maximo)
+        self.etiquetas_distintas = int(etiquetas_distintas)
+
+        etiquetas = np.searchsorted(_LIMITES_ETIQUETAS, self.valores, side="right")
+        esquina = etiquetas[:-1, :-1, :-1]
+        n0, n1, n2 = esquina.shape
+        self.estables = np.ones(esquina.shape, dtype=bool)
+        for di in (0, 1):
+            for dj in (0, 1):
+                for dk in (0, 1):
+                    self.estables &= etiquetas[di : di + n0, dj : dj + n1, dk : dk + n2] == esquina
+
+    def __repr__(self):
+        resolucion = "x".join(str(len(eje)) for eje in self.ejes)
+        return (
+            f"SuperficieFluidez(resolucion={resolucion}, error_maximo={self.error_maximo:.4f}, "
+            f"etiquetas_distintas={self.etiquetas_distintas})"
+        )
+
+    def _celdas(self, congestion_val, velocidad_val, espera_val):
+        """
+        Retorna los índices de la celda que contiene cada punto y los pesos de interpolación
+        """
+        indices = []
+        pesos = []
+        for eje, valor in zip(self.ejes, (congestion_val, velocidad_val, espera_val)):
+            valor = np.clip(np.asarray(valor, dtype=np.float64), eje[0], eje[-1])
+            i = np.clip(np.searchsorted(eje, valor, side="right") - 1, 0, len(eje) - 2)
+            indices.append(i)
+            pesos.append((valor - eje[i]) / (eje[i + 1] - eje[i]))
+        return indices, pesos
+
+    def confiable(self, congestion_val, velocidad_val, espera_val, salida):
+        """
+        Indica si la etiqueta de `salida` (el resultado de `evaluar` en el punto o arreglos de
+        puntos dados) es confiable: el punto está en una celda estable y `salida` está a al menos
+        `margen` de los límites entre etiquetas
+        """
+        i, j, k = self._celdas(congestion_val, velocidad_val, espera_val)[0]
+        distancia = np.min(np.abs(np.subtract.outer(salida, _LIMITES_ETIQUETAS)), axis=-1)
+        resultado = self.estables[i, j, k] & (distancia >= self.margen)
+        if resultado.ndim == 0:
+            return bool(resultado)
+        return resultado
+
+    def evaluar(self, congestion_val, velocidad_val, espera_val):
+        """
+        Interpola trilinealmente la salida de `fluidez` en el punto (o arreglos de puntos) dado.
+        Las entradas por fuera del universo se recortan a sus límites, igual que en skfuzzy.
+        """
+        (i, j, k), (t, u, w) = self._celdas(congestion_val, velocidad_val, espera_val)
+        v = self.valores
+        # interpolación a lo largo de cada eje, uno a la vez
+        c00 = v[i, j, k] * (1 - t) + v[i + 1, j, k] * t
+        c01 = v[i, j, k + 1] * (1 - t) + v[i + 1, j, k + 1] * t
+        c10 = v[i, j + 1, k] * (1 - t) + v[i + 1, j + 1, k] * t
+        c11 = v[i, j + 1, k + 1] * (1 - t) + v[i + 1, j + 1, k + 1] * t
+        c0 = c00 * (1 - u) + c10 * u
+        c1 = c01 * (1 - u) + c11 * u
+        resultado = c0 * (1 - w) + c1 * w
+
+        if resultado.ndim == 0:
+            return float(resultado)
+        return resultado
+
+
+def huella_sistema_control(sistema=sistema_control) -> str:
+    """
+    Retorna un hash de la base de reglas y de las funciones de pertenencia de `sistema`
+    """
+    partes = []
+    for regla in sistema.rules:
+        partes.append(str(regla))
+    for variable in sorted(sistema.fuzzy_variables, key=lambda v: v.label):
+        partes.append(variable.label)
+        partes.append(np.asarray(variable.universe, dtype=np.float64).tobytes())
+        for etiqueta, termino in sorted(variable.terms.items()):
+            partes.append(etiqueta)
+            partes.append(np.asarray(termino.mf, dtype=np.float64).tobytes())
+    return huella(*partes)
+
+
+def precompilar_superficie(
+    resolucion=(41, 31, 37), directorio=None, muestras_error=200, semilla=0, margen=2.0
+) -> SuperficieFluidez:
+    """
+    Construye (o carga desde disco si ya existe) la superficie precalculada del sistema difuso
+
+    Parámetros:
+        - resolucion: número de puntos de la malla para congestion, velocidad_media y
+          espera_semaforo respectivamente
+        - directorio: directorio donde se guarda la malla (por defecto `directorio_cache()`)
+        - muestras_error: cantidad de puntos aleatorios usados para medir el error máximo
+        - semilla: semilla de los puntos aleatorios usados para medir el error
+        - margen: distancia mínima a un límite entre etiquetas para usar la interpolación (ver
+          `SuperficieFluidez.confiable`)
+    Retorna:
+        La superficie, con su error máximo y sus etiquetas distintas medidos contra la simulación
+        exacta
+    """
+    directorio = Path(directorio) if directorio is not None else directorio_cache()
+    resolucion = tuple(int(n) for n in resolucion)
+    llave = huella(huella_sistema_control(), repr(resolucion), repr((muestras_error, semilla, float(margen))))
+    archivo = directorio / f"superficie_fluidez_{llave[:16]}.npz"
+
+    if archivo.exists():
+        with np.load(archivo) as datos:
+            ejes = (datos["eje_congestion"], datos["eje_velocidad_media"], datos["eje_espera_semaforo"])
+            return SuperficieFluidez(
+                ejes, datos["valores"], datos["error_maximo"], margen, datos["etiquetas_distintas"]
+            )
+
+    ejes = tuple(
+        np.linspace(entrada.universe.min(), entrada.universe.max(), n)
+        for entrada, n in zip(_ENTRADAS, resolucion)
+    )
+
+    malla = np.meshgrid(*ejes, indexing="ij")
+    valores, _ = calcular_fluidez_lote(*(m.ravel() for m in malla))
+    valores = valores.reshape(resolucion)
+
+    superficie = SuperficieFluidez(ejes, valores, 0.0, margen)
+
+    # se mide el error en puntos aleatorios (no en los nodos de la malla, donde es 0)
+    rng = np.random.default_rng(semilla)
+    error_maximo = 0.0
+    etiquetas_distintas = 0
+    for _ in range(muestras_error):
+        punto = [rng.uniform(eje[0], eje[-1]) for eje in ejes]
+        salida = superficie.evaluar(*punto)
+        if not superficie.confiable(*punto, salida):
+            continue
+        exacta = _salida_exacta(*punto)
+        error_maximo = max(error_maximo, abs(salida - exacta))
+        if _etiqueta_fluidez(salida) != _etiqueta_fluidez(exacta):
+            etiquetas_distintas += 1
+    superficie.error_maximo = error_maximo
+    superficie.etiquetas_distintas = etiquetas_distintas
+
+    np.savez(
+        archivo,
+        eje_congestion=ejes[0],
+        eje_velocidad_media=ejes[1],
+        eje_espera_semaforo=ejes[2],
+        valores=valores,
+        error_maximo=error_maximo,
+        etiquetas_distintas=etiquetas_distintas,
+    )
+
+    return superficie
+
+
+def usar_superficie(superficie: SuperficieFluidez | None):
+    """
+    Activa el modo precalculado de `calcular_fluidez_via` con la superficie dada.
+    Con None se vuelve a usar la simulación exacta.
+
+    Se rechaza una superficie que cambió la etiqueta de alguno de los puntos con los que se midió su
+    error (ver `precompilar_superficie`), pues el sistema experto solo usa la etiqueta.
+    """
+    global _superficie
+    if superficie is not None and superficie.etiquetas_distintas > 0:
+        raise Exception(
+            f"la superficie cambia la etiqueta de {superficie.etiquetas_distintas} puntos de prueba, "
+            "use una resolución o un margen mayor"
+        )
+    _superficie = superficie
+
+
+# 7. Evaluación por lotes
+# Replica la inferencia de Mamdani de skfuzzy (min para AND, max para OR, 1 - x para NOT,
+# implicación por mínimo, acumulación por máximo y defuzzificación por centroide) con operaciones
+# sobre arreglos, para evaluar muchas vías en una sola llamada sin pasar por `simulacion_fluidez`.
+
+_ETIQUETAS_FLUIDEZ = np.array(["nula", "muy mala", "mala", "aceptable", "buena", "muy buena"])
+_LIMITES_ETIQUETAS = np.array([10, 20, 40, 60, 80])
+
+# universo de `fluidez` refinado para la defuzzificación (skfuzzy agrega los puntos de corte al
+# universo original, aquí se usa un universo 10 veces más fino)
+_UNIVERSO_SALIDA = np.linspace(fluidez.universe.min(), fluidez.universe.max(), 10 * (len(fluidez.universe) - 1) + 1)
+_MF_SALIDA = {
+    etiqueta: np.interp(_UNIVERSO_SALIDA, fluidez.universe, termino.mf)
+    for etiqueta, termino in fluidez.terms.items()
+}
+
+# cantidad de filas que se procesan a la vez al construir las funciones de pertenencia de salida
+_TAMANO_BLOQUE = 4096
+
+
+def calcular_fluidez_lote(congestiones, velocidades, esperas) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Evalúa el sistema difuso para muchas vías a la vez
+
+    Parámetros:
+        - congestiones, velocidades, esperas: arreglos (o escalares) con las entradas de cada vía
+    Retorna:
+        Una tupla con los siguientes valores:
+        - un arreglo con la salida numérica de `fluidez` de cada vía
+        - un arreglo con la etiqueta ("nula" ... "muy buena") de cada vía
+    """
+    entradas = np.broadcast_arrays(
+        np.asarray(congestiones, dtype=np.float64),
+        np.asarray(velocidades, dtype=np.float64),
+        np.asarray(esperas, dtype=np.float64),
+    )
+    forma = entradas[0].shape
+
+    # grados de pertenencia de cada término de cada entrada
+    grados = {}
+    for variable, valores in zip(_ENTRADAS, entradas):
+        universo = variable.universe
+        valores = np.clip(valores.ravel(), universo.min(), universo.max())
+        for etiqueta, termino in variable.terms.items():
+            grados[variable.label, etiqueta] = np.interp(valores, universo, termino.mf)
+
+    # fuerza de disparo de cada regla, acumulada por término del consecuente
+    cortes = {}
+    for regla in sistema_control.rules:
+        disparo = _grado_antecedente(regla.antecedent, grados, regla)
+        for consecuente in regla.consequent:
+            activacion = disparo * consecuente.weight
+            etiqueta = consecuente.term.label
+            if etiqueta in cortes:
+                cortes[etiqueta] = np.fmax(cortes[etiqueta], activacion)
+            else:
+                cortes[etiqueta] = activacion
+
+    # agregación y defuzzificación por bloques para acotar la memoria
+    n = entradas[0].size
+    salidas = np.empty(n, dtype=np.float64)
+    for inicio in range(0, n, _TAMANO_BLOQUE):
+        fin = min(inicio + _TAMANO_BLOQUE, n)
+        agregada = np.zeros((fin - inicio, len(_UNIVERSO_SALIDA)))
+        for etiqueta, corte in cortes.items():
+            recortada = np.minimum(corte[inicio:fin, None], _MF_SALIDA[etiqueta][None, :])
+            np.maximum(agregada, recortada, out=agregada)
+        salidas[inicio:fin] = _centroide(_UNIVERSO_SALIDA, agregada)
+
+    etiquetas = _ETIQUETAS_FLUIDEZ[np.searchsorted(_LIMITES_ETIQUETAS, salidas, side="right")]
+    return salidas.reshape(forma), etiquetas.reshape(forma)
+
+
+def _grado_antecedente(termino, grados, regla) -> np.ndarray:
+    """
+    Calcula recursivamente el grado de cumplimiento del antecedente `termino` de `regla`
+    """
+    if isinstance(termino, Term):
+        return grados[termino.parent.label, termino.label]
+
+    primero = _grado_antecedente(termino.term1, grados, regla)
+    match termino.kind:
+        case "and":
+            return regla.and_func(primero, _grado_antecedente(termino.term2, grados, regla))
+        case "or":
+            return regla.or_func(primero, _grado_antecedente(termino.term2, grados, regla))
+        case "not":
+            return 1.0 - primero
+        case tipo:
+            raise Exception(f"tipo de agregación desconocido: {tipo}")
+
+
+def _centroide(x: np.ndarray, mfx: np.ndarray) -> np.ndarray:
+    """
+    Centroide de cada fila de `mfx` (funciones lineales a trozos sobre `x`), calculado con las
+    áreas exactas de cada trapecio como en `skfuzzy.defuzzify.centroid`
+    """
+    x1, x2 = x[:-1], x[1:]
+    y1, y2 = mfx[:, :-1], mfx[:, 1:]
+    ancho = x2 - x1
+    area = ancho * (y1 + y2) / 2
+    momento = ancho * (x1 * (2 * y1 + y2) + x2 * (y1 + 2 * y2)) / 6
+    # igual que skfuzzy, un área total menor al épsilon de máquina lleva la salida a 0
+    return momento.sum(axis=1) / np.fmax(area.sum(axis=1), np.finfo(float).eps)
@@ -2,11 +2,18 @@
 Traductor del componente de la ontología al sistema experto
 """
 
-from typing import Any, Sequence
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, Sequence
 from rdflib import RDF, RDFS, XSD, BNode, Graph, Node, URIRef, Literal, DC
-from experta import Fact
+from experta import Fact, Rule
 from collections import defaultdict
 
+from practica1.ontologia import GEO, RUTA, SEPARADOR_NODOS, SEPARADOR_VIAS
+from practica1.sistema_experto import Evento, EventoEnVia, Motor, Nodo, Objetivo, Ruta, Semaforo, Via
+
 
 # llave: predicado del grafo de ontologias asociado a un sujeto específico
 # valor: valores de ese predicado asociados a un sujeto específico
@@ -19,48 +26,330 @@ Predicados = defaultdict[Node, set[Node]]
 Tripletas = defaultdict[Node, Predicados]
 
 
-def traducir(g: Graph) -> Sequence[Fact]:
+def traducir(g: Graph, trabajadores=1) -> Sequence[Fact]:
     """
     Recibe un grafo de ontología y retorna una lista de hechos para el sistema experto.
+
+    Si `trabajadores` es mayor que 1, los sujetos se reparten en bloques entre ese número de
+    procesos (o hilos si el intérprete no tiene GIL); los hechos se retornan en el mismo orden que
+    con un solo trabajador.
     """
 
     # La variable `tripletas` es un diccionario cuyas llaves son sujetos del grafo de ontologías, y
     # sus valores son a su vez diccionarios que tienen de llave a los predicados y de valor un
     # `set` con los valores para dicho predicado asociados a dicho sujeto. Es decir, contiene toda
     # la información del grafo de ontología de una forma más fácilmente accesible.
-    tripletas: Tripletas = defaultdict(lambda: defaultdict(set))
+    tripletas: Tripletas = defaultdict(_predicados_vacios)
 
-    # En este ciclo for se agregan los tripletas del grafo `g` a la variable `tripletas`.
+    # En este ciclo for se agregan los tripletas del grafo `g` a la variable `tripletas`. Los tipos
+    # (RDF.type) no se agregan pues ya están resueltos en `tabla`
+    tabla = tabla_tipos(g)
+    rdf_type = RDF.type  # se resuelve una sola vez, fuera del ciclo
     for subj, pred, obj in g:
-        tripletas[subj][pred].add(obj)
+        if pred != rdf_type:
+            tripletas[subj][pred].add(obj)
 
     # `hechos` es la variable que va a ser retornada, con los hechos para el sistema experto
+    if trabajadores > 1:
+        hechos = _traducir_en_paralelo(tripletas, list(tabla.items()), trabajadores)
+    else:
+        hechos = _traducir_sujetos(tripletas, tabla.items())
+
+    hechos.extend(_eventos_en_vias(hechos))
+
+    return hechos
+
+
+def _predicados_vacios() -> Predicados:
+    # se usa una función en vez de un lambda para que `tripletas` se pueda serializar con pickle
+    return defaultdict(set)
+
+
+def _traducir_sujetos(
+    tripletas: Tripletas, sujetos: Iterable[tuple[Node, tuple[type[Fact], str | None]]]
+) -> list[Fact]:
+    """
+    Traduce los sujetos dados (parejas sujeto, (clase de hecho, tipo) de `tabla_tipos`) a hechos
+    """
+    # En este ciclo for se realiza la traducción, visitando solo los sujetos que son instancias
     hechos = []
+    for subj, (tipo_clase, tipo_campo) in sujetos:
+        hechos.append(_construir_hecho(tripletas, tipo_clase, tipo_campo, tripletas[subj]))
+    return hechos
+
+
+# `tripletas` de cada proceso trabajador, se envía una sola vez al crear el proceso
+_tripletas_trabajador: Tripletas | None = None
+
+
+def _iniciar_trabajador(tripletas: Tripletas):
+    global _tripletas_trabajador
+    _tripletas_trabajador = tripletas
+
+
+def _traducir_bloque(sujetos: list[tuple[Node, tuple[type[Fact], str | None]]]) -> list[Fact]:
+    return _traducir_sujetos(_tripletas_trabajador, sujetos)
+
+
+def _sin_gil() -> bool:
+    """
+    Retorna True si el intérprete se está ejecutando sin GIL (Python 3.13+ compilado con free-threading)
+    """
+    esta_gil_activo = getattr(sys, "_is_gil_enabled", None)
+    return esta_gil_activo is not None and not esta_gil_activo()
+
+
+def _traducir_en_paralelo(
+    tripletas: Tripletas, sujetos: list[tuple[Node, tuple[type[Fact], str | None]]], trabajadores: int
+) -> list[Fact]:
+    """
+    Reparte `sujetos` en bloques contiguos y los traduce en un grupo de procesos (o de hilos si no
+    hay GIL). Los bloques se unen en orden, así que el resultado no depende de cuál termina primero
+    """
+    # varios bloques por trabajador para repartir mejor la carga (las rutas son más costosas)
+    tamano_bloque = max(1, -(-len(sujetos) // (trabajadores * 4)))
+    bloques = [sujetos[i : i + tamano_bloque] for i in range(0, len(sujetos), tamano_bloque)]
+
+    if _sin_gil():
+        with ThreadPoolExecutor(max_workers=trabajadores) as ejecutor:
+            resultados = ejecutor.map(lambda bloque: _traducir_sujetos(tripletas, bloque), bloques)
+            return [hecho for resultado in resultados for hecho in resultado]
 
-    # En este ciclo for se realiza la traducción
-    for subj, datos in tripletas.items():
-        # traducción del tipo RDF.type a una clase de hecho:
-        tipo_clase, tipo_campo = _traducir_tipo(datos[RDF.type])
+    with ProcessPoolExecutor(
+        max_workers=trabajadores, initializer=_iniciar_trabajador, initargs=(tripletas,)
+    ) as ejecutor:
+        resultados = ejecutor.map(_traducir_bloque, bloques)
+        return [hecho for resultado in resultados for hecho in resultado]
 
-        # si `tipo` es None, no es una instancia y no nos interesa agregarlo a la lista de hechos
-        if tipo_clase is None:
+
+def _eventos_en_vias(hechos: Sequence[Fact]) -> list[EventoEnVia]:
+    """
+    Retorna un hecho EventoEnVia por cada evento que afecta una vía (según el campo afectada_por
+    de la vía)
+    """
+    eventos = {hecho["tipo"]: hecho for hecho in hechos if isinstance(hecho, Evento)}
+
+    eventos_en_vias = []
+    for hecho in hechos:
+        if not isinstance(hecho, Via):
             continue
+        for tipo in hecho.get("afectada_por", []):
+            if tipo not in eventos:
+                continue
+            evento = eventos[tipo]
+            eventos_en_vias.append(
+                EventoEnVia(
+                    via=hecho["nombre"],
+                    tipo=tipo,
+                    duracion=evento["duracion"],
+                    cierre_total=evento["cierre_total"],
+                )
+            )
+    return eventos_en_vias
+
+
+# Clases de las instancias que se traducen a hechos (ver _traducir_tipo)
+CLASES_TRADUCIBLES = [
+    RUTA.Calle,
+    RUTA.Avenida,
+    RUTA.Autopista,
+    RUTA.Transversal,
+    RUTA.Carrera,
+    RUTA.Interseccion,
+    RUTA.PuntoReferencia,
+    RUTA.Semaforo,
+    RUTA.Evento,
+    RUTA.Ruta,
+]
+
+
+class _VistaGrafo:
+    """
+    Vista perezosa de un grafo con la misma interfaz de lectura que `Tripletas`: vista[subj][pred]
+    retorna el `set` de objetos, consultando el grafo en el momento en vez de copiarlo
+    """
+
+    def __init__(self, g: Graph):
+        self.g = g
 
-        # ya traducimos el tipo entonces lo eliminamos de los datos que quedan por traducir
-        del datos[RDF.type]
+    def __getitem__(self, subj: Node) -> "_VistaSujeto":
+        return _VistaSujeto(self.g, subj)
 
-        # traducimos los campos que quedan por traducir
-        campos = _traducir_campos(tripletas, datos)
 
-        hecho_traducido = tipo_clase(**campos)
+class _VistaSujeto:
+    """
+    Predicados de un sujeto de un `_VistaGrafo`
+    """
 
-        if tipo_campo is not None:
-            hecho_traducido["tipo"] = tipo_campo
+    def __init__(self, g: Graph, subj: Node):
+        self.g = g
+        self.subj = subj
 
-        # agregamos el hecho a la lista de hechos junto con sus campos
-        hechos.append(hecho_traducido)
+    def __getitem__(self, pred: Node) -> set[Node]:
+        return set(self.g.objects(self.subj, pred))
 
-    return hechos
+
+def traducir_stream(g: Graph) -> Iterator[Fact]:
+    """
+    Igual que `traducir`, pero retorna un generador que produce los hechos uno a uno sin copiar el
+    grafo a memoria: solo se visitan los sujetos cuyo RDF.type es una de las `CLASES_TRADUCIBLES`.
+
+    Los hechos son los mismos que retorna `traducir`, aunque no necesariamente en el mismo orden.
+    """
+    vista = _VistaGrafo(g)
+
+    for clase in CLASES_TRADUCIBLES:
+        for subj in g.subjects(RDF.type, clase):
+            datos = defaultdict(set)
+            for pred, obj in g.predicate_objects(subj):
+                datos[pred].add(obj)
+
+            tipo_clase, tipo_campo = _resolver_tipos(frozenset(datos.pop(RDF.type, ())))
+            if tipo_clase is None:
+                continue
+            hecho = _construir_hecho(vista, tipo_clase, tipo_campo, datos)
+            yield hecho
+
+            # los EventoEnVia de una vía se producen justo después de ella
+            if isinstance(hecho, Via):
+                yield from _eventos_en_via_stream(g, vista, subj, hecho)
+
+
+def _eventos_en_via_stream(g: Graph, vista: _VistaGrafo, subj: Node, via: Via) -> Iterator[EventoEnVia]:
+    """
+    Produce los EventoEnVia de la vía `via` (cuyo sujeto en el grafo es `subj`), consultando
+    directamente en el grafo los eventos que la afectan
+    """
+    for evento in g.objects(subj, RUTA.afectadaPor):
+        if (evento, RDF.type, RUTA.Evento) not in g:
+            continue
+        yield EventoEnVia(
+            via=via["nombre"],
+            tipo=_nodo_id(vista, evento, "tipo"),
+            duracion=_literal(vista[evento][RUTA.duracion], xsd_type=XSD.double),
+            cierre_total=_literal(vista[evento][RUTA.cierreTotal], xsd_type=XSD.boolean),
+        )
+
+
+def tabla_tipos(g: Graph) -> dict[Node, tuple[type[Fact], str | None]]:
+    """
+    Retorna un diccionario con los sujetos de `g` que son instancias, donde el valor es la clase de
+    hecho y el string tipo que les corresponde según su tipo más específico (ver `_traducir_tipo`)
+
+    Solo se leen las tripletas RDF.type, y cada conjunto distinto de tipos se resuelve una sola vez
+    """
+    tipos = defaultdict(set)
+    for subj, _, tipo in g.triples((None, RDF.type, None)):
+        tipos[subj].add(tipo)
+
+    tabla = {}
+    for subj, tipos_subj in tipos.items():
+        tipo_clase, tipo_campo = _resolver_tipos(frozenset(tipos_subj))
+        if tipo_clase is not None:
+            tabla[subj] = (tipo_clase, tipo_campo)
+    return tabla
+
+
+@lru_cache(maxsize=None)
+def _resolver_tipos(tipos: frozenset[Node]) -> tuple[type[Fact] | None, str | None]:
+    """
+    Versión de `_traducir_tipo` con caché (recibe un frozenset en vez de un set)
+    """
+    return _traducir_tipo(set(tipos))
+
+
+def _construir_hecho(
+    tripletas: Tripletas | _VistaGrafo,
+    tipo_clase: type[Fact],
+    tipo_campo: str | None,
+    datos: dict[Node, set[Node]],
+) -> Fact:
+    """
+    Construye un hecho de la clase `tipo_clase` traduciendo los predicados en `datos` (sin RDF.type)
+    """
+    # traducimos los campos que quedan por traducir
+    campos = _traducir_campos(tripletas, datos)
+
+    hecho_traducido = tipo_clase(**campos)
+
+    if tipo_campo is not None:
+        hecho_traducido["tipo"] = tipo_campo
+
+    return hecho_traducido
+
+
+@dataclass
+class ResumenFiltro:
+    """
+    Resumen de lo que se evitó declarar en el motor al filtrar los hechos por el objetivo
+    Campos:
+        - hechos_evitados: cantidad de hechos Ruta que no se declararon
+        - activaciones_estimadas: estimación de las activaciones de reglas que esos hechos habrían
+          creado, `hechos_evitados` por las reglas que se activan con cada Ruta. No se mide: las
+          activaciones que dependen de hechos derivados (TiempoRuta, por ejemplo) no se cuentan
+    """
+
+    hechos_evitados: int
+    activaciones_estimadas: int
+
+
+def filtrar_por_objetivo(hechos: Sequence[Fact], objetivo: Objetivo) -> tuple[list[Fact], ResumenFiltro]:
+    """
+    Elimina de `hechos` las rutas que no inician en una intersección relacionada con el punto de
+    partida del objetivo o que no terminan en una relacionada con el punto de llegada, antes de
+    declararlas en el motor. Son las mismas rutas que retractarían las reglas
+    ruta_que_no_inicia_en_objetivo y ruta_que_no_termina_en_objetivo, por lo que la recomendación
+    no cambia.
+
+    Retorna los hechos filtrados y un `ResumenFiltro`
+    """
+    puntos = {
+        hecho["nombre"]: set(hecho["se_relaciona_con"])
+        for hecho in hechos
+        if isinstance(hecho, Nodo) and "nombre" in hecho and "se_relaciona_con" in hecho
+    }
+    # si el punto no existe no se filtra (las reglas tampoco filtrarían)
+    origenes = puntos.get(objetivo.get("desde"))
+    destinos = puntos.get(objetivo.get("hasta"))
+
+    filtrados = []
+    evitados = 0
+    for hecho in hechos:
+        if isinstance(hecho, Ruta) and (
+            (origenes is not None and hecho["origen"] not in origenes)
+            or (destinos is not None and hecho["destino"] not in destinos)
+        ):
+            evitados += 1
+            continue
+        filtrados.append(hecho)
+
+    return filtrados, ResumenFiltro(
+        hechos_evitados=evitados,
+        activaciones_estimadas=evitados * _REGLAS_ACTIVADAS_POR_RUTA,
+    )
+
+
+def _reglas_activadas_por_ruta() -> int:
+    """
+    Retorna la cantidad de reglas del `Motor` que se activan al declarar un hecho Ruta, es decir, las
+    reglas que tienen un patrón Ruta y cuyos demás patrones (sin contar los NOT) son hechos que se
+    declaran desde el inicio. Cada una crea una activación por ruta.
+    """
+    hechos_iniciales = (Via, Nodo, Semaforo, Evento, EventoEnVia, Ruta, Objetivo)
+    cantidad = 0
+    # las reglas son atributos de la clase, no hace falta instanciar el motor
+    for regla in vars(Motor).values():
+        if not isinstance(regla, Rule):
+            continue
+        patrones = [patron for patron in regla if isinstance(patron, Fact)]
+        if any(isinstance(patron, Ruta) for patron in patrones) and all(
+            isinstance(patron, hechos_iniciales) for patron in patrones
+        ):
+            cantidad += 1
+    return cantidad
+
+
+_REGLAS_ACTIVADAS_POR_RUTA = _reglas_activadas_por_ruta()
 
 
 def _traducir_tipo(tipos: set[Node]) -> tuple[type[Fact] | None, str | None]:
@@ -107,6 +396,44 @@ def _traducir_tipo(tipos: set[Node]) -> tuple[type[Fact] | None, str | None]:
             raise Exception(f"se intentó traducir un tipo desconocido: {tipo}")
 
 
+# Tipos que indican que un sujeto no es una instancia (ver _es_instancia)
+_TIPOS_QUE_NO_SON_INSTANCIAS = frozenset(
+    {
+        RDFS.Class,
+        RDF.Property,
+        XSD.boolean,
+        XSD.string,
+        XSD.double,
+        XSD.integer,
+        RDF.List,
+    }
+)
+
+# Tipos que se ignoran siempre (ver _eliminar_tipos_ignorados)
+_TIPOS_IGNORADOS = (RDFS.Resource,)
+
+# llave: tipo que se ignora si el sujeto tiene alguno de los tipos del valor (más específicos)
+_TIPOS_IGNORADOS_SI_YA_HAY = {
+    RUTA.Nodo: (RUTA.Interseccion, RUTA.PuntoReferencia),
+    GEO.SpatialThing: (
+        RUTA.Interseccion,
+        RUTA.Carrera,
+        RUTA.Autopista,
+        RUTA.Transversal,
+        RUTA.Calle,
+        RUTA.Avenida,
+        RUTA.PuntoReferencia,
+    ),
+    RUTA.Via: (
+        RUTA.Carrera,
+        RUTA.Autopista,
+        RUTA.Calle,
+        RUTA.Avenida,
+        RUTA.Transversal,
+    ),
+}
+
+
 def _es_instancia(tipos: set[Node]):
     """
     Retorna True si el sujeto asociado a los `tipos` es una instancia
@@ -117,16 +444,7 @@ def _es_instancia(tipos: set[Node]):
         - Definiciones de listas
     """
 
-    tipos_que_no_son_instancias = {
-        RDFS.Class,
-        RDF.Property,
-        XSD.boolean,
-        XSD.string,
-        XSD.double,
-        XSD.integer,
-        RDF.List,
-    }
-    return len(tipos.intersection(tipos_que_no_son_instancias)) == 0
+    return tipos.isdisjoint(_TIPOS_QUE_NO_SON_INSTANCIAS)
 
 
 def _eliminar_tipos_ignorados(tipos: set[Node]):
@@ -136,34 +454,13 @@ def _eliminar_tipos_ignorados(tipos: set[Node]):
         - Clases si ya hay una subclase más específica
     """
 
-    # eliminar tipos en `tipos_ignorados`
-    tipos_ignorados = [RDFS.Resource]
-    for tipo in tipos_ignorados:
-        if tipo in tipos:
-            tipos.remove(tipo)
+    # eliminar tipos en `_TIPOS_IGNORADOS`
+    for tipo in _TIPOS_IGNORADOS:
+        tipos.discard(tipo)
 
-    # eliminar tipos en las llaves del diccionario `tipos_ignorados_si_ya_hay` si existe alguno de
+    # eliminar tipos en las llaves del diccionario `_TIPOS_IGNORADOS_SI_YA_HAY` si existe alguno de
     # los tipos en el valor del diccionario
-    tipos_ignorados_si_ya_hay = {
-        RUTA.Nodo: [RUTA.Interseccion, RUTA.PuntoReferencia],
-        GEO.SpatialThing: [
-            RUTA.Interseccion,
-            RUTA.Carrera,
-            RUTA.Autopista,
-            RUTA.Transversal,
-            RUTA.Calle,
-            RUTA.Avenida,
-            RUTA.PuntoReferencia,
-        ],
-        RUTA.Via: [
-            RUTA.Carrera,
-            RUTA.Autopista,
-            RUTA.Calle,
-            RUTA.Avenida,
-            RUTA.Transversal,
-        ],
-    }
-    for tipo, alternativas in tipos_ignorados_si_ya_hay.items():
+    for tipo, alternativas in _TIPOS_IGNORADOS_SI_YA_HAY.items():
         if tipo in tipos:
             for alternativa in alternativas:
                 if alternativa in tipos:
@@ -190,6 +487,48 @@ def _traducir_campos(
     return campos
 
 
+# llave: predicado del grafo de ontologías
+# valor: el nombre del campo en el hecho y la función que traduce los objetos del predicado a su
+# valor. Se construye una sola vez para no resolver los términos de RUTA en cada tripleta
+_CAMPOS = {
+    RUTA.nombre: ("nombre", lambda tripletas, objs: _literal(objs)),
+    RUTA.tipo: ("tipo", lambda tripletas, objs: _literal(objs)),
+    RUTA.via: ("via", lambda tripletas, objs: _uri_ref_id(tripletas, objs)),
+    RUTA.afectaVia: ("afecta_via", lambda tripletas, objs: _uri_ref_id(tripletas, objs)),
+    RUTA.seRelacionaCon: ("se_relaciona_con", lambda tripletas, objs: _uri_ref_ids(tripletas, objs, id="numero")),
+    RUTA.conectaCon: ("conecta_con", lambda tripletas, objs: _uri_ref_ids(tripletas, objs)),
+    RUTA.esConectada: ("es_conectada", lambda tripletas, objs: _uri_ref_ids(tripletas, objs, id="numero")),
+    RUTA.tiempoEspera: ("tiempo_espera", lambda tripletas, objs: _literal(objs, xsd_type=XSD.double)),
+    RUTA.intersectaCon: ("intersecta_con", lambda tripletas, objs: _uri_ref_ids(tripletas, objs, id="numero")),
+    RUTA.fluidez: ("fluidez", lambda tripletas, objs: _literal(objs)),
+    RUTA.velocidadPromedio: ("velocidad_promedio", lambda tripletas, objs: _literal(objs, xsd_type=XSD.double)),
+    RUTA.estaEnVia: ("via", lambda tripletas, objs: _uri_ref_id(tripletas, objs)),
+    RUTA.esBidireccional: ("es_bidireccional", lambda tripletas, objs: _literal(objs, xsd_type=XSD.boolean)),
+    DC.title: ("nombre", lambda tripletas, objs: _literal(objs)),
+    RUTA.tieneDistancia: ("distancia", lambda tripletas, objs: _literal(objs)),
+    RUTA.tieneVias: ("vias", lambda tripletas, objs: _collection_ids(tripletas, objs)),
+    RUTA.tiempoEstimado: ("tiempo_estimado", lambda tripletas, objs: _literal(objs)),
+    RUTA.cierreTotal: ("cierre_total", lambda tripletas, objs: _literal(objs, xsd_type=XSD.boolean)),
+    RUTA.duracion: ("duracion", lambda tripletas, objs: _literal(objs, xsd_type=XSD.double)),
+    RUTA.tieneNombre: ("nombre", lambda tripletas, objs: _literal(objs)),
+    RUTA.origen: ("origen", lambda tripletas, objs: _bnode_id(tripletas, objs, "numero")),
+    RUTA.destino: ("destino", lambda tripletas, objs: _bnode_id(tripletas, objs, "numero")),
+    RUTA.tieneNodos: ("tiene_nodos", lambda tripletas, objs: _collection_ids(tripletas, objs, id="numero")),
+    # codificación compacta de las rutas: se decodifica sin consultar el grafo, internando los
+    # strings para que todas las rutas compartan los mismos (como pasa con las colecciones)
+    RUTA.nodosCodificados: ("tiene_nodos", lambda tripletas, objs: _intern_split(_literal(objs), SEPARADOR_NODOS)),
+    RUTA.viasCodificadas: ("vias", lambda tripletas, objs: _intern_split(_literal(objs), SEPARADOR_VIAS)),
+    RUTA.numero: ("numero", lambda tripletas, objs: _literal(objs)),
+    RUTA.numeracion: ("numeracion", lambda tripletas, objs: _literal(objs)),
+    RUTA.afectadaPor: ("afectada_por", lambda tripletas, objs: _uri_ref_ids(tripletas, objs, id="tipo")),
+    RUTA.longitud: ("longitud", lambda tripletas, objs: _literal(objs, xsd_type=XSD.double)),
+}
+
+
+def _intern_split(texto: str, separador: str) -> list[str]:
+    return [sys.intern(parte) for parte in texto.split(separador)]
+
+
 def _traducir_campo(
     tripletas: Tripletas, pred: Node, objs: set[Node]
 ) -> tuple[str, Any]:
@@ -206,63 +545,11 @@ def _traducir_campo(
         - el valor del atributo
     """
 
-    match pred:
-        case RUTA.nombre:
-            return "nombre", _literal(objs)
-        case RUTA.tipo:
-            return "tipo", _literal(objs)
-        case RUTA.via:
-            return "via", _uri_ref_id(tripletas, objs)
-        case RUTA.afectaVia:
-            return "afecta_via", _uri_ref_id(tripletas, objs)
-        case RUTA.seRelacionaCon:
-            return "se_relaciona_con", _uri_ref_ids(tripletas, objs, id="numero")
-        case RUTA.conectaCon:
-            return "conecta_con", _uri_ref_ids(tripletas, objs)
-        case RUTA.esConectada:
-            return "es_conectada", _uri_ref_ids(tripletas, objs, id="numero")
-        case RUTA.tiempoEspera:
-            return "tiempo_espera", _literal(objs, xsd_type=XSD.double)
-        case RUTA.intersectaCon:
-            return "intersecta_con", _uri_ref_ids(tripletas, objs, id="numero")
-        case RUTA.fluidez:
-            return "fluidez", _literal(objs)
-        case RUTA.velocidadPromedio:
-            return "velocidad_promedio", _literal(objs, xsd_type=XSD.double)
-        case RUTA.estaEnVia:
-            return "via", _uri_ref_id(tripletas, objs)
-        case RUTA.esBidireccional:
-            return "es_bidireccional", _literal(objs, xsd_type=XSD.boolean)
-        case DC.title:
-            return "nombre", _literal(objs)
-        case RUTA.tieneDistancia:
-            return "distancia", _literal(objs)
-        case RUTA.tieneVias:
-            return "vias", _collection_ids(tripletas, objs)
-        case RUTA.tiempoEstimado:
-            return "tiempo_estimado", _literal(objs)
-        case RUTA.cierreTotal:
-            return "cierre_total", _literal(objs, xsd_type=XSD.boolean)
-        case RUTA.duracion:
-            return "duracion", _literal(objs, xsd_type=XSD.double)
-        case RUTA.tieneNombre:
-            return "nombre", _literal(objs)
-        case RUTA.origen:
-            return "origen", _bnode_id(tripletas, objs, "numero")
-        case RUTA.destino:
-            return "destino", _bnode_id(tripletas, objs, "numero")
-        case RUTA.tieneNodos:
-            return "tiene_nodos", _collection_ids(tripletas, objs, id="numero")
-        case RUTA.numero:
-            return "numero", _literal(objs)
-        case RUTA.numeracion:
-            return "numeracion", _literal(objs)
-        case RUTA.afectadaPor:
-            return "afectada_por", _uri_ref_ids(tripletas, objs, id="tipo")
-        case RUTA.longitud:
-            return "longitud", _literal(objs, xsd_type=XSD.double)
-        case _:
-            raise Exception(f"se encontró un predicado desconocido: {pred}")
+    if pred not in _CAMPOS:
+        raise Exception(f"se encontró un predicado desconocido: {pred}")
+
+    campo, traducir_valor = _CAMPOS[pred]
+    return campo, traducir_valor(tripletas, objs)
 
 
 def _literal(objs: set[Node], xsd_type=None) -> Any:
@@ -357,20 +644,21 @@ def _recorrer_collection(tripletas: Tripletas, collection: Predicados) -> list[N
     """
     Recorre la collección `collection` retornando una lista python equivalente (con elementos tipo URIRef o BNode)
     """
+    rdf_first, rdf_rest, rdf_nil = RDF.first, RDF.rest, RDF.nil
     resultado = []
     cur = collection
     while True:
-        assert len(cur[RDF.first]) == 1, f"len(first) != 1, first: {cur[RDF.first]}"
-        first = next(iter(cur[RDF.first]))
+        assert len(cur[rdf_first]) == 1, f"len(first) != 1, first: {cur[rdf_first]}"
+        first = next(iter(cur[rdf_first]))
 
         assert isinstance(first, URIRef) or isinstance(first, BNode), f"first no es URIRef ni BNode, first: {first}"
 
         resultado.append(first)
 
-        assert len(cur[RDF.rest]) == 1
-        rest = next(iter(cur[RDF.rest]))
+        assert len(cur[rdf_rest]) == 1
+        rest = next(iter(cur[rdf_rest]))
 
-        if rest == RDF.nil:
+        if rest == rdf_nil:
             break
         cur = tripletas[rest]
-    return resultado
\ No newline at end of file
+    return resultado
@@ -0,0 +1,127 @@
+"""
+Declarar o retractar eventos y fluidez uno a uno debe dejar los motores en el mismo estado que
+construirlos desde cero con los hechos resultantes
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from practica1.motor_nativo import MotorNativo
+from practica1.ontologia import ConfigOntologia, construir_ontologia
+from practica1.sistema_experto import Evento, EventoEnVia, Fluidez, Motor, Objetivo, TiempoVia, Via
+from practica1.traductor_ontologia import filtrar_por_objetivo, traducir
+
+OBJETIVO = Objetivo(desde="Universidad Nacional de Colombia", hasta="Estadio de Fútbol Atanasio Girardot")
+FLUIDECES = ["muy mala", "mala", "aceptable", "buena", "muy buena"]
+
+
+@pytest.fixture(scope="module")
+def hechos():
+    return traducir(construir_ontologia(ConfigOntologia()))
+
+
+def reconstruir(hechos, eventos):
+    """
+    Retorna los hechos con los que se construiría el motor desde cero: los eventos de los tipos en
+    `eventos` ({tipo: Evento o None si se retractó}, en el orden en que se declararon) se quitan y
+    los que siguen declarados se agregan al final con sus EventoEnVia, como los declara el motor
+    """
+    resultado = [
+        hecho
+        for hecho in hechos
+        if not (isinstance(hecho, (Evento, EventoEnVia)) and hecho["tipo"] in eventos)
+    ]
+    vias = [hecho for hecho in hechos if isinstance(hecho, Via)]
+    for tipo, evento in eventos.items():
+        if evento is None:
+            continue
+        resultado.append(evento)
+        for via in vias:
+            if tipo in via.get("afectada_por", []):
+                resultado.append(
+                    EventoEnVia(
+                        via=via["nombre"],
+                        tipo=tipo,
+                        duracion=evento["duracion"],
+                        cierre_total=evento["cierre_total"],
+                    )
+                )
+    return resultado
+
+
+def actualizar(motor, rng, tipos, vias, eventos, cierres=True):
+    """
+    Aplica al motor una actualización aleatoria de los eventos de tipo `tipos` o de la fluidez de
+    las vías `vias`, y la registra en `eventos`
+    """
+    opcion = rng.random()
+    if opcion < 0.4:
+        tipo = rng.choice(tipos)
+        evento = Evento(tipo=tipo, duracion=float(rng.randint(1, 90)), cierre_total=cierres and rng.random() < 0.2)
+        eventos.pop(tipo, None)
+        eventos[tipo] = evento
+        return motor.declarar_evento(evento)
+    declarados = [t for t, evento in eventos.items() if evento is not None and (cierres or not evento["cierre_total"])]
+    if opcion < 0.55 and declarados:
+        tipo = rng.choice(declarados)
+        eventos.pop(tipo)
+        eventos[tipo] = None
+        return motor.retractar_evento(tipo)
+    fluidez = rng.choice(FLUIDECES + ["nula"] if cierres else FLUIDECES)
+    return motor.declarar_fluidez(Fluidez(via=rng.choice(vias), fluidez=fluidez))
+
+
+def test_motor_nativo_igual_a_reconstruirlo(hechos):
+    rng = random.Random(7)
+    tipos = sorted({hecho["tipo"] for hecho in hechos if isinstance(hecho, Evento)})
+    motor = MotorNativo(hechos, objetivo=OBJETIVO)
+    eventos = {}
+    for paso in range(60):
+        actualizacion = actualizar(motor, rng, tipos, motor.nombres_via, eventos)
+
+        desde_cero = MotorNativo(reconstruir(hechos, eventos), fluidez=motor.fluidez, objetivo=OBJETIVO)
+        assert np.array_equal(motor.tiempos_via, desde_cero.tiempos_via), paso
+        assert np.array_equal(motor.tiempos_ruta, desde_cero.tiempos_ruta), paso
+        assert actualizacion.recomendacion == desde_cero.recomendar(k=1), paso
+        assert motor.recomendar(k=5) == desde_cero.recomendar_recorriendo(OBJETIVO, k=5), paso
+
+
+def test_motor_igual_a_reconstruirlo(hechos):
+    filtrados, _ = filtrar_por_objetivo(hechos, OBJETIVO)
+    rng = random.Random(11)
+    motor = Motor(k=3)
+    motor.reset()
+    motor.declare(*filtrados)
+    motor.declare(Objetivo(**OBJETIVO.as_dict()))
+    motor.run()
+
+    # sin cierres totales ni fluidez nula, pues el Motor no restaura las vías que eliminan
+    tipos = sorted({hecho["tipo"] for hecho in filtrados if isinstance(hecho, Evento) and not hecho["cierre_total"]})
+    vias = [hecho["via"] for hecho in motor.facts.values() if isinstance(hecho, Fluidez) and hecho["fluidez"] != "nula"]
+    eventos = {}
+    for paso in range(25):
+        actualizacion = actualizar(motor, rng, tipos, vias, eventos, cierres=False)
+
+        # el motor nativo, con la fluidez del Motor, sirve de referencia (ver test_paridad)
+        hechos_motor = list(motor.facts.values())
+        fluidez = {hecho["via"]: hecho["fluidez"] for hecho in hechos_motor if isinstance(hecho, Fluidez)}
+        desde_cero = MotorNativo(reconstruir(filtrados, eventos), fluidez=fluidez)
+        for hecho in hechos_motor:
+            if isinstance(hecho, TiempoVia):
+                assert hecho["tiempo_estimado"] == desde_cero.tiempos_via[desde_cero.indice_via[hecho["via"]]], paso
+        assert actualizacion.recomendacion == desde_cero.recomendar(OBJETIVO, k=3), paso
+
+
+def test_motor_no_restaura_vias_eliminadas(hechos):
+    filtrados, _ = filtrar_por_objetivo(hechos, OBJETIVO)
+    motor = Motor()
+    motor.reset()
+    motor.declare(*filtrados)
+    motor.declare(Objetivo(**OBJETIVO.as_dict()))
+    motor.run()
+
+    cerrado = next(hecho for hecho in filtrados if isinstance(hecho, Evento) and hecho["cierre_total"])
+    with pytest.raises(Exception, match="no se puede restaurar"):
+        motor.retractar_evento(cerrado["tipo"])
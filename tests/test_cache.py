@@ -0,0 +1,84 @@
+"""
+La llave de caché de la ontología solo debe depender de las tripletas base y de las opciones que
+cambian el grafo
+"""
+
+import random
+from dataclasses import fields, replace
+
+import pytest
+from rdflib import BNode, Graph, Literal
+from rdflib.compare import isomorphic
+
+from practica1.ontologia import (
+    _CAMPOS_SIN_EFECTO,
+    RUTA,
+    ConfigOntologia,
+    _llave_cache,
+    agregar_esquema,
+    agregar_instancias,
+    construir_ontologia,
+)
+
+
+@pytest.fixture(scope="module")
+def base():
+    g = Graph()
+    agregar_esquema(g)
+    agregar_instancias(g, random.Random(21))
+    return g
+
+
+def test_campos_sin_efecto_no_cambian_la_llave(base):
+    config = ConfigOntologia()
+    llave = _llave_cache(base, config)
+    assert _CAMPOS_SIN_EFECTO <= {campo.name for campo in fields(ConfigOntologia)}
+    for cambio in ({"verbosidad": 2}, {"usar_cache": True}, {"trabajadores": 4}):
+        assert _llave_cache(base, replace(config, **cambio)) == llave
+
+
+@pytest.mark.parametrize(
+    "cambio",
+    [
+        {"semilla": 22},
+        {"razonar": False},
+        {"razonador": "dirigido"},
+        {"generar_rutas": False},
+        {"cutoff": 5},
+        {"modo_rutas": "k_mejores"},
+        {"k_rutas": 3},
+        {"podar_rutas": True},
+        {"codificacion_rutas": "compacta"},
+    ],
+)
+def test_campos_con_efecto_cambian_la_llave(base, cambio):
+    config = ConfigOntologia()
+    assert _llave_cache(base, replace(config, **cambio)) != _llave_cache(base, config)
+
+
+def test_llave_depende_del_contenido_y_no_de_los_nodos_blancos(base):
+    config = ConfigOntologia()
+    llave = _llave_cache(base, config)
+
+    # mismos datos con otros identificadores de nodos blancos
+    renombres = {}
+    copia = Graph()
+    for tripleta in base:
+        copia.add(tuple(renombres.setdefault(n, BNode()) if isinstance(n, BNode) else n for n in tripleta))
+    assert _llave_cache(copia, config) == llave
+
+    copia.add((BNode(), RUTA.tieneNombre, Literal("Nueva")))
+    assert _llave_cache(copia, config) != llave
+
+
+def test_construir_ontologia_reutiliza_la_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRACTICA1_CACHE", str(tmp_path))
+    config = ConfigOntologia(usar_cache=True, generar_rutas=False, razonador="dirigido")
+
+    g = construir_ontologia(config)
+    assert len(list(tmp_path.glob("ontologia_*.pickle"))) == 1
+
+    # la segunda vez se carga de disco, también con campos sin efecto distintos
+    cargado = construir_ontologia(replace(config, verbosidad=0, trabajadores=2))
+    assert isomorphic(g, cargado)
+    assert len(list(tmp_path.glob("ontologia_*.pickle"))) == 1
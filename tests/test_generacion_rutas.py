@@ -0,0 +1,176 @@
+"""
+Las formas rápidas de generar las rutas (el recorrido iterativo sobre el `GrafoCSR` y la poda de
+las rutas muy largas) deben generar exactamente las mismas rutas que la búsqueda en profundidad
+recursiva sobre el grafo de networkx, y repartir los pares entre procesos no debe cambiar el grafo.
+El modo "k_mejores" debe dejar alguna ruta recomendable siempre que el modo "todas" la deje
+"""
+
+import dataclasses
+import itertools
+import random
+
+import pytest
+
+from practica1.benchmark import red_sintetica
+from practica1.motor_nativo import MotorNativo
+from practica1.ontologia import (
+    FACTOR_DISTANCIA_MAXIMA,
+    ConfigOntologia,
+    GrafoCSR,
+    construir_grafo_vial,
+    construir_ontologia,
+    generar_rutas_puntos,
+    iterar_rutas_sin_repetir_vias,
+    mapa_puntos_referencia,
+    rutas_sin_repetir_vias,
+    vias_cerradas,
+)
+from practica1.sistema_experto import Nodo, Objetivo, Ruta, Via
+from practica1.traductor_ontologia import filtrar_por_objetivo, traducir
+
+FLUIDECES = ["muy mala", "mala", "aceptable", "buena", "muy buena"]
+
+
+@pytest.fixture(scope="module")
+def base():
+    return construir_ontologia(ConfigOntologia(generar_rutas=False))
+
+
+@pytest.fixture(scope="module", params=["medellin", "sintetica"])
+def grafo_vial(request, base):
+    g = base if request.param == "medellin" else red_sintetica(5)
+    return g, construir_grafo_vial(g)
+
+
+def pares_de_prueba(g, G):
+    """
+    Pares (inicio, fin) de las intersecciones de los puntos de referencia, más algunos pares
+    aleatorios de intersecciones cualesquiera
+    """
+    intersecciones = [inter for inters in mapa_puntos_referencia(g).values() for inter in inters]
+    pares = list(itertools.permutations(intersecciones, 2))
+    rng = random.Random(3)
+    nodos = list(G.nodes)
+    pares.extend((rng.choice(nodos), rng.choice(nodos)) for _ in range(20))
+    return pares
+
+
+@pytest.mark.parametrize("cutoff", [1, 3, 6])
+def test_csr_igual_a_recursiva(grafo_vial, cutoff):
+    g, G = grafo_vial
+    # se reutiliza el mismo GrafoCSR en todos los recorridos, como en agregar_rutas
+    csr = GrafoCSR(G)
+    for inicio, fin in pares_de_prueba(g, G):
+        esperadas = rutas_sin_repetir_vias(G, inicio, fin, cutoff=cutoff)
+        assert list(iterar_rutas_sin_repetir_vias(csr, inicio, fin, cutoff=cutoff)) == esperadas, (inicio, fin)
+
+
+def test_csr_con_inicio_igual_a_fin(grafo_vial):
+    g, G = grafo_vial
+    csr = GrafoCSR(G)
+    for nodo in list(G.nodes)[:10]:
+        assert list(iterar_rutas_sin_repetir_vias(csr, nodo, nodo)) == rutas_sin_repetir_vias(G, nodo, nodo)
+
+
+def distancia(G, ruta) -> float:
+    # sumada en el orden de la ruta, como en el recorrido con poda
+    total = 0
+    for (a, _), (b, _) in zip(ruta, ruta[1:]):
+        total += G[a][b]["longitud"]
+    return total
+
+
+def test_poda_igual_a_fuerza_bruta(grafo_vial):
+    g, G = grafo_vial
+    config = ConfigOntologia(podar_rutas=True)
+    csr = GrafoCSR(G)
+    cerradas = vias_cerradas(g)
+    puntos = mapa_puntos_referencia(g)
+    for (_, origenes), (_, destinos) in itertools.permutations(puntos.items(), 2):
+        todas = [
+            (origen, destino, rutas_sin_repetir_vias(G, origen, destino, cutoff=config.cutoff))
+            for origen in origenes
+            for destino in destinos
+            if origen != destino
+        ]
+        # la distancia mínima es la de las rutas que no pasan por vías con cierre total
+        minima = min(
+            (
+                distancia(G, ruta)
+                for _, _, rutas in todas
+                for ruta in rutas
+                if not any(via in cerradas for _, via in ruta)
+            ),
+            default=float("inf"),
+        )
+        umbral = FACTOR_DISTANCIA_MAXIMA * minima
+        esperadas = [
+            (origen, destino, [ruta for ruta in rutas if distancia(G, ruta) <= umbral])
+            for origen, destino, rutas in todas
+        ]
+        assert generar_rutas_puntos(G, origenes, destinos, config, csr, cerradas) == esperadas
+
+
+def test_poda_no_cambia_las_recomendaciones():
+    hechos_completos = traducir(construir_ontologia(ConfigOntologia()))
+    hechos_podados = traducir(construir_ontologia(ConfigOntologia(podar_rutas=True)))
+    assert sum(isinstance(hecho, Via) for hecho in hechos_podados) == sum(
+        isinstance(hecho, Via) for hecho in hechos_completos
+    )
+
+    # fluidez fija y sin "nula", pues la poda no tiene en cuenta las vías que elimina la fluidez
+    rng = random.Random(5)
+    fluidez = {hecho["nombre"]: rng.choice(FLUIDECES) for hecho in hechos_completos if isinstance(hecho, Via)}
+    nombres = [hecho["nombre"] for hecho in hechos_completos if isinstance(hecho, Nodo) and "nombre" in hecho]
+    for desde, hasta in itertools.permutations(nombres, 2):
+        objetivo = Objetivo(desde=desde, hasta=hasta)
+        recomendaciones = []
+        for hechos in (hechos_completos, hechos_podados):
+            filtrados, _ = filtrar_por_objetivo(hechos, objetivo)
+            # la numeración de las rutas cambia al podar, así que no se compara
+            recomendaciones.append(
+                [
+                    dataclasses.replace(recomendacion, ruta=None)
+                    for recomendacion in MotorNativo(filtrados, fluidez=fluidez).recomendar(objetivo, k=3)
+                ]
+            )
+        assert recomendaciones[0] == recomendaciones[1], (desde, hasta)
+
+
+def test_k_mejores_recomienda_si_todas_recomienda():
+    hechos_todas = traducir(construir_ontologia(ConfigOntologia()))
+    hechos_k_mejores = traducir(construir_ontologia(ConfigOntologia(modo_rutas="k_mejores")))
+
+    # fluidez fija y sin "nula": las vías que cierra la fluidez no se conocen al generar las rutas
+    rng = random.Random(5)
+    fluidez = {hecho["nombre"]: rng.choice(FLUIDECES) for hecho in hechos_todas if isinstance(hecho, Via)}
+    nombres = [hecho["nombre"] for hecho in hechos_todas if isinstance(hecho, Nodo) and "nombre" in hecho]
+    for desde, hasta in itertools.permutations(nombres, 2):
+        objetivo = Objetivo(desde=desde, hasta=hasta)
+        recomendaciones = [
+            MotorNativo(filtrar_por_objetivo(hechos, objetivo)[0], fluidez=fluidez).recomendar(objetivo, k=1)
+            for hechos in (hechos_todas, hechos_k_mejores)
+        ]
+        assert bool(recomendaciones[1]) == bool(recomendaciones[0]), (desde, hasta)
+
+
+@pytest.mark.parametrize(
+    "opciones", [{}, {"podar_rutas": True}, {"modo_rutas": "k_mejores"}, {"codificacion_rutas": "compacta"}]
+)
+def test_en_paralelo_igual_a_secuencial(opciones):
+    secuencial = construir_ontologia(ConfigOntologia(**opciones))
+    paralelo = construir_ontologia(ConfigOntologia(trabajadores=2, **opciones))
+    assert len(paralelo) == len(secuencial)
+    assert rutas(paralelo) == rutas(secuencial)
+
+
+def rutas(g) -> list:
+    """
+    Retorna las rutas de `g` como tuplas (numeracion, origen, destino, vías, intersecciones), que no
+    dependen de los nodos blancos del grafo
+    """
+    return sorted(
+        (hecho["numeracion"], hecho["origen"], hecho["destino"], list(hecho["vias"]), list(hecho["tiene_nodos"]))
+        for hecho in traducir(g)
+        if isinstance(hecho, Ruta)
+    )
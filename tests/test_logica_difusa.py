@@ -0,0 +1,114 @@
+"""
+La evaluación por lotes, la superficie precalculada y las simulaciones del pool usadas desde varios
+hilos deben dar las mismas etiquetas que la simulación exacta de skfuzzy
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from practica1.sistema_logica_difusa import (
+    PoolSimulaciones,
+    SuperficieFluidez,
+    _etiqueta_fluidez,
+    _salida_exacta,
+    calcular_fluidez_lote,
+    calcular_fluidez_via,
+    precompilar_superficie,
+    usar_superficie,
+)
+
+
+def puntos_aleatorios(n, semilla):
+    rng = np.random.default_rng(semilla)
+    return rng.uniform(0, 100, n), rng.uniform(0, 60, n), rng.uniform(0, 180, n)
+
+
+def test_lote_igual_a_simulacion_exacta():
+    congestiones, velocidades, esperas = puntos_aleatorios(300, semilla=1)
+    salidas, etiquetas = calcular_fluidez_lote(congestiones, velocidades, esperas)
+    for punto, salida, etiqueta in zip(zip(congestiones, velocidades, esperas), salidas, etiquetas):
+        # el universo de salida del lote es más fino que el de skfuzzy, por eso la tolerancia
+        assert salida == pytest.approx(_salida_exacta(*punto), abs=1.0)
+        assert etiqueta == calcular_fluidez_via(*punto)
+
+
+def test_lote_con_escalares_y_entradas_enteras():
+    salida, etiqueta = calcular_fluidez_lote(70, 25, 90)
+    assert salida.shape == () and etiqueta.shape == ()
+    assert str(etiqueta) == calcular_fluidez_via(70, 25, 90)
+
+    _, etiquetas = calcular_fluidez_lote([0, 50, 100], [5, 30, 60], 0)
+    assert list(etiquetas) == [calcular_fluidez_via(c, v, 0) for c, v in [(0, 5), (50, 30), (100, 60)]]
+
+
+@pytest.fixture(scope="module")
+def directorio(tmp_path_factory):
+    return tmp_path_factory.mktemp("cache")
+
+
+@pytest.fixture(scope="module")
+def superficie(directorio):
+    return precompilar_superficie(directorio=directorio)
+
+
+def test_superficie_conserva_las_etiquetas(superficie):
+    assert superficie.etiquetas_distintas == 0
+    assert superficie.estables.mean() > 0.8
+
+    puntos = list(zip(*puntos_aleatorios(1000, semilla=2)))
+    exactas = [_etiqueta_fluidez(_salida_exacta(*punto)) for punto in puntos]
+    usar_superficie(superficie)
+    try:
+        con_superficie = [calcular_fluidez_via(*punto) for punto in puntos]
+    finally:
+        usar_superficie(None)
+    assert con_superficie == exactas
+
+
+def test_superficie_se_carga_de_disco(superficie, directorio):
+    cargada = precompilar_superficie(directorio=directorio)
+    assert np.array_equal(cargada.valores, superficie.valores)
+    assert cargada.error_maximo == superficie.error_maximo
+    assert cargada.etiquetas_distintas == superficie.etiquetas_distintas
+
+
+def test_usar_superficie_rechaza_superficies_que_cambian_etiquetas(superficie):
+    mala = SuperficieFluidez(superficie.ejes, superficie.valores, 30.0, etiquetas_distintas=3)
+    with pytest.raises(Exception, match="cambia la etiqueta"):
+        usar_superficie(mala)
+    usar_superficie(None)
+
+
+def test_pool_desde_varios_hilos_igual_a_secuencial():
+    congestiones, velocidades, esperas = puntos_aleatorios(200, semilla=4)
+    puntos = list(zip(congestiones, velocidades, esperas))
+    esperadas = [_etiqueta_fluidez(_salida_exacta(*punto)) for punto in puntos]
+
+    pool = PoolSimulaciones(tamano_maximo=2)
+
+    def etiqueta(punto):
+        with pool.simulacion() as simulacion:
+            simulacion.input["congestion"] = punto[0]
+            simulacion.input["velocidad_media"] = punto[1]
+            simulacion.input["espera_semaforo"] = punto[2]
+            simulacion.compute()
+            return _etiqueta_fluidez(simulacion.output["fluidez"])
+
+    with ThreadPoolExecutor(max_workers=8) as ejecutor:
+        etiquetas = list(ejecutor.map(etiqueta, puntos))
+
+    assert etiquetas == esperadas
+    estadisticas = pool.estadisticas()
+    assert 1 <= estadisticas["creadas"] <= 2
+    assert 0 <= estadisticas["esperas"] <= len(puntos)
+
+
+def test_pool_tamano_maximo():
+    assert PoolSimulaciones().tamano_maximo == (os.cpu_count() or 1)
+    assert PoolSimulaciones(tamano_maximo=1).tamano_maximo == 1
+    for tamano in (0, -1):
+        with pytest.raises(Exception, match="al menos una simulación"):
+            PoolSimulaciones(tamano_maximo=tamano)
@@ -0,0 +1,73 @@
+"""
+El `MotorNativo` debe dar exactamente los mismos tiempos y las mismas rutas recomendadas que el
+`Motor` de experta
+"""
+
+import itertools
+
+import pytest
+
+from practica1.motor_nativo import MotorNativo, verificar_paridad
+from practica1.ontologia import ConfigOntologia, construir_ontologia
+from practica1.sistema_experto import Evento, EventoEnVia, Nodo, Objetivo, Ruta, Semaforo, Via
+from practica1.traductor_ontologia import filtrar_por_objetivo, traducir
+
+
+@pytest.fixture(scope="module")
+def hechos():
+    return traducir(construir_ontologia(ConfigOntologia()))
+
+
+def test_paridad_en_todos_los_objetivos(hechos):
+    nombres = [hecho["nombre"] for hecho in hechos if isinstance(hecho, Nodo) and "nombre" in hecho]
+    assert len(nombres) == 7
+
+    diferencias = {}
+    for desde, hasta in itertools.permutations(nombres, 2):
+        objetivo = Objetivo(desde=desde, hasta=hasta)
+        filtrados, _ = filtrar_por_objetivo(hechos, objetivo)
+        encontradas = verificar_paridad(filtrados, objetivo, k=3, tolerancia=0)
+        if encontradas:
+            diferencias[(desde, hasta)] = encontradas
+    assert diferencias == {}
+
+
+def red_pequena():
+    """
+    Red con una sola ruta A-B-C donde cada semáforo se declara antes que su vía, así que en el
+    `Motor` la bonificación bidireccional se aplica antes que el semáforo
+    """
+    hechos = [Evento(tipo="Obra Menor", duracion=20.0, cierre_total=False)]
+    for nombre, longitud in (("A", 1.0), ("B", 0.7), ("C", 2.3)):
+        hechos.append(Semaforo(via=nombre, tiempo_espera=90))
+        hechos.append(
+            Via(
+                nombre=nombre,
+                tipo="calle",
+                velocidad_promedio=30.0,
+                longitud=longitud,
+                afectada_por=["Obra Menor"],
+                es_bidireccional=True,
+            )
+        )
+    hechos.append(Nodo(tipo="Punto_de_referencia", nombre="Inicio", se_relaciona_con=["1"]))
+    hechos.append(Nodo(tipo="Punto_de_referencia", nombre="Fin", se_relaciona_con=["4"]))
+    hechos.append(
+        Ruta(numeracion="Ruta1", tiene_nodos=["1", "2", "3", "4"], vias=["A", "B", "C"], origen="1", destino="4")
+    )
+    for nombre in ("A", "B", "C"):
+        hechos.append(EventoEnVia(via=nombre, tipo="Obra Menor", duracion=20.0, cierre_total=False))
+    return hechos
+
+
+def test_ajustes_en_el_orden_de_declaracion():
+    nativo = MotorNativo(red_pequena(), fluidez={"A": "buena", "B": "muy mala", "C": "aceptable"})
+
+    # fluidez, evento (el hecho más reciente), bonificación bidireccional (la vía) y semáforo
+    esperado = (((1.0 / 30.0) * 0.9 + (20.0 / 60)) * 0.9) + (90 / 60 / 60)
+    assert nativo.tiempos_via[nativo.indice_via["A"]] == esperado
+
+
+def test_paridad_en_red_pequena():
+    objetivo = Objetivo(desde="Inicio", hasta="Fin")
+    assert verificar_paridad(red_pequena(), objetivo, k=2, tolerancia=0) == []
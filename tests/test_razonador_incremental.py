@@ -0,0 +1,87 @@
+"""
+El grafo de `RazonadorIncremental` debe ser siempre igual al que produce `razonar_dirigido` sobre
+las tripletas explícitas que quedan
+"""
+
+import random
+
+import pytest
+from rdflib import BNode, Graph
+from rdflib.namespace import RDF, RDFS
+
+from practica1.ontologia import RUTA, ConfigOntologia, RazonadorIncremental, construir_ontologia, razonar_dirigido
+
+
+@pytest.fixture(scope="module")
+def base():
+    return list(construir_ontologia(ConfigOntologia(razonar=False, generar_rutas=False)))
+
+
+def referencia(tripletas) -> set:
+    g = Graph()
+    for tripleta in tripletas:
+        g.add(tripleta)
+    razonar_dirigido(g)
+    return set(g)
+
+
+def nuevo_razonador(tripletas) -> RazonadorIncremental:
+    g = Graph()
+    for tripleta in tripletas:
+        g.add(tripleta)
+    return RazonadorIncremental(g)
+
+
+def test_estado_inicial_igual_a_razonar_dirigido(base):
+    razonador = nuevo_razonador(base)
+    assert set(razonador.g) == referencia(base)
+
+
+def test_explicita_que_tambien_se_infiere_se_conserva(base):
+    x = BNode()
+    explicitas = base + [(x, RDF.type, RUTA.Calle), (x, RDF.type, RUTA.Via)]
+    razonador = nuevo_razonador(explicitas)
+
+    # sin cambiar las jerarquías
+    razonador.quitar([(x, RDF.type, RUTA.Via)])
+    restantes = [t for t in explicitas if t != (x, RDF.type, RUTA.Via)]
+    assert (x, RDF.type, RUTA.Via) in razonador.g
+    assert set(razonador.g) == referencia(restantes)
+
+    # cambiando las jerarquías
+    razonador.agregar([(x, RDF.type, RUTA.Via)])
+    quitadas = [(x, RDF.type, RUTA.Via), (RUTA.Autopista, RDFS.subClassOf, RUTA.Via)]
+    razonador.quitar(quitadas)
+    restantes = [t for t in explicitas if t not in quitadas]
+    assert (x, RDF.type, RUTA.Via) in razonador.g
+    assert set(razonador.g) == referencia(restantes)
+
+
+def test_retorna_solo_inferencias(base):
+    razonador = nuevo_razonador(base)
+    n1, n2 = BNode(), BNode()
+    inferidas = razonador.agregar([(n1, RUTA.intersectaCon, n2)])
+    assert inferidas == {(n1, RUTA.seRelacionaCon, n2)}
+    assert razonador.quitar([(n1, RUTA.intersectaCon, n2)]) == {(n1, RUTA.seRelacionaCon, n2)}
+    assert set(razonador.g) == referencia(base)
+
+
+def test_secuencia_aleatoria_igual_a_razonar_dirigido(base):
+    rng = random.Random(1)
+    presentes = list(base)
+    razonador = nuevo_razonador(presentes)
+    for paso in range(120):
+        if rng.random() < 0.5:
+            lote = rng.sample(presentes, rng.randint(1, 5))
+            razonador.quitar(lote)
+            presentes = [t for t in presentes if t not in lote]
+        else:
+            faltan = [t for t in base if t not in set(presentes)]
+            if not faltan:
+                continue
+            lote = rng.sample(faltan, min(len(faltan), rng.randint(1, 5)))
+            razonador.agregar(lote)
+            presentes.extend(lote)
+        if paso % 10 == 0:
+            assert set(razonador.g) == referencia(presentes), paso
+    assert set(razonador.g) == referencia(presentes)
@@ -0,0 +1,102 @@
+"""
+Las distintas formas de codificar, razonar y traducir la ontología deben producir los mismos hechos
+"""
+
+from collections import Counter
+
+import pytest
+from rdflib import BNode, Graph
+
+import practica1.traductor_ontologia as traductor_ontologia
+from practica1.benchmark import red_sintetica
+from practica1.ontologia import ConfigOntologia, agregar_ruta_al_grafo, agregar_rutas, construir_ontologia, razonar
+from practica1.sistema_experto import EventoEnVia, Via
+from practica1.traductor_ontologia import traducir, traducir_stream
+
+# campos cuyo orden importa (el de la ruta); el de los demás campos lista viene de un `set`
+CAMPOS_ORDENADOS = {"vias", "tiene_nodos"}
+
+
+def normalizar(hechos) -> Counter:
+    """
+    Retorna el multiconjunto de los `hechos` como tuplas (clase, campos), con los campos lista
+    ordenados salvo los de `CAMPOS_ORDENADOS`
+    """
+    normalizados = Counter()
+    for hecho in hechos:
+        campos = []
+        for llave, valor in hecho.as_dict().items():
+            if isinstance(valor, list):
+                valor = tuple(valor) if llave in CAMPOS_ORDENADOS else tuple(sorted(valor))
+            campos.append((llave, valor))
+        normalizados[type(hecho).__name__, tuple(sorted(campos))] += 1
+    return normalizados
+
+
+@pytest.fixture(scope="module")
+def ontologia():
+    return construir_ontologia(ConfigOntologia())
+
+
+@pytest.fixture(scope="module")
+def ontologia_compacta():
+    return construir_ontologia(ConfigOntologia(codificacion_rutas="compacta"))
+
+
+def test_codificacion_compacta_igual_a_coleccion(ontologia, ontologia_compacta):
+    assert len(ontologia_compacta) < len(ontologia)
+    assert normalizar(traducir(ontologia_compacta)) == normalizar(traducir(ontologia))
+
+
+def test_codificacion_compacta_sin_grafo_vial():
+    g = Graph()
+    with pytest.raises(Exception, match="necesita el grafo vial"):
+        agregar_ruta_al_grafo(g, [(BNode(), None)], 1, BNode(), BNode(), codificacion="compacta")
+    assert len(g) == 0
+
+
+@pytest.fixture(params=["coleccion", "compacta"])
+def ontologia_codificada(request, ontologia, ontologia_compacta):
+    return ontologia if request.param == "coleccion" else ontologia_compacta
+
+
+def test_stream_igual_a_traducir(ontologia_codificada):
+    assert normalizar(traducir_stream(ontologia_codificada)) == normalizar(traducir(ontologia_codificada))
+
+
+def test_stream_eventos_en_via_despues_de_su_via(ontologia_codificada):
+    # cada EventoEnVia debe llegar justo después de su vía o de otro EventoEnVia de la misma vía
+    via_actual = None
+    eventos_en_via = 0
+    for hecho in traducir_stream(ontologia_codificada):
+        if isinstance(hecho, EventoEnVia):
+            assert hecho["via"] == via_actual
+            eventos_en_via += 1
+        else:
+            via_actual = hecho["nombre"] if isinstance(hecho, Via) else None
+    assert eventos_en_via > 0
+
+
+@pytest.mark.parametrize("sin_gil", [False, True], ids=["procesos", "hilos"])
+def test_en_paralelo_igual_a_secuencial(ontologia, monkeypatch, sin_gil):
+    # sin GIL se usan hilos en vez de procesos
+    monkeypatch.setattr(traductor_ontologia, "_sin_gil", lambda: sin_gil)
+    secuencial = traducir(ontologia)
+    # mismos hechos y en el mismo orden
+    assert traducir(ontologia, trabajadores=2) == secuencial
+    assert traducir(ontologia, trabajadores=3) == secuencial
+
+
+def test_razonador_dirigido_igual_a_owlrl(ontologia):
+    dirigido = construir_ontologia(ConfigOntologia(razonador="dirigido"))
+    assert normalizar(traducir(dirigido)) == normalizar(traducir(ontologia))
+
+
+def test_razonador_dirigido_igual_a_owlrl_en_red_sintetica():
+    hechos = {}
+    for razonador in ("owlrl", "dirigido"):
+        g = red_sintetica(5)
+        razonar(g, razonador=razonador)
+        agregar_rutas(g, ConfigOntologia())
+        hechos[razonador] = normalizar(traducir(g))
+    assert hechos["dirigido"] == hechos["owlrl"]